@@ -0,0 +1,41 @@
+"""
+Compares writing Python objects with `json5kit.dumps` against `json.dumps`,
+both for the objects loaded from a config file and for a list of numbers.
+
+Usage: python benchmarks/bench_dumps.py [size_in_kb] [repeats]
+"""
+from __future__ import annotations
+import json
+import sys
+import timeit
+
+import json5kit
+from bench_parse import make_source
+
+
+def main() -> None:
+    size_in_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    objects = {
+        "config": json5kit.loads(make_source(size_in_kb)),
+        "numbers": list(range(size_in_kb * 128)),
+    }
+
+    for name, obj in objects.items():
+        megabytes = len(json.dumps(obj)) / 1024 / 1024
+        for indent in (None, 2):
+            benchmarks = {
+                "json.dumps": lambda: json.dumps(obj, indent=indent),
+                "json5kit.dumps": lambda: json5kit.dumps(obj, indent=indent),
+            }
+            for function_name, function in benchmarks.items():
+                best = min(timeit.Timer(function).repeat(repeat=repeats, number=1))
+                speed = megabytes / best
+                print(
+                    f"{name}, indent={indent}, {function_name}:"
+                    f" {megabytes:.2f} MB in {best:.3f}s ({speed:.2f} MB/s)"
+                )
+
+
+if __name__ == "__main__":
+    main()
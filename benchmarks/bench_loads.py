@@ -0,0 +1,48 @@
+"""
+Compares `json5kit.loads` against building the CST with `json5kit.parse` and
+converting the tree into Python objects afterwards.
+
+Usage: python benchmarks/bench_loads.py [size_in_kb] [repeats]
+"""
+from __future__ import annotations
+import sys
+import timeit
+
+import json5kit
+from bench_parse import make_source
+
+
+def to_python(node: json5kit.Json5Node) -> object:
+    """Converts a parsed JSON5 tree into Python objects."""
+    if isinstance(node, json5kit.Json5File):
+        return to_python(node.value)
+    if isinstance(node, json5kit.Json5Array):
+        return [to_python(member) for member in node.members]
+    if isinstance(node, json5kit.Json5Object):
+        return {
+            key.value.value: to_python(value)
+            for key, value in zip(node.keys, node.values)
+        }
+
+    assert isinstance(node, json5kit.Json5Primitive)
+    return node.value
+
+
+def main() -> None:
+    size_in_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    source = make_source(size_in_kb)
+    megabytes = len(source) / 1024 / 1024
+
+    benchmarks = {
+        "parse + to_python": lambda: to_python(json5kit.parse(source)),
+        "loads": lambda: json5kit.loads(source),
+    }
+    for name, function in benchmarks.items():
+        best = min(timeit.Timer(function).repeat(repeat=repeats, number=1))
+        speed = megabytes / best
+        print(f"{name}: {megabytes:.2f} MB in {best:.3f}s ({speed:.2f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
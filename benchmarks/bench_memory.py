@@ -0,0 +1,40 @@
+"""
+Measures how much memory the CST of a synthetic JSON5 config file takes,
+overall and per node.
+
+Usage: python benchmarks/bench_memory.py [size_in_kb]
+"""
+from __future__ import annotations
+import sys
+import tracemalloc
+
+import json5kit
+from bench_parse import make_source
+from json5kit.visitor import walk
+
+
+def main() -> None:
+    size_in_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    source = make_source(size_in_kb)
+
+    megabytes = len(source) / 1024 / 1024
+    print(f"source: {megabytes:.2f} MB")
+
+    for share_trivia in (False, True):
+        tracemalloc.start()
+        tree = json5kit.parse(source, share_trivia=share_trivia)
+        tree_size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        node_count = sum(1 for _ in walk(tree))
+        tree_megabytes = tree_size / 1024 / 1024
+        print(
+            f"share_trivia={share_trivia}: {node_count} nodes,"
+            f" {tree_megabytes:.2f} MB ({tree_size / len(source):.1f}x),"
+            f" {tree_size / node_count:.1f} bytes per node"
+        )
+        del tree
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measures how `json5kit.parse_many` scales with the number of worker processes,
+both when building CSTs and when loading Python objects, and how
+`json5kit.parse_parallel` and `json5kit.loads_parallel` scale on one document
+of the same total size.
+
+Usage: python benchmarks/bench_parallel.py [file_count] [size_in_kb] [repeats]
+"""
+from __future__ import annotations
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import json5kit
+from bench_parse import make_source
+
+
+def worker_counts() -> list[int]:
+    """Returns 1, 2, 4... up to the number of CPUs."""
+    cpu_count = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpu_count:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpu_count:
+        counts.append(cpu_count)
+    return counts
+
+
+def report(
+    name: str, workers: int, best: float, single_worker_time: float, megabytes: float
+) -> None:
+    speedup = single_worker_time / best
+    print(
+        f"{name}, {workers} workers: {best:.3f}s"
+        f" ({megabytes / best:.2f} MB/s, {speedup:.2f}x)"
+    )
+
+
+def main() -> None:
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    size_in_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    source = make_source(size_in_kb)
+    megabytes = file_count * len(source) / 1024 / 1024
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [
+            Path(directory, f"config_{index}.json5") for index in range(file_count)
+        ]
+        for path in paths:
+            path.write_text(source, encoding="utf-8")
+
+        print(f"{file_count} files, {megabytes:.2f} MB in total")
+        for values in (False, True):
+            name = "values" if values else "CST"
+            single_worker_time = 0.0
+            for workers in worker_counts():
+
+                def run() -> None:
+                    json5kit.parse_many(
+                        paths, workers=workers, values=values, share_trivia=True
+                    )
+
+                best = min(timeit.Timer(run).repeat(repeat=repeats, number=1))
+                if workers == 1:
+                    single_worker_time = best
+                report(name, workers, best, single_worker_time, megabytes)
+
+    document = make_source(file_count * size_in_kb)
+    print(f"One document, {len(document) / 1024 / 1024:.2f} MB")
+    for parse in (json5kit.parse_parallel, json5kit.loads_parallel):
+        single_worker_time = 0.0
+        for workers in worker_counts():
+
+            def run_document() -> None:
+                parse(document, workers=workers)
+
+            best = min(timeit.Timer(run_document).repeat(repeat=repeats, number=1))
+            if workers == 1:
+                single_worker_time = best
+            report(parse.__name__, workers, best, single_worker_time, megabytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Measures the throughput of `json5kit.parse` on a synthetic, pretty-printed
+JSON5 config file.
+
+Usage: python benchmarks/bench_parse.py [size_in_kb] [repeats]
+"""
+from __future__ import annotations
+import sys
+import timeit
+
+import json5kit
+
+
+def make_source(size_in_kb: int) -> str:
+    """Builds a JSON5 document of roughly the given size."""
+    entries = []
+    index = 0
+    total_size = 0
+    while total_size < size_in_kb * 1024:
+        entry = (
+            f"  service_{index}: {{  // service number {index}\n"
+            f"    'name': \"service-{index}\",\n"
+            f"    port: {8000 + index},\n"
+            f"    weight: {index / 7:.3f},\n"
+            f"    enabled: {'true' if index % 2 else 'false'},\n"
+            f"    tags: ['a', \"b\\tc\", null],\n"
+            f"  }},\n"
+        )
+        entries.append(entry)
+        total_size += len(entry)
+        index += 1
+
+    return "{\n" + "".join(entries) + "}\n"
+
+
+def main() -> None:
+    size_in_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    source = make_source(size_in_kb)
+
+    megabytes = len(source) / 1024 / 1024
+    for lazy in (False, True):
+        timer = timeit.Timer(lambda: json5kit.parse(source, lazy=lazy))
+        best = min(timer.repeat(repeat=repeats, number=1))
+        speed = megabytes / best
+        name = f"parse(lazy={lazy})"
+        print(f"{name}: {megabytes:.2f} MB in {best:.3f}s ({speed:.2f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Compares rebuilding a tree with `json5kit.load_cst` against parsing the source
+again, and against pickle, along with the size of the serialized trees.
+
+Usage: python benchmarks/bench_serialize.py [size_in_kb] [repeats]
+"""
+from __future__ import annotations
+import pickle
+import sys
+import timeit
+
+import json5kit
+from bench_parse import make_source
+
+
+def main() -> None:
+    size_in_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    source = make_source(size_in_kb)
+    megabytes = len(source) / 1024 / 1024
+
+    for share_trivia in (False, True):
+        tree = json5kit.parse(source, share_trivia=share_trivia)
+        cst_data = json5kit.dump_cst(tree)
+        pickle_data = pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL)
+        print(
+            f"share_trivia={share_trivia}: dump_cst {len(cst_data) / 1024:.0f} KB,"
+            f" pickle {len(pickle_data) / 1024:.0f} KB"
+        )
+
+        benchmarks = {
+            "parse": lambda: json5kit.parse(source, share_trivia=share_trivia),
+            "dump_cst": lambda: json5kit.dump_cst(tree),
+            "load_cst": lambda: json5kit.load_cst(cst_data),
+            "pickle.dumps": lambda: pickle.dumps(tree, pickle.HIGHEST_PROTOCOL),
+            "pickle.loads": lambda: pickle.loads(pickle_data),
+        }
+        for name, function in benchmarks.items():
+            best = min(timeit.Timer(function).repeat(repeat=repeats, number=1))
+            speed = megabytes / best
+            print(f"  {name}: {megabytes:.2f} MB in {best:.3f}s ({speed:.2f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Runs the parser and serializer benchmarks on every shape of synthetic corpus,
+and writes the results as JSON, so that they can be compared between versions.
+
+Usage:
+    python benchmarks/bench_suite.py run [--size KB] [--repeats N] [--seed N]
+        [--corpus NAME ...] [--output results.json]
+    python benchmarks/bench_suite.py compare old.json new.json [--threshold 0.1]
+
+`compare` exits with status 1 if anything got slower, or took more memory, by
+more than the threshold.
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from typing import Any, Callable
+
+import json5kit
+from bench_visitor import CountNumbers, NegateNumbers
+from corpus import CORPORA
+from json5kit.visitor import walk
+
+# Bumped whenever the layout of the results changes.
+RESULTS_FORMAT = 1
+
+
+def time_corpus(source: str, repeats: int) -> dict[str, Any]:
+    """Times everything there is to time on a single document."""
+    tree = json5kit.parse(source)
+    value = json5kit.loads(source)
+    # The transformer goes last, as it changes the tree
+    benchmarks: dict[str, Callable[[], object]] = {
+        "parse": lambda: json5kit.parse(source),
+        "loads": lambda: json5kit.loads(source),
+        "to_source": lambda: tree.to_source(),
+        "to_json": lambda: tree.to_json(),
+        "dumps": lambda: json5kit.dumps(value),
+        "Json5Visitor": lambda: CountNumbers().visit(tree),
+        "Json5Transformer": lambda: NegateNumbers().visit(tree),
+    }
+    seconds = {}
+    for name, function in benchmarks.items():
+        seconds[name] = min(timeit.Timer(function).repeat(repeat=repeats, number=1))
+        print(f"  {name}: {seconds[name]:.3f}s", file=sys.stderr)
+
+    tracemalloc.start()
+    tree = json5kit.parse(source)
+    tree_size, parse_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "bytes": len(source.encode("utf-8")),
+        "nodes": sum(1 for _ in walk(tree)),
+        "seconds": seconds,
+        "memory": {"parse_peak": parse_peak, "tree": tree_size},
+    }
+
+
+def environment() -> dict[str, str | None]:
+    """Describes what the results were measured on."""
+    return {
+        "json5kit_version": json5kit_version(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def json5kit_version() -> str | None:
+    if sys.version_info < (3, 8):
+        return None
+
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("json5kit")
+    except PackageNotFoundError:
+        return None
+
+
+def git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return result.stdout.strip()
+
+
+def run(args: argparse.Namespace) -> None:
+    corpus_names = args.corpus or list(CORPORA)
+    corpora = {}
+    for name in corpus_names:
+        print(f"{name}:", file=sys.stderr)
+        source = CORPORA[name](args.size, args.seed)
+        corpora[name] = time_corpus(source, args.repeats)
+
+    results = {
+        "format": RESULTS_FORMAT,
+        "environment": environment(),
+        "options": {
+            "size_in_kb": args.size,
+            "repeats": args.repeats,
+            "seed": args.seed,
+        },
+        "corpora": corpora,
+    }
+    output = json.dumps(results, indent=2) + "\n"
+    if args.output is None:
+        sys.stdout.write(output)
+    else:
+        Path(args.output).write_text(output, encoding="utf-8")
+
+
+def compare(args: argparse.Namespace) -> None:
+    old_results = json.loads(Path(args.old).read_text(encoding="utf-8"))
+    new_results = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    for results in (old_results, new_results):
+        if results.get("format") != RESULTS_FORMAT:
+            sys.exit(f"Unsupported results format: {results.get('format')}")
+    if old_results["options"] != new_results["options"]:
+        print("warning: the results were measured with different options")
+
+    regressions = 0
+    for name, new_corpus in new_results["corpora"].items():
+        old_corpus = old_results["corpora"].get(name)
+        if old_corpus is None:
+            continue
+
+        print(f"{name}:")
+        for kind in ("seconds", "memory"):
+            for metric, new_value in new_corpus[kind].items():
+                old_value = old_corpus[kind].get(metric)
+                if not old_value:
+                    continue
+
+                change = new_value / old_value - 1
+                is_regression = change > args.threshold
+                regressions += is_regression
+                marker = "  REGRESSION" if is_regression else ""
+                print(
+                    f"  {metric}: {old_value:.4g} -> {new_value:.4g}"
+                    f" ({change:+.1%}){marker}"
+                )
+
+    if regressions:
+        print(f"{regressions} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks json5kit on synthetic JSON5 corpora."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--size", type=int, default=1024, help="in KB")
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--corpus", nargs="+", choices=list(CORPORA))
+    run_parser.add_argument("--output", help="defaults to stdout")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two results")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="0.1 allows 10%% slowdowns"
+    )
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Compares visiting every node of a parsed JSON5 tree with `Json5Visitor` and
+`Json5Transformer` against a bare traversal with `walk`.
+
+Usage: python benchmarks/bench_visitor.py [size_in_kb] [repeats]
+"""
+from __future__ import annotations
+import sys
+import timeit
+
+import json5kit
+from bench_parse import make_source
+from json5kit.visitor import walk
+
+
+class CountNumbers(json5kit.Json5Visitor):
+    def __init__(self) -> None:
+        self.count = 0
+
+    def visit_Number(self, node: json5kit.Json5Number) -> None:
+        self.count += 1
+
+
+class NegateNumbers(json5kit.Json5Transformer):
+    def visit_Number(self, node: json5kit.Json5Number) -> json5kit.Json5Number:
+        return node.replace(-node.value)
+
+
+def main() -> None:
+    size_in_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    tree = json5kit.parse(make_source(size_in_kb))
+    node_count = sum(1 for _ in walk(tree))
+
+    benchmarks = {
+        "walk": lambda: sum(1 for _ in walk(tree)),
+        "Json5Visitor": lambda: CountNumbers().visit(tree),
+        "Json5Transformer": lambda: NegateNumbers().visit(tree),
+    }
+    for name, function in benchmarks.items():
+        best = min(timeit.Timer(function).repeat(repeat=repeats, number=1))
+        speed = node_count / best / 1_000_000
+        print(f"{name}: {node_count} nodes in {best:.3f}s ({speed:.2f}M nodes/s)")
+
+
+if __name__ == "__main__":
+    main()
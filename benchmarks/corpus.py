@@ -0,0 +1,174 @@
+"""
+Generates synthetic JSON5 documents of different shapes for the benchmarks.
+
+Documents are generated from a seed, so the same shape, size and seed always
+give the same document, on any machine and Python version.
+
+Usage: python benchmarks/corpus.py shape [size_in_kb] [seed] > document.json5
+"""
+from __future__ import annotations
+import random
+import sys
+
+from typing import Callable
+
+# Deep enough to stress nesting, but shallow enough for the recursive visitors
+_NESTING_DEPTH = 100
+
+_WORDS = (
+    "alpha beta gamma delta epsilon zeta theta kappa lambda sigma omega"
+    " cache server client timeout retries region replica shard index"
+).split()
+_ESCAPES = ("\\n", "\\t", "\\\\", '\\"', "\\'", "\\r", "\\b", "\\f", "\\v")
+
+
+def _fill(size_in_kb: int, make_entry: Callable[[int], str]) -> list[str]:
+    """Calls `make_entry` with increasing indexes until there's enough source."""
+    entries: list[str] = []
+    total_size = 0
+    while total_size < size_in_kb * 1024:
+        entry = make_entry(len(entries))
+        entries.append(entry)
+        total_size += len(entry)
+
+    return entries
+
+
+def _number(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return str(rng.randint(-100_000, 100_000))
+    return f"{rng.uniform(-1000, 1000):.{rng.randint(1, 6)}f}"
+
+
+def make_deep(size_in_kb: int, seed: int = 0) -> str:
+    """An array of deeply nested arrays and objects, with little else in them."""
+    rng = random.Random(seed)
+
+    def make_entry(index: int) -> str:
+        opening = []
+        closing = []
+        for depth in range(_NESTING_DEPTH):
+            if rng.random() < 0.5:
+                opening.append("[")
+                closing.append("]")
+            else:
+                opening.append(f"{{k{depth}: ")
+                closing.append("}")
+
+        return "".join(opening) + _number(rng) + "".join(reversed(closing)) + ",\n"
+
+    return "[\n" + "".join(_fill(size_in_kb, make_entry)) + "]\n"
+
+
+def make_wide(size_in_kb: int, seed: int = 0) -> str:
+    """A single object with a lot of short entries."""
+    rng = random.Random(seed)
+    values = (
+        lambda: _number(rng),
+        lambda: rng.choice(("true", "false", "null")),
+        lambda: f"'{rng.choice(_WORDS)}'",
+    )
+
+    def make_entry(index: int) -> str:
+        key = f"key_{index}" if index % 3 else f'"key {index}"'
+        return f"{key}: {rng.choice(values)()}, "
+
+    return "{" + "".join(_fill(size_in_kb, make_entry)) + "}\n"
+
+
+def make_strings(size_in_kb: int, seed: int = 0) -> str:
+    """An array of long strings, full of escape sequences and line continuations."""
+    rng = random.Random(seed)
+
+    def make_entry(index: int) -> str:
+        parts = []
+        for _ in range(rng.randint(20, 60)):
+            roll = rng.random()
+            if roll < 0.2:
+                parts.append(rng.choice(_ESCAPES))
+            elif roll < 0.22:
+                parts.append("\\\n")
+            else:
+                parts.append(rng.choice(_WORDS) + " ")
+
+        return '  "' + "".join(parts) + '",\n'
+
+    return "[\n" + "".join(_fill(size_in_kb, make_entry)) + "]\n"
+
+
+def make_comments(size_in_kb: int, seed: int = 0) -> str:
+    """An array with more comments and whitespace than data."""
+    rng = random.Random(seed)
+
+    def make_entry(index: int) -> str:
+        comments = "".join(
+            f"  // {' '.join(rng.choices(_WORDS, k=rng.randint(3, 12)))}\n"
+            for _ in range(rng.randint(1, 4))
+        )
+        return f"{comments}  {_number(rng)},  // item {index}\n\n"
+
+    return "[\n" + "".join(_fill(size_in_kb, make_entry)) + "]\n"
+
+
+def make_numbers(size_in_kb: int, seed: int = 0) -> str:
+    """Arrays of a thousand numbers each, written on a single line."""
+    rng = random.Random(seed)
+
+    def make_entry(index: int) -> str:
+        numbers = ", ".join(_number(rng) for _ in range(1000))
+        return f"  [{numbers}],\n"
+
+    return "[\n" + "".join(_fill(size_in_kb, make_entry)) + "]\n"
+
+
+def make_config(size_in_kb: int, seed: int = 0) -> str:
+    """A pretty-printed config file, with nested sections, lists and comments."""
+    rng = random.Random(seed)
+
+    def make_entry(index: int) -> str:
+        name = rng.choice(_WORDS)
+        hosts = ", ".join(
+            f"'{rng.choice(_WORDS)}-{rng.randint(1, 99)}.example.com'"
+            for _ in range(rng.randint(1, 4))
+        )
+        return (
+            f"  {name}_{index}: {{  // {rng.choice(_WORDS)} settings\n"
+            f'    "name": "{name}-{index}",\n'
+            f"    enabled: {rng.choice(('true', 'false'))},\n"
+            f"    port: {rng.randint(1024, 65535)},\n"
+            f"    timeout: {rng.uniform(0, 60):.2f},\n"
+            f"    hosts: [{hosts}],\n"
+            f"    limits: {{\n"
+            f"      memory: {rng.randint(64, 8192)},\n"
+            f"      cpu: {rng.uniform(0, 8):.1f},\n"
+            f"      description: 'Limits for\\t{name}\\n',\n"
+            f"    }},\n"
+            f"    fallback: null,\n"
+            f"  }},\n"
+        )
+
+    return "{\n" + "".join(_fill(size_in_kb, make_entry)) + "}\n"
+
+
+CORPORA: dict[str, Callable[[int, int], str]] = {
+    "deep": make_deep,
+    "wide": make_wide,
+    "strings": make_strings,
+    "comments": make_comments,
+    "numbers": make_numbers,
+    "config": make_config,
+}
+
+
+def main() -> None:
+    if len(sys.argv) < 2 or sys.argv[1] not in CORPORA:
+        print(f"Usage: {sys.argv[0]} {{{','.join(CORPORA)}}} [size_in_kb] [seed]")
+        sys.exit(2)
+
+    size_in_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    sys.stdout.write(CORPORA[sys.argv[1]](size_in_kb, seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,9 @@
 """json5kit - A Parser and CST for JSON5."""
 from __future__ import annotations
-import string
-import sys
-
-from typing import Sequence, cast
-
-if sys.version_info >= (3, 8):
-    from typing import Literal
-else:
-    from typing_extensions import Literal
 
+import mmap
+import os
+from typing import IO, Union
 
 from json5kit.nodes import (
     Json5Array,
@@ -29,377 +23,109 @@ from json5kit.nodes import (
     Json5Trivia,
     Json5Whitespace,
 )
+from json5kit.bytes_parser import Json5BytesParser
+from json5kit.encoder import dump, dumps
+from json5kit.cache import Json5CacheStats, Json5ParseCache
+from json5kit.diff import Json5Edit, apply_patch, diff
+from json5kit.events import Json5Event, iterparse
+from json5kit.hashing import (
+    find_changes,
+    invalidate_hashes,
+    structural_hash,
+    structurally_equal,
+)
+from json5kit.incremental import reparse
+from json5kit.parallel import loads_parallel, parse_many, parse_parallel
+from json5kit.parser import (
+    Json5ParseError,
+    Json5Parser,
+    Json5ValueParser,
+)
+from json5kit.query import (
+    Json5Path,
+    Json5PathError,
+    compile_path,
+    query,
+    resolve_pointer,
+)
+from json5kit.records import iter_record_values, iter_records
+from json5kit.serialize import dump_cst, load_cst
+from json5kit.stats import Json5InstrumentedParser, Json5ParseStats
+from json5kit.spans import Buffer, LineIndex, index_to_line_column, iter_spans
+from json5kit.stream import Json5StreamParser
 from json5kit.visitor import Json5Visitor, Json5Transformer
 
 
-def index_to_line_column(index: int, source: str) -> tuple[int, int]:
-    """Converts the tokenizer index into a line and column for the error."""
-    line, column = 1, 0
-    for char in source[:index]:
-        if char == "\n":
-            line += 1
-            column = 0
-        else:
-            column += 1
-
-    return line, column
-
-
-class Json5ParseError(Exception):
-    """Raised when the JSON5 string has bad syntax."""
-
-    def __init__(self, message: str, index: int, source: str) -> None:
-        self.index = index
-        self.line, self.column = index_to_line_column(self.index, source)
-        super().__init__(f"at {self.line}:{self.column}: {message}")
-
-
-class Json5Parser:
-    """Parser that converts a JSON5 string into a CST."""
-
-    def __init__(self, source: str) -> None:
-        self.source = source
-        self.current = 0
-
-    @property
-    def scanned(self) -> int:
-        """Returns True if the source has been fully scanned."""
-        return self.current >= len(self.source)
-
-    def advance(self) -> None:
-        """Advance the current pointer."""
-        if self.scanned:
-            return
-
-        self.current += 1
-
-    def previous(self) -> str:
-        """Returns the previously read character."""
-        return self.source[self.current - 1]
-
-    def peek(self) -> str:
-        """Returns the current character, without actually consuming it."""
-        if self.scanned:
-            return ""
-
-        return self.source[self.current]
-
-    def peek_next(self) -> str:
-        """Returns the character one ahead of the current character."""
-        if self.current + 1 >= len(self.source):
-            return ""
-
-        return self.source[self.current + 1]
-
-    def peek_non_whitespace(self) -> str:
-        """Returns the first non-whitespace character."""
-        for char in self.source[self.current :]:
-            if char not in string.whitespace:
-                return char
-
-        return ""
-
-    def read_char(self) -> str:
-        """
-        Reads one character from the source.
-        If the source has been exhausted, returns an empty string.
-        """
-        char = self.peek()
-        self.advance()
-
-        return char
-
-    def match_next(self, chars: Sequence[str]) -> bool:
-        """
-        Returns True and reads one character from source, but only if it
-        matches any of the given characters. Returns False otherwise.
-        """
-        if self.scanned:
-            return False
-
-        if self.source[self.current] in chars:
-            self.advance()
-            return True
-
-        return False
-
-    def consume(self, char: str) -> None:
-        """
-        Consumes the expected character type from source. If the character
-        doesn't match current, raises a parse error.
-        """
-        if self.scanned:
-            raise Json5ParseError(
-                f"Expected to find '{char}', found EOF",
-                index=self.current,
-                source=self.source,
-            )
-
-        current_char = self.read_char()
-        if current_char != char:
-            raise Json5ParseError(
-                f"Expected to find '{char}', found '{current_char}'",
-                index=self.current,
-                source=self.source,
-            )
-
-    def parse(self) -> Json5File:
-        """Scans the source to produce a JSON5 CST."""
-        leading_trivia_nodes = self.parse_trivia()
-        value = self.parse_node()
-        trailing_trivia_nodes = self.parse_trivia()
-
-        # Ensure no more data exists
-        if not self.scanned:
-            token = self.read_char()
-            raise Json5ParseError(f"Unexpected {token}", self.current, self.source)
-
-        return Json5File(value, leading_trivia_nodes, trailing_trivia_nodes)
-
-    def parse_node(self) -> Json5Node:
-        """Returns a parsed JSON5 node."""
-        if self.scanned:
-            raise Json5ParseError(
-                "Expected to find JSON5 data, found EOF",
-                index=self.current,
-                source=self.source,
-            )
-
-        if self.match_next("["):
-            return self.parse_array()
-        elif self.match_next("{"):
-            return self.parse_object()
-        else:
-            return self.parse_primitive()
-
-    def parse_primitive(self) -> Json5Primitive:
-        """Returns a parsed JSON primitive."""
-        node: Json5Primitive
-
-        if self.source[self.current : self.current + 4] == "null":
-            self.current += 4
-            node = Json5Null(trailing_trivia_nodes=[])
-
-        elif self.source[self.current : self.current + 4] == "true":
-            self.current += 4
-            node = Json5Boolean(
-                source="true",
-                value=True,
-                trailing_trivia_nodes=[],
-            )
-
-        elif self.source[self.current : self.current + 5] == "false":
-            self.current += 5
-            node = Json5Boolean(
-                source="false",
-                value=False,
-                trailing_trivia_nodes=[],
-            )
-
-        elif self.match_next(('"', "'")):
-            # TODO: can remove once mypy has better type narrowing
-            # ref: https://github.com/python/mypy/issues/12535
-            quote_char = cast(Literal['"', "'"], self.previous())
-            source, string_value = self.parse_string(quote_char)
-            node = Json5String(source, string_value, trailing_trivia_nodes=[])
-
-        # TODO: leading decimal?
-        elif self.peek() in string.digits or self.peek() in ("+", "-"):
-            source, float_value = self.parse_number()
-            node = Json5Number(source, float_value, trailing_trivia_nodes=[])
-
-        else:
-            raise NotImplementedError(self.source[self.current])
-
-        trailing_trivia_nodes = self.parse_trivia()
-        node.trailing_trivia_nodes = trailing_trivia_nodes
-        return node
-
-    def parse_identifier(self) -> str:
-        """
-        Scans keywords and variable names.
-        It doesn't check for the first letter being a non-number because the call-site
-        already confirms that.
-        """
-        # TODO: not full ECMA syntax
-        start_index = self.current
-        while not self.scanned and (self.peek().isalnum() or self.peek() == "_"):
-            self.advance()
-        identifier = self.source[start_index : self.current]
-        return identifier
-
-    def parse_string(self, quote_char: Literal["'", '"']) -> tuple[str, str]:
-        # TODO: this is probably not all escapes
-        start_index = self.current
-        unescaped_chars = []
-        while not self.scanned and self.peek() != quote_char:
-            char = self.read_char()
-
-            if char != "\\":
-                unescaped_chars.append(char)
-                continue
-
-            # Escaping the next character
-            next_char = self.peek()
-            if next_char == "":
-                raise Json5ParseError(
-                    "Unterminated string", index=start_index, source=self.source
-                )
-
-            if next_char == "\n":
-                pass  # trailing backslash means ignore the newline
-            elif next_char == "\\":
-                unescaped_chars.append("\\")
-            elif next_char == "n":
-                unescaped_chars.append("\n")
-            elif next_char == "t":
-                unescaped_chars.append("\t")
-            elif next_char == "'":
-                unescaped_chars.append("'")
-            elif next_char == '"':
-                unescaped_chars.append('"')
-            else:
-                escape = char + next_char
-                raise Json5ParseError(
-                    f"Unknown escape sequence: '{escape}'",
-                    index=self.current,
-                    source=self.source,
-                )
-
-            self.advance()
-
-        # Ensure end quote
-        self.consume(quote_char)
-
-        value = "".join(unescaped_chars)
-        content = quote_char + self.source[start_index : self.current]
-        return content, value
-
-    def parse_number(self) -> tuple[str, float]:
-        # TODO: exponent syntax support
-        # TODO: Hexadecimal support
-        start_index = self.current
-        if self.peek() in ("+", "-"):
-            self.advance()
-
-        while self.peek().isdigit():
-            self.advance()
-
-        # decimal support
-        if self.peek() == ".":
-            if self.peek_next().isdigit():
-                self.advance()
-                while self.peek().isdigit():
-                    self.advance()
-
-        content = self.source[start_index : self.current]
-        return content, float(content)
-
-    def parse_array_member(self) -> Json5Node:
-        value = self.parse_node()
-
-        if self.peek() == "]":
-            # Trailing comma not necessary for last element
-            pass
-        else:
-            self.consume(",")
-            value.trailing_trivia_nodes.append(Json5Comma())
-
-        value.trailing_trivia_nodes.extend(self.parse_trivia())
-        return value
-
-    def parse_array(self) -> Json5Array:
-        items: list[Json5Node] = []
-        leading_trivia_nodes = self.parse_trivia()
-
-        while not self.scanned and not self.match_next("]"):
-            items.append(self.parse_array_member())
-
-        trailing_trivia_nodes = self.parse_trivia()
-        return Json5Array(items, leading_trivia_nodes, trailing_trivia_nodes)
-
-    def parse_object_entry(self) -> tuple[Json5Key, Json5Node]:
-        key_value_node: Json5String | Json5Identifier
-
-        if self.peek().isalpha() or self.peek() == "_":
-            source = self.parse_identifier()
-            trailing_trivia = self.parse_trivia()
-            key_value_node = Json5Identifier(source, trailing_trivia)
-
-        elif self.match_next(('"', "'")):
-            quote_char = cast(Literal['"', "'"], self.previous())
-            source, value = self.parse_string(quote_char)
-            trailing_trivia = self.parse_trivia()
-            key_value_node = Json5String(source, value, trailing_trivia)
-
-        else:
-            raise Json5ParseError(
-                f"Expected to find identifier",
-                index=self.current,
-                source=self.source,
-            )
-
-        self.consume(":")
-        trivia_after_colon = self.parse_trivia()
-        key_node = Json5Key(key_value_node, trivia_after_colon)
-
-        value_node = self.parse_node()
-        if self.peek() == "}":
-            # Trailing comma not necessary for last element
-            pass
-        else:
-            self.consume(",")
-            value_node.trailing_trivia_nodes.append(Json5Comma())
-
-        value_node.trailing_trivia_nodes.extend(self.parse_trivia())
-        return key_node, value_node
-
-    def parse_object(self) -> Json5Object:
-        items: list[tuple[Json5Key, Json5Node]] = []
-        leading_trivia_nodes = self.parse_trivia()
-
-        while not self.scanned and not self.match_next("}"):
-            items.append(self.parse_object_entry())
-
-        trailing_trivia_nodes = self.parse_trivia()
-        return Json5Object(items, leading_trivia_nodes, trailing_trivia_nodes)
-
-    def parse_trivia(self) -> list[Json5Trivia]:
-        """
-        Parses and returns all following Trivia nodes.
-
-        Includes newlines, whitespace, and comments (comments end with newline).
-        """
-        trivia_nodes: list[Json5Trivia] = []
-        while not self.scanned:
-            if self.match_next("\n"):
-                trivia_nodes.append(Json5Newline())
-
-            elif self.peek() in string.whitespace:
-                whitespace_start = self.current
-                while not self.scanned and self.peek() in string.whitespace:
-                    self.advance()
-
-                whitespace = self.source[whitespace_start : self.current]
-                trivia_nodes.append(Json5Whitespace(whitespace))
-
-            elif self.match_next("/"):
-                comment_start = self.current - 1
-                self.consume("/")
-                while not self.scanned and self.peek() != "\n":
-                    self.advance()
-
-                comment = self.source[comment_start : self.current]
-                trivia_nodes.append(Json5Comment(comment))
-
-            else:
-                break
-
-        return trivia_nodes
-
-
-def parse(source: str) -> Json5Node:
-    return Json5Parser(source).parse()
+def parse(
+    source: str,
+    max_depth: int | None = None,
+    share_trivia: bool = False,
+    lazy: bool = False,
+    stats: Json5ParseStats | None = None,
+) -> Json5File:
+    """
+    Parses a JSON5 string into a CST. Passing a `Json5ParseStats` collects
+    statistics about the parse into it, see `Json5InstrumentedParser`.
+    """
+    if stats is not None:
+        return Json5InstrumentedParser(
+            source, max_depth, share_trivia=share_trivia, lazy=lazy, stats=stats
+        ).parse()
+
+    return Json5Parser(
+        source, max_depth=max_depth, share_trivia=share_trivia, lazy=lazy
+    ).parse()
+
+
+def parse_bytes(
+    source: Buffer,
+    max_depth: int | None = None,
+    share_trivia: bool = False,
+    lazy: bool = False,
+) -> Json5File:
+    """
+    Parses UTF-8 encoded JSON5 from `bytes`, a `bytearray`, a `memoryview` or an
+    `mmap`, without decoding all of it into a string first.
+    """
+    return Json5BytesParser(
+        source, max_depth=max_depth, share_trivia=share_trivia, lazy=lazy
+    ).parse()
+
+
+def parse_file(
+    path: Union[str, os.PathLike[str]],
+    max_depth: int | None = None,
+    share_trivia: bool = False,
+    lazy: bool = False,
+) -> Json5File:
+    """
+    Parses a UTF-8 encoded JSON5 file by memory-mapping it, so that the file is
+    never read into memory as a whole.
+
+    With `lazy=True` the tree keeps the file mapped, until all of its arrays and
+    objects have been loaded.
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            # Empty files can't be mapped
+            return parse_bytes(b"", max_depth, share_trivia=share_trivia, lazy=lazy)
+
+        source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    tree = parse_bytes(source, max_depth, share_trivia=share_trivia, lazy=lazy)
+    if not lazy:
+        source.close()
+    return tree
+
+
+def loads(source: str, max_depth: int | None = None) -> object:
+    """Parses a JSON5 string into Python objects, without building a CST."""
+    return Json5ValueParser(source, max_depth=max_depth).load()
+
+
+def load(fp: IO[str], max_depth: int | None = None) -> object:
+    """Parses a JSON5 file object into Python objects, without building a CST."""
+    return loads(fp.read(), max_depth=max_depth)
 
 
 __all__ = [
@@ -409,6 +135,7 @@ __all__ = [
     "Json5Comma",
     "Json5Comment",
     "Json5File",
+    "Json5Identifier",
     "Json5Key",
     "Json5Newline",
     "Json5Node",
@@ -420,6 +147,44 @@ __all__ = [
     "Json5Trivia",
     "Json5Whitespace",
     "Json5Parser",
+    "Json5InstrumentedParser",
+    "Json5BytesParser",
+    "Json5StreamParser",
+    "Json5ValueParser",
     "Json5Visitor",
     "Json5Transformer",
+    "Json5Event",
+    "Json5CacheStats",
+    "Json5Edit",
+    "Json5ParseCache",
+    "Json5ParseStats",
+    "Json5Path",
+    "Json5PathError",
+    "LineIndex",
+    "apply_patch",
+    "compile_path",
+    "diff",
+    "dump",
+    "dump_cst",
+    "dumps",
+    "find_changes",
+    "invalidate_hashes",
+    "iter_spans",
+    "iter_record_values",
+    "iter_records",
+    "iterparse",
+    "load",
+    "load_cst",
+    "loads",
+    "loads_parallel",
+    "parse",
+    "parse_bytes",
+    "parse_file",
+    "parse_many",
+    "parse_parallel",
+    "query",
+    "reparse",
+    "resolve_pointer",
+    "structural_hash",
+    "structurally_equal",
 ]
@@ -0,0 +1,277 @@
+"""Parser that converts UTF-8 encoded JSON5 into a CST, without decoding it first."""
+from __future__ import annotations
+import re
+
+from typing import Iterator, Pattern, Sequence, Union, cast
+
+from json5kit import parser
+from json5kit.nodes import (
+    Json5Array,
+    Json5Container,
+    Json5File,
+    Json5Key,
+    Json5Node,
+    Json5Object,
+    Json5Primitive,
+    Json5Trivia,
+)
+from json5kit.parser import Json5ParseError, Json5Parser, _Frame, _LazyContainerBody
+from json5kit.spans import Buffer
+
+
+def _to_bytes_pattern(pattern: Pattern[str]) -> Pattern[bytes]:
+    """Compiles a pattern of `json5kit.parser` again, to search bytes with."""
+    return re.compile(pattern.pattern.encode(), pattern.flags & ~re.UNICODE)
+
+
+# Byte versions of the patterns in `json5kit.parser`. Bytes patterns only know
+# about ASCII, so identifiers also take any byte of a multi-byte character,
+# and get checked against the real pattern once decoded.
+_TRIVIA_RUN_RE = _to_bytes_pattern(parser._TRIVIA_RUN_RE)
+_NON_WHITESPACE_RE = _to_bytes_pattern(parser._NON_WHITESPACE_RE)
+_IDENTIFIER_RE = re.compile(rb"[\w\x80-\xff]*")
+_NON_ASCII_RE = re.compile(rb"[\x80-\xff]")
+# Every byte of a multi-byte character but the first one
+_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+# How many bytes get counted at once, when counting the characters in a body
+_COUNT_CHUNK_SIZE = 1 << 20
+
+# Marks the points where a node starts and ends, while renumbering offsets
+_START = object()
+_END = object()
+_OffsetPart = Union[int, Json5Node, object]
+
+
+class Json5BytesParser(Json5Parser):
+    """
+    Parser that converts UTF-8 encoded JSON5 into a CST.
+
+    The source can be `bytes`, a `bytearray`, a `memoryview` or an `mmap`, and
+    is scanned in place. Only the tokens that end up in nodes get decoded, so
+    there is never a decoded copy of the whole source in memory.
+
+    The `start` and `end` offsets of the nodes count characters, the same as
+    for the decoded source, while the index of parse errors is a byte offset
+    into the source. Sources with non-ASCII characters have their offsets
+    converted once they're parsed, which adds a pass over the nodes.
+    """
+
+    source: Buffer  # type: ignore[assignment]
+
+    _number_re = _to_bytes_pattern(parser._NUMBER_RE)
+    _string_chunk_re = {
+        quote_char: _to_bytes_pattern(pattern)
+        for quote_char, pattern in parser._STRING_CHUNK_RE.items()
+    }
+    _skip_token_re = _to_bytes_pattern(parser._SKIP_TOKEN_RE)
+    _keywords = (b"null", b"true", b"false")
+    _backslash = b"\\"
+    # Indexing bytes gives ints
+    _opening_brackets = frozenset(b"[{")
+    _closing_brackets = frozenset(b"]}")
+
+    def __init__(
+        self,
+        source: Buffer,
+        max_depth: int | None = None,
+        share_trivia: bool = False,
+        lazy: bool = False,
+    ) -> None:
+        super().__init__("", max_depth, share_trivia=share_trivia, lazy=lazy)
+        self.source = source
+
+    def parse(self) -> Json5File:
+        tree = super().parse()
+        if _NON_ASCII_RE.search(self.source) is not None:
+            _to_char_offsets(tree, 0, self.source)
+        return tree
+
+    def _move_loaded(
+        self, container: Json5Array | Json5Object, parsed_start: int, start: int
+    ) -> None:
+        assert container.start is not None and container.end is not None
+        if _NON_ASCII_RE.search(self.source, parsed_start, container.end) is None:
+            # Bytes and characters only differ by how much came before the body
+            super()._move_loaded(container, parsed_start, start)
+        else:
+            # The body was parsed without the leading trivia, so it's placed
+            # right after that trivia
+            leading_chars = _count_chars(self.source, parsed_start, container.start)
+            _to_char_offsets(container, start + leading_chars, self.source)
+
+    def _text(self, start: int, end: int) -> str:
+        """Decodes the given slice of the source."""
+        return str(self.source[start:end], "utf-8")
+
+    def previous(self) -> str:
+        return self._text(self.current - 1, self.current)
+
+    def peek(self) -> str:
+        char = self.source[self.current : self.current + 1]
+        if char and char[0] >= 0x80:
+            # Decode the whole multi-byte character instead
+            head = self.source[self.current : self.current + 4]
+            return str(head, "utf-8", "ignore")[:1]
+
+        return str(char, "ascii")
+
+    def peek_next(self) -> str:
+        char = self.source[self.current + 1 : self.current + 2]
+        return str(char, "utf-8", "replace")
+
+    def peek_non_whitespace(self) -> str:
+        match = _NON_WHITESPACE_RE.search(self.source, self.current)
+        if match is None:
+            return ""
+
+        return str(match.group(), "utf-8", "replace")
+
+    def match_next(self, chars: Sequence[str]) -> bool:
+        char = self.source[self.current : self.current + 1]
+        if char and char[0] < 0x80 and chr(char[0]) in chars:
+            self.current += 1
+            return True
+
+        return False
+
+    def consume(self, char: str) -> None:
+        if self.source[self.current : self.current + 1] == char.encode():
+            self.current += 1
+            return
+
+        if self.scanned:
+            raise Json5ParseError(
+                f"Expected to find '{char}', found EOF",
+                index=self.current,
+                source=self.source,
+            )
+
+        current_char = self.read_char()
+        raise Json5ParseError(
+            f"Expected to find '{char}', found '{current_char}'",
+            index=self.current,
+            source=self.source,
+        )
+
+    def _parse_value_start(self, stack: list[_Frame]) -> Json5Node | None:
+        char = self.source[self.current]
+        if char == 0x5B:  # [
+            self.current += 1
+            if self.lazy and stack:
+                return self._parse_lazy_container(stack, "]")
+            self._open_container(stack, "]")
+            return None
+        elif char == 0x7B:  # {
+            self.current += 1
+            if self.lazy and stack:
+                return self._parse_lazy_container(stack, "}")
+            self._open_container(stack, "}")
+            return None
+        else:
+            return self.parse_primitive()
+
+    def parse_identifier(self) -> str:
+        match = _IDENTIFIER_RE.match(self.source, self.current)
+        assert match is not None  # `*` patterns always match
+        identifier = str(match.group(), "utf-8", "replace")
+
+        # Only keep the part that the string pattern would have matched
+        decoded_match = parser._IDENTIFIER_RE.match(identifier)
+        assert decoded_match is not None
+        identifier = decoded_match.group()
+        self.current += len(identifier.encode())
+        return identifier
+
+    def parse_trivia(self) -> list[Json5Trivia]:
+        trivia_nodes: list[Json5Trivia] = []
+        match = _TRIVIA_RUN_RE.match(self.source, self.current)
+        if match is not None:
+            self.current = match.end()
+            trivia_nodes = self._build_trivia(str(match.group(), "utf-8"))
+
+        if self.source[self.current : self.current + 1] == b"/":
+            # A lone slash, that doesn't start a `//` comment
+            self.current += 1
+            self.consume("/")
+
+        return trivia_nodes
+
+
+def _to_char_offsets(node: Json5Node, start: int, source: Buffer) -> None:
+    """
+    Renumbers the byte offsets of a node and everything in it into character
+    offsets, with the node starting at `start`. Lazily parsed containers stay
+    unloaded, and get the characters in their body counted instead.
+    """
+    offset = start
+    stack = [(node, _offset_parts(node, source))]
+    while stack:
+        current, parts = stack[-1]
+        for part in parts:
+            if isinstance(part, int):
+                offset += part
+            elif part is _START:
+                assert isinstance(current, (Json5Primitive, Json5Container))
+                current.start = offset
+            elif part is _END:
+                assert isinstance(current, Json5Container)
+                current.end = offset
+            else:
+                child = cast(Json5Node, part)
+                stack.append((child, _offset_parts(child, source)))
+                break
+        else:
+            stack.pop()
+
+
+def _offset_parts(node: Json5Node, source: Buffer) -> Iterator[_OffsetPart]:
+    """
+    Yields where the node starts and ends, its children, and the length of
+    everything in between in characters, in source order.
+    """
+    if isinstance(node, Json5Primitive):
+        yield _START
+        yield len(node.source)
+    elif isinstance(node, Json5Key):
+        yield node.value
+        yield 1  # the colon
+    elif isinstance(node, Json5File):
+        yield _START
+        yield _trivia_length(node.leading_trivia_nodes)
+        yield node.value
+    elif isinstance(node, (Json5Array, Json5Object)):
+        yield _START
+        yield 1 + _trivia_length(node.leading_trivia_nodes)
+        lazy = node._lazy
+        if isinstance(lazy, _LazyContainerBody):
+            # The body includes the closing bracket
+            yield _count_chars(source, lazy.body_start, lazy.end)
+        elif lazy is not None:
+            yield len(lazy.body_source())
+        elif isinstance(node, Json5Array):
+            yield from node.members
+            yield 1
+        else:
+            for key, value in zip(node.keys, node.values):
+                yield key
+                yield value
+            yield 1
+        yield _END
+
+    yield _trivia_length(node.trailing_trivia_nodes)
+    if isinstance(node, Json5File):
+        yield _END
+
+
+def _trivia_length(trivia_nodes: Sequence[Json5Trivia]) -> int:
+    return sum(len(trivia.source) for trivia in trivia_nodes)
+
+
+def _count_chars(source: Buffer, start: int, end: int) -> int:
+    """Counts the characters in a slice of the source, without decoding it."""
+    count = 0
+    for chunk_start in range(start, end, _COUNT_CHUNK_SIZE):
+        chunk_end = min(end, chunk_start + _COUNT_CHUNK_SIZE)
+        chunk = bytes(source[chunk_start:chunk_end])
+        count += len(chunk.translate(None, _CONTINUATION_BYTES))
+    return count
@@ -0,0 +1,197 @@
+"""Caching parsed JSON5, in memory and optionally on disk."""
+from __future__ import annotations
+import hashlib
+import marshal
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from typing import Any, Callable, Hashable, NamedTuple, Union, cast
+
+from json5kit.nodes import Json5File
+from json5kit.parser import Json5Parser, Json5ValueParser
+from json5kit.serialize import dump_cst, load_cst
+
+# Bumped whenever the cache files change, so that stale ones are ignored.
+_DISK_FORMAT_VERSION = 3
+
+
+class Json5CacheStats(NamedTuple):
+    """How often a `Json5ParseCache` found what it was asked for."""
+
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+
+
+class Json5ParseCache:
+    """
+    Cache of parsed JSON5 documents, that keeps the `max_entries` most recently
+    used results in memory.
+
+    Sources are looked up by a hash of their contents, and files by their path,
+    modification time and size, so an unchanged file isn't even read. With a
+    `directory`, results are also stored in it by content hash, to be reused
+    after a restart: trees in the format of `dump_cst()`, and values with
+    `marshal`. Neither can run code when loaded, unlike pickles, but a cache
+    directory that others can write to still lets them change the results.
+
+    The cached trees and values are shared between everyone asking for the
+    same document, so they shouldn't be modified.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        directory: Union[str, os.PathLike[str], None] = None,
+        max_depth: int | None = None,
+        share_trivia: bool = False,
+    ) -> None:
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_depth = max_depth
+        self.share_trivia = share_trivia
+
+        self._entries: OrderedDict[Hashable, object] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def stats(self) -> Json5CacheStats:
+        return Json5CacheStats(
+            self._hits, self._disk_hits, self._misses, self._evictions
+        )
+
+    def parse(self, source: str) -> Json5File:
+        """Same as `json5kit.parse()`, but cached."""
+        tree = self._get_source(source, values=False)
+        assert isinstance(tree, Json5File)
+        return tree
+
+    def loads(self, source: str) -> object:
+        """Same as `json5kit.loads()`, but cached."""
+        return self._get_source(source, values=True)
+
+    def parse_file(self, path: Union[str, os.PathLike[str]]) -> Json5File:
+        """Parses a UTF-8 encoded JSON5 file, unless it hasn't changed."""
+        tree = self._get_file(path, values=False)
+        assert isinstance(tree, Json5File)
+        return tree
+
+    def load_file(self, path: Union[str, os.PathLike[str]]) -> object:
+        """Loads a UTF-8 encoded JSON5 file, unless it hasn't changed."""
+        return self._get_file(path, values=True)
+
+    def clear(self) -> None:
+        """Drops everything cached in memory, but not on disk."""
+        with self._lock:
+            self._entries.clear()
+
+    def _get_source(self, source: str, values: bool) -> object:
+        digest = self._digest(source, values)
+        return self._get(digest, lambda: self._load_or_parse(digest, source, values))
+
+    def _get_file(self, path: Union[str, os.PathLike[str]], values: bool) -> object:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size, values)
+
+        def read_and_parse() -> object:
+            with open(path, encoding="utf-8") as file:
+                source = file.read()
+            digest = self._digest(source, values)
+            return self._load_or_parse(digest, source, values)
+
+        return self._get(key, read_and_parse)
+
+    def _get(self, key: Hashable, compute: Callable[[], object]) -> object:
+        """Returns the cached result for `key`, or computes and caches it."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+
+        # Parsing happens outside the lock, so other documents aren't held up
+        result = compute()
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        return result
+
+    def _digest(self, source: str, values: bool) -> str:
+        """Hashes the source along with the options that change the result."""
+        options = (_DISK_FORMAT_VERSION, values, self.max_depth, self.share_trivia)
+        hasher = hashlib.blake2b(repr(options).encode(), digest_size=20)
+        hasher.update(source.encode("utf-8", "surrogatepass"))
+        return hasher.hexdigest()
+
+    def _load_or_parse(self, digest: str, source: str, values: bool) -> object:
+        """Loads the result from the cache directory, or parses the source."""
+        cache_path = None
+        if self.directory is not None:
+            extension = "marshal" if values else "cst"
+            cache_path = os.path.join(self.directory, f"{digest}.{extension}")
+            try:
+                with open(cache_path, "rb") as file:
+                    data = file.read()
+                result = marshal.loads(data) if values else load_cst(data)
+            except Exception:
+                # Missing, or not a file that we wrote: parse the source again
+                pass
+            else:
+                with self._lock:
+                    self._disk_hits += 1
+                return result
+
+        with self._lock:
+            self._misses += 1
+
+        if values:
+            result = Json5ValueParser(source, max_depth=self.max_depth).load()
+        else:
+            parser = Json5Parser(
+                source, max_depth=self.max_depth, share_trivia=self.share_trivia
+            )
+            result = parser.parse()
+
+        if cache_path is not None:
+            _write_cache_file(cache_path, result)
+
+        return result
+
+
+def _write_cache_file(cache_path: str, result: object) -> None:
+    """
+    Writes a result into the cache directory. The file is renamed into place
+    once it's complete, so that readers never see half of it.
+    """
+    if isinstance(result, Json5File):
+        data = dump_cst(result)
+    else:
+        try:
+            # Loaded values only ever hold types that marshal supports
+            data = marshal.dumps(cast(Any, result))
+        except ValueError:
+            # Too deeply nested to be marshalled, so it's loaded every time instead
+            return
+
+    directory = os.path.dirname(cache_path)
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, cache_path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
@@ -0,0 +1,267 @@
+"""Structural diffs between two CSTs, and patching trees with them."""
+from __future__ import annotations
+import difflib
+import sys
+
+from typing import Iterator, List, NamedTuple, Tuple, Union
+
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
+from json5kit.hashing import _entries, _escape_pointer_token, structural_hash
+from json5kit.nodes import (
+    Json5Array,
+    Json5Container,
+    Json5File,
+    Json5Node,
+    Json5Object,
+    _invalidate_structural_hashes,
+)
+from json5kit.query import _POINTER_INDEX_RE, _parse_pointer
+from json5kit.serialize import dump_cst, load_cst
+
+
+class Json5Edit(NamedTuple):
+    """
+    A single change in an edit script, same as an operation of a JSON Patch.
+
+    `path` is a JSON Pointer. Adding to an array inserts a member before the
+    given index, or at the end for an index of `-`. The `value` of additions
+    and replacements is a node, that's copied into the tree when it's applied.
+    """
+
+    op: Literal["add", "remove", "replace"]
+    path: str
+    value: Json5Node | None = None
+
+
+# Pairs of nodes to compare, by the JSON Pointer to where they are.
+_Comparison = Tuple[str, Json5Node, Json5Node]
+_DiffItem = Union[Json5Edit, _Comparison]
+
+
+def diff(old: Json5Node, new: Json5Node) -> list[Json5Edit]:
+    """
+    Returns the edits that turn the value of `old` into the value of `new`,
+    ignoring trivia and formatting. Applying them in order with
+    `apply_patch()` changes `old` to match `new`, but keeps its comments and
+    formatting everywhere else.
+
+    Objects are compared key by key, and arrays by finding the members that
+    were inserted or removed. Changed arrays and objects get looked into, to
+    find the smallest changes, and subtrees that are equal get skipped over by
+    comparing their hashes.
+    """
+    edits: list[Json5Edit] = []
+    # Nested containers are kept on an explicit stack instead of recursing
+    stack: list[Iterator[_DiffItem]] = [iter([("", old, new)])]
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, Json5Edit):
+                edits.append(item)
+                continue
+
+            pointer, old_node, new_node = item
+            if isinstance(old_node, Json5File):
+                old_node = old_node.value
+            if isinstance(new_node, Json5File):
+                new_node = new_node.value
+            if structural_hash(old_node) == structural_hash(new_node):
+                continue
+
+            if isinstance(old_node, Json5Object) and isinstance(new_node, Json5Object):
+                stack.append(_diff_objects(pointer, old_node, new_node))
+                break
+            if isinstance(old_node, Json5Array) and isinstance(new_node, Json5Array):
+                stack.append(_diff_arrays(pointer, old_node, new_node))
+                break
+
+            edits.append(Json5Edit("replace", pointer, new_node))
+        else:
+            stack.pop()
+
+    return edits
+
+
+def _diff_objects(
+    pointer: str, old: Json5Object, new: Json5Object
+) -> Iterator[_DiffItem]:
+    old_entries = _entries(old)
+    new_entries = _entries(new)
+    for key, old_value in old_entries.items():
+        key_pointer = pointer + "/" + _escape_pointer_token(key)
+        new_value = new_entries.get(key)
+        if new_value is None:
+            yield Json5Edit("remove", key_pointer)
+        else:
+            yield key_pointer, old_value, new_value
+
+    for key, new_value in new_entries.items():
+        if key not in old_entries:
+            key_pointer = pointer + "/" + _escape_pointer_token(key)
+            yield Json5Edit("add", key_pointer, new_value)
+
+
+def _diff_arrays(pointer: str, old: Json5Array, new: Json5Array) -> Iterator[_DiffItem]:
+    """
+    Matches up the members of both arrays by their hashes. The edits come in
+    order, and their indexes are where the members are at that point, after
+    the edits before them are applied.
+    """
+    old_members = old.members
+    new_members = new.members
+    old_hashes = list(map(structural_hash, old_members))
+    new_hashes = list(map(structural_hash, new_members))
+
+    # Most changes only touch a few members, so the members that are the same
+    # at both ends are skipped before looking for the inserted ones.
+    prefix = 0
+    max_prefix = min(len(old_hashes), len(new_hashes))
+    while prefix < max_prefix and old_hashes[prefix] == new_hashes[prefix]:
+        prefix += 1
+    suffix = 0
+    max_suffix = max_prefix - prefix
+    while suffix < max_suffix and old_hashes[-suffix - 1] == new_hashes[-suffix - 1]:
+        suffix += 1
+
+    matcher = difflib.SequenceMatcher(
+        None,
+        old_hashes[prefix : len(old_hashes) - suffix],
+        new_hashes[prefix : len(new_hashes) - suffix],
+        autojunk=False,
+    )
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+
+        old_start += prefix
+        new_start += prefix
+        removed = old_end - old_start + prefix
+        added = new_end - new_start + prefix
+        # The new members before this point are in place by now
+        index = new_start
+
+        # Members that got replaced are looked into, to find what changed
+        paired = min(removed, added) if tag == "replace" else 0
+        for offset in range(paired):
+            yield (
+                f"{pointer}/{index + offset}",
+                old_members[old_start + offset],
+                new_members[new_start + offset],
+            )
+
+        index += paired
+        for _ in range(removed - paired):
+            yield Json5Edit("remove", f"{pointer}/{index}")
+        for new_index in range(new_start + paired, new_start + added):
+            yield Json5Edit("add", f"{pointer}/{index}", new_members[new_index])
+            index += 1
+
+
+def apply_patch(tree: Json5Node, patch: List[Json5Edit]) -> None:
+    """
+    Applies edits from `diff()` to a tree in place, in order.
+
+    Entries and members that are added get a comma and indentation like the
+    ones around them, and replaced values keep the trivia of the values they
+    replace, so the comments and formatting of the rest of the tree stay as
+    they are. Raises KeyError for a path that doesn't exist in the tree.
+    """
+    for edit in patch:
+        tokens = _parse_pointer(edit.path)
+        value = None if edit.value is None else _copy_node(edit.value)
+        if edit.op != "remove" and value is None:
+            raise ValueError(f"Missing value for {edit.op!r} at {edit.path!r}")
+
+        if not tokens:
+            if edit.op != "replace" or not isinstance(tree, Json5File):
+                raise ValueError(f"Cannot {edit.op} the root of {type(tree).__name__}")
+            assert value is not None
+            value.trailing_trivia_nodes = tree.value.trailing_trivia_nodes
+            tree.value = value
+            _invalidate_structural_hashes()
+            continue
+
+        parent = _resolve_parent(tree, tokens[:-1], edit.path)
+        key = tokens[-1]
+        if isinstance(parent, Json5Object):
+            _apply_to_object(parent, key, edit, value)
+        elif isinstance(parent, Json5Array):
+            _apply_to_array(parent, key, edit, value)
+        else:
+            raise KeyError(edit.path)
+
+
+def _apply_to_object(
+    parent: Json5Object, key: str, edit: Json5Edit, value: Json5Node | None
+) -> None:
+    if edit.op != "add" and key not in parent:
+        raise KeyError(edit.path)
+
+    if edit.op == "remove":
+        parent.delete(key)
+    else:
+        assert value is not None
+        # Takes over the trivia of the value it replaces, if there's one
+        value.trailing_trivia_nodes = []
+        parent.set(key, value)
+
+
+def _apply_to_array(
+    parent: Json5Array, token: str, edit: Json5Edit, value: Json5Node | None
+) -> None:
+    members = parent.members
+    if edit.op == "add" and token == "-":
+        index = len(members)
+    elif _POINTER_INDEX_RE.fullmatch(token):
+        index = int(token)
+    else:
+        raise KeyError(edit.path)
+
+    last_index = len(members) if edit.op == "add" else len(members) - 1
+    if index > last_index:
+        raise KeyError(edit.path)
+
+    if edit.op == "remove":
+        parent.delete(index)
+    elif edit.op == "add":
+        assert value is not None
+        parent.insert(index, value)
+    else:
+        assert value is not None
+        value.trailing_trivia_nodes = members[index].trailing_trivia_nodes
+        members[index] = value
+        _invalidate_structural_hashes()
+
+
+def _resolve_parent(
+    tree: Json5Node, tokens: tuple[str, ...], pointer: str
+) -> Json5Container:
+    """Returns the container that the given tokens lead to."""
+    node = tree
+    if isinstance(node, Json5File):
+        node = node.value
+
+    for token in tokens:
+        child: Json5Node | None = None
+        if isinstance(node, Json5Object):
+            child = node.get(token)
+        elif isinstance(node, Json5Array) and _POINTER_INDEX_RE.fullmatch(token):
+            members = node.members
+            if int(token) < len(members):
+                child = members[int(token)]
+        if child is None:
+            raise KeyError(pointer)
+        node = child
+
+    if not isinstance(node, Json5Container):
+        raise KeyError(pointer)
+    return node
+
+
+def _copy_node(node: Json5Node) -> Json5Node:
+    """Copies a node along with everything inside of it, however deep."""
+    copied_file = load_cst(dump_cst(Json5File(node, [], [])))
+    return copied_file.value
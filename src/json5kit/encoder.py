@@ -0,0 +1,279 @@
+"""Writing Python objects out as JSON5 text, without building a CST."""
+from __future__ import annotations
+import math
+import re
+import sys
+from decimal import Decimal
+
+from typing import IO, Any, Iterator
+
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
+from json5kit.nodes import _is_identifier_key
+
+# Characters that can't be written into a string as they are: the quote, the
+# backslash, and the line terminators, along with the control characters that
+# have a short escape sequence.
+_ESCAPE_RE = {
+    '"': re.compile(r'["\\\n\r\t\x08\x0c\x0b]'),
+    "'": re.compile(r"['\\\n\r\t\x08\x0c\x0b]"),
+}
+_ESCAPE_TABLE = {
+    quote_char: str.maketrans(
+        {
+            quote_char: "\\" + quote_char,
+            "\\": "\\\\",
+            "\n": "\\n",
+            "\r": "\\r",
+            "\t": "\\t",
+            "\b": "\\b",
+            "\f": "\\f",
+            "\v": "\\v",
+        }
+    )
+    for quote_char in ('"', "'")
+}
+
+_SCALAR_TYPES = {str, int, float, bool, type(None)}
+
+# How many chunks are joined together before they're handed out.
+_CHUNKS_PER_WRITE = 4096
+
+
+class _Json5Encoder:
+    """Converts Python objects into chunks of JSON5 source."""
+
+    def __init__(
+        self,
+        indent: int | str | None,
+        quote_keys: bool,
+        trailing_commas: bool,
+        quote_style: Literal['"', "'"],
+    ) -> None:
+        if quote_style not in _ESCAPE_RE:
+            raise ValueError(f"Unsupported quote style: {quote_style!r}")
+
+        if isinstance(indent, int):
+            indent = " " * indent
+        self.indent = indent
+        self.quote_keys = quote_keys
+        self.trailing_commas = trailing_commas and indent is not None
+        self.quote_char = quote_style
+        self.escape_re = _ESCAPE_RE[quote_style]
+        self.escape_table = _ESCAPE_TABLE[quote_style]
+        # Objects in a list tend to have the same keys, so they're written once
+        self.key_cache: dict[str, str] = {}
+
+    def quote(self, value: str) -> str:
+        quote_char = self.quote_char
+        if self.escape_re.search(value) is None:
+            return quote_char + value + quote_char
+
+        return quote_char + value.translate(self.escape_table) + quote_char
+
+    def encode_scalar(self, value: object) -> str:
+        if isinstance(value, str):
+            return self.quote(value)
+        if value is None:
+            return "null"
+        if value is True:
+            return "true"
+        if value is False:
+            return "false"
+        if isinstance(value, int):
+            return int.__repr__(value)
+        if isinstance(value, float):
+            return _encode_float(value)
+
+        raise TypeError(
+            f"Object of type {type(value).__name__} is not JSON5 serializable"
+        )
+
+    def encode_key(self, key: object) -> str:
+        if isinstance(key, str):
+            # Only strings are cached, as `True`, `1` and `1.0` are the same key
+            encoded_key = self.key_cache.get(key)
+            if encoded_key is None:
+                if not self.quote_keys and _is_identifier_key(key):
+                    encoded_key = key
+                else:
+                    encoded_key = self.quote(key)
+                self.key_cache[key] = encoded_key
+            return encoded_key
+
+        if isinstance(key, (int, float, bool)) or key is None:
+            # Like `json.dumps()`, these keys are turned into strings
+            return self.encode_key(self.encode_scalar(key))
+
+        raise TypeError(
+            f"Keys must be str, int, float, bool or None, not {type(key).__name__}"
+        )
+
+    def encode_scalars(
+        self, values: list[Any] | tuple[Any, ...], types: set[type]
+    ) -> list[str]:
+        """Encodes a list of scalars, with faster paths for lists of one type."""
+        if types == {int}:
+            return list(map(int.__repr__, values))
+        if types == {str}:
+            return list(map(self.quote, values))
+
+        return list(map(self.encode_scalar, values))
+
+    def iter_encode(self, obj: object) -> Iterator[str]:
+        """
+        Yields the JSON5 source of an object in chunks.
+
+        Nested lists and dicts are kept on an explicit stack instead of
+        recursing into them, so deeply nested objects can be written as well.
+        """
+        indent = self.indent
+        item_separator = ", " if indent is None else ","
+        chunks: list[str] = []
+        stack: list[_Level] = []
+        container_ids: set[int] = set()
+
+        def add_value(value: object) -> None:
+            """Adds a scalar or a flat list, or opens a new level for a container."""
+            if not isinstance(value, (dict, list, tuple)):
+                chunks.append(self.encode_scalar(value))
+                return
+
+            if not value:
+                chunks.append("{}" if isinstance(value, dict) else "[]")
+                return
+
+            container_id = id(value)
+            if container_id in container_ids:
+                raise ValueError("Circular reference detected")
+
+            if not isinstance(value, dict):
+                types = set(map(type, value))
+                if types <= _SCALAR_TYPES:
+                    add_scalars(value, types)
+                    return
+
+            container_ids.add(container_id)
+            stack.append(_Level(value, container_id))
+            chunks.append("{" if isinstance(value, dict) else "[")
+
+        def add_scalars(values: list[Any] | tuple[Any, ...], types: set[type]) -> None:
+            """
+            Adds a list of scalars in one go, as it's the most common kind of
+            list by far.
+            """
+            members = self.encode_scalars(values, types)
+            if indent is None:
+                chunks.append("[" + ", ".join(members) + "]")
+                return
+
+            newline = "\n" + indent * len(stack)
+            chunks.append("[" + newline + indent)
+            chunks.append(("," + newline + indent).join(members))
+            chunks.append(("," if self.trailing_commas else "") + newline + "]")
+
+        add_value(obj)
+        while stack:
+            level = stack[-1]
+            depth = len(stack)
+            newline = "" if indent is None else "\n" + indent * depth
+            for item in level.items:
+                if level.is_first:
+                    level.is_first = False
+                    chunks.append(newline)
+                else:
+                    chunks.append(item_separator + newline)
+
+                if level.is_object:
+                    key, value = item
+                    chunks.append(self.encode_key(key) + ": ")
+                else:
+                    value = item
+
+                add_value(value)
+                if len(stack) > depth:
+                    break
+            else:
+                stack.pop()
+                container_ids.discard(level.container_id)
+                if indent is not None:
+                    trailing_comma = "," if self.trailing_commas else ""
+                    chunks.append(trailing_comma + "\n" + indent * (depth - 1))
+                chunks.append("}" if level.is_object else "]")
+
+            if len(chunks) >= _CHUNKS_PER_WRITE:
+                yield "".join(chunks)
+                chunks.clear()
+
+        yield "".join(chunks)
+
+
+def _encode_float(value: float) -> str:
+    """
+    Writes a float so that it loads back as the same float. The parser doesn't
+    support exponents, NaN or Infinity, so exponents are written out in full,
+    and like `json.dumps(allow_nan=False)`, NaN and Infinity are rejected.
+    """
+    source = float.__repr__(value)
+    if "e" not in source:
+        if not math.isfinite(value):
+            raise ValueError(f"Out of range float values can't be written: {source}")
+        return source
+
+    # The digits of `repr()` are the shortest ones that load as the same float
+    source = format(Decimal(source), "f")
+    return source if "." in source else source + ".0"
+
+
+class _Level:
+    """A dict or list that is being written, with the items that are left."""
+
+    __slots__ = ("items", "is_object", "container_id", "is_first")
+
+    def __init__(
+        self,
+        container: dict[object, object] | list[object] | tuple[object, ...],
+        container_id: int,
+    ) -> None:
+        self.is_object = isinstance(container, dict)
+        self.items: Iterator[Any] = iter(
+            container.items() if isinstance(container, dict) else container
+        )
+        self.container_id = container_id
+        self.is_first = True
+
+
+def dumps(
+    obj: object,
+    indent: int | str | None = None,
+    quote_keys: bool = False,
+    trailing_commas: bool = False,
+    quote_style: Literal['"', "'"] = '"',
+) -> str:
+    """
+    Writes Python objects as JSON5 source, without building a CST.
+
+    With an `indent`, every member of a list or dict goes on its own line, and
+    `trailing_commas=True` adds a comma after the last one too. Keys are left
+    unquoted where possible, unless `quote_keys=True`. Strings are quoted with
+    `quote_style`, either double or single quotes.
+    """
+    encoder = _Json5Encoder(indent, quote_keys, trailing_commas, quote_style)
+    return "".join(encoder.iter_encode(obj))
+
+
+def dump(
+    obj: object,
+    fp: IO[str],
+    indent: int | str | None = None,
+    quote_keys: bool = False,
+    trailing_commas: bool = False,
+    quote_style: Literal['"', "'"] = '"',
+) -> None:
+    """Same as `dumps()`, but writes the source to a file object in chunks."""
+    encoder = _Json5Encoder(indent, quote_keys, trailing_commas, quote_style)
+    for chunk in encoder.iter_encode(obj):
+        fp.write(chunk)
@@ -0,0 +1,202 @@
+"""Event based parsing, that reports the tokens of JSON5 without building a CST."""
+from __future__ import annotations
+import sys
+
+from typing import IO, Callable, Iterator, NamedTuple, TypeVar, Union
+
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
+from json5kit.nodes import (
+    Json5Comma,
+    Json5Comment,
+    Json5Key,
+    Json5Node,
+    Json5Number,
+    Json5Primitive,
+    Json5Trivia,
+)
+from json5kit.stream import Json5StreamParser
+
+Json5EventType = Literal[
+    "start_object",
+    "key",
+    "end_object",
+    "start_array",
+    "end_array",
+    "value",
+    "comment",
+    "whitespace",
+]
+
+_T = TypeVar("_T")
+
+
+class Json5Event(NamedTuple):
+    """
+    A single token of a JSON5 document.
+
+    `value` is the key for "key" events, the Python value of the primitive for
+    "value" events (the same as `json5kit.loads()` gives), the source of the
+    trivia for "comment" and "whitespace" events, and None for the start and
+    end of arrays and objects.
+    """
+
+    type: Json5EventType
+    value: object
+    start: int
+    end: int
+
+
+class _Json5EventParser(Json5StreamParser):
+    """
+    Stream parser that records an event for every token it parses, and drops
+    the members of arrays and objects instead of building them.
+    """
+
+    def __init__(self, max_depth: int | None = None, trivia: bool = False) -> None:
+        super().__init__(max_depth=max_depth)
+        self.events: list[Json5Event] = []
+        self._trivia = trivia
+        self._step_start = 0
+
+    def _step(self) -> bool:
+        done = super()._step()
+        if self._stack:
+            # The events have already been recorded, so the members aren't needed
+            frame = self._stack[-1]
+            frame.members.clear()
+            frame.entries.clear()
+
+        return done
+
+    def _attempt(
+        self,
+        parse_step: Callable[[], _T],
+        undo: Callable[[], None] | None = None,
+    ) -> tuple[bool, _T]:
+        event_count = len(self.events)
+        self._step_start = self._position.index + self._parser.current
+        done, result = super()._attempt(parse_step, undo)
+        if not done:
+            del self.events[event_count:]
+
+        return done, result
+
+    def _add_trivia(self, trivia_nodes: list[Json5Trivia], start: int) -> None:
+        """Records the events for a run of trivia starting at `start`."""
+        if not self._trivia:
+            return
+
+        for trivia in trivia_nodes:
+            end = start + len(trivia.source)
+            if isinstance(trivia, Json5Comment):
+                self.events.append(Json5Event("comment", trivia.source, start, end))
+            elif not isinstance(trivia, Json5Comma):
+                self.events.append(Json5Event("whitespace", trivia.source, start, end))
+            start = end
+
+    def _parse_leading_trivia(self) -> list[Json5Trivia]:
+        trivia_nodes = super()._parse_leading_trivia()
+        self._add_trivia(trivia_nodes, self._step_start)
+        return trivia_nodes
+
+    def _parse_separator(self, node: Json5Node, closing_char: str) -> None:
+        trivia_count = len(node.trailing_trivia_nodes)
+        super()._parse_separator(node, closing_char)
+        self._add_trivia(node.trailing_trivia_nodes[trivia_count:], self._step_start)
+
+    def _parse_value_start(self) -> Json5Node | None:
+        stack_size = len(self._stack)
+        node = super()._parse_value_start()
+        if isinstance(node, Json5Primitive):
+            assert node.start is not None and node.end is not None
+            value = node.value
+            # Same as `json5kit.loads()`, numbers without a decimal point are ints
+            if isinstance(node, Json5Number) and "." not in node.source:
+                value = int(node.source)
+            self.events.append(Json5Event("value", value, node.start, node.end))
+            self._add_trivia(node.trailing_trivia_nodes, node.end)
+        elif len(self._stack) > stack_size:
+            frame = self._stack[-1]
+            event_type: Json5EventType
+            event_type = "start_array" if frame.closing_char == "]" else "start_object"
+            self.events.append(
+                Json5Event(event_type, None, frame.start, frame.start + 1)
+            )
+            self._add_trivia(frame.leading_trivia_nodes, frame.start + 1)
+
+        return node
+
+    def _parse_object_key(self) -> Json5Key:
+        key = super()._parse_object_key()
+        key_value = key.value
+        assert key_value.start is not None and key_value.end is not None
+        self.events.append(
+            Json5Event("key", key_value.value, key_value.start, key_value.end)
+        )
+        self._add_trivia(key_value.trailing_trivia_nodes, key_value.end)
+        assert key.end is not None
+        self._add_trivia(key.trailing_trivia_nodes, key.end)
+        return key
+
+    def _parse_container_end(self) -> tuple[int, list[Json5Trivia]]:
+        # Unterminated containers are closed at the end of the source
+        has_bracket = not self._parser.scanned
+        end, trailing_trivia_nodes = super()._parse_container_end()
+        start = end - 1 if has_bracket else end
+        event_type: Json5EventType
+        event_type = (
+            "end_array" if self._stack[-1].closing_char == "]" else "end_object"
+        )
+        self.events.append(Json5Event(event_type, None, start, end))
+        self._add_trivia(trailing_trivia_nodes, end)
+        return end, trailing_trivia_nodes
+
+    def _parse_end(self) -> list[Json5Trivia]:
+        trailing_trivia_nodes = super()._parse_end()
+        self._add_trivia(trailing_trivia_nodes, self._step_start)
+        return trailing_trivia_nodes
+
+
+def iterparse(
+    source: Union[str, bytes, IO[str], IO[bytes]],
+    trivia: bool = False,
+    max_depth: int | None = None,
+    chunk_size: int = 65536,
+) -> Iterator[Json5Event]:
+    """
+    Yields the events of a JSON5 document as it's parsed, without building a
+    CST. The source can be a string, UTF-8 encoded bytes, or a file object.
+
+    The source is parsed `chunk_size` characters (or bytes) at a time, so only
+    the events of one chunk are kept in memory at once. With `trivia=True`,
+    "comment" and "whitespace" events are yielded too. Offsets are counted in
+    characters, even for bytes sources.
+    """
+    parser = _Json5EventParser(max_depth=max_depth, trivia=trivia)
+    for chunk in _iter_chunks(source, chunk_size):
+        parser.feed(chunk)
+        yield from parser.events
+        parser.events.clear()
+
+    parser.close()
+    yield from parser.events
+
+
+def _iter_chunks(
+    source: Union[str, bytes, IO[str], IO[bytes]], chunk_size: int
+) -> Iterator[Union[str, bytes]]:
+    if isinstance(source, (str, bytes)):
+        for index in range(0, len(source), chunk_size):
+            yield source[index : index + chunk_size]
+        return
+
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+
+        yield chunk
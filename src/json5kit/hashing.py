@@ -0,0 +1,260 @@
+"""Hashing the structure of CSTs, to compare them and find what changed."""
+from __future__ import annotations
+import hashlib
+
+from typing import Any, Callable, Union
+
+from json5kit import nodes
+from json5kit.nodes import (
+    Json5Array,
+    Json5Boolean,
+    Json5Container,
+    Json5File,
+    Json5Identifier,
+    Json5Node,
+    Json5Null,
+    Json5Number,
+    Json5Object,
+    Json5String,
+)
+
+_DIGEST_SIZE = 16
+
+_Structure = Union[Json5Array, Json5Object]
+
+
+def structural_hash(node: Json5Node) -> bytes:
+    """
+    Returns a hash of the value of a node, that ignores trivia and formatting.
+
+    Two nodes have the same hash when `json5kit.loads()` would load them into
+    equal values: the order of the keys in an object doesn't matter, a key
+    that appears more than once only counts with its last value, and quoted
+    and unquoted keys are the same.
+
+    Every array and object keeps its hash once computed, so comparing the
+    hashes again is instant, until the next change to any tree. Changes made
+    with the methods of the nodes, a `Json5Transformer`, `json5kit.reparse()`
+    or `json5kit.apply_patch()` are picked up on their own, but changing the
+    lists of a node directly requires calling `invalidate_hashes()`.
+    """
+    if isinstance(node, Json5File):
+        node = node.value
+    if not isinstance(node, (Json5Array, Json5Object)):
+        return _digest(_encode_primitive(node))
+
+    generation = nodes._hash_generation
+    if _has_current_hash(node, generation):
+        assert node._structural_hash is not None
+        return node._structural_hash
+
+    # Children are hashed before their parents, on an explicit stack instead of
+    # recursing into them, so the nesting depth isn't limited.
+    stack: list[tuple[_Structure, bool]] = [(node, False)]
+    encoded_keys: dict[str, bytes] = {}
+    while stack:
+        container, children_hashed = stack.pop()
+        if children_hashed:
+            container._structural_hash = _hash_container(container, encoded_keys)
+            container._structural_hash_generation = generation
+            continue
+
+        stack.append((container, True))
+        for child in _children(container):
+            if not isinstance(child, (Json5Array, Json5Object)):
+                continue
+            if not _has_current_hash(child, generation):
+                stack.append((child, False))
+
+    assert node._structural_hash is not None
+    return node._structural_hash
+
+
+def structurally_equal(node: Json5Node, other: Json5Node) -> bool:
+    """Returns True if both nodes have the same value, see `structural_hash()`."""
+    return structural_hash(node) == structural_hash(other)
+
+
+def find_changes(old: Json5Node, new: Json5Node) -> list[str]:
+    """
+    Returns JSON Pointers to the smallest parts of `old` that differ in `new`,
+    in the order they appear.
+
+    Only the arrays and objects with different hashes are looked into, so a
+    single change in a large tree is found by following the path down to it.
+    Array members are compared by position, so inserting a member shows up as
+    a change to every member after it.
+    """
+    changes: list[str] = []
+    # A missing node stands for a key or member that only one of them has
+    stack: list[tuple[str, Json5Node | None, Json5Node | None]] = [("", old, new)]
+    while stack:
+        pointer, old_node, new_node = stack.pop()
+        if old_node is None or new_node is None:
+            changes.append(pointer)
+            continue
+
+        if isinstance(old_node, Json5File):
+            old_node = old_node.value
+        if isinstance(new_node, Json5File):
+            new_node = new_node.value
+        if structural_hash(old_node) == structural_hash(new_node):
+            continue
+
+        if isinstance(old_node, Json5Object) and isinstance(new_node, Json5Object):
+            old_entries = _entries(old_node)
+            new_entries = _entries(new_node)
+            added_keys = [key for key in new_entries if key not in old_entries]
+            for key in reversed([*old_entries, *added_keys]):
+                stack.append(
+                    (
+                        pointer + "/" + _escape_pointer_token(key),
+                        old_entries.get(key),
+                        new_entries.get(key),
+                    )
+                )
+
+        elif isinstance(old_node, Json5Array) and isinstance(new_node, Json5Array):
+            old_members: list[Json5Node | None] = [*old_node.members]
+            new_members: list[Json5Node | None] = [*new_node.members]
+            length = max(len(old_members), len(new_members))
+            old_members.extend([None] * (length - len(old_members)))
+            new_members.extend([None] * (length - len(new_members)))
+            for index in reversed(range(length)):
+                stack.append(
+                    (f"{pointer}/{index}", old_members[index], new_members[index])
+                )
+
+        else:
+            changes.append(pointer)
+
+    return changes
+
+
+def invalidate_hashes(node: Json5Node) -> None:
+    """
+    Makes the hashes kept by every array and object outdated, after changing
+    the lists of a node directly, and drops the ones kept in `node`.
+    """
+    nodes._invalidate_structural_hashes()
+    stack = [node]
+    while stack:
+        container = stack.pop()
+        if isinstance(container, Json5Container):
+            container._structural_hash = None
+        if isinstance(container, Json5File):
+            stack.append(container.value)
+        elif isinstance(container, (Json5Array, Json5Object)):
+            # Lazily parsed containers haven't been hashed yet
+            if container._lazy is None:
+                stack.extend(_children(container))
+
+
+def _has_current_hash(container: Json5Container, generation: int) -> bool:
+    return (
+        container._structural_hash is not None
+        and container._structural_hash_generation == generation
+    )
+
+
+def _escape_pointer_token(key: str) -> str:
+    """Escapes a key to be used as part of a JSON Pointer."""
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=_DIGEST_SIZE).digest()
+
+
+def _children(container: _Structure) -> list[Json5Node]:
+    if isinstance(container, Json5Array):
+        return container.members
+    return container.values
+
+
+def _entries(node: Json5Object) -> dict[str, Json5Node]:
+    # Later duplicates overwrite the earlier ones
+    return {key.value.value: value for key, value in zip(node.keys, node.values)}
+
+
+def _hash_container(container: _Structure, encoded_keys: dict[str, bytes]) -> bytes:
+    """
+    Hashes an array or object whose nested containers are hashed already.
+    Keys tend to repeat, so they're only encoded once for every `encoded_keys`.
+    """
+    encoders = _ENCODERS
+    if isinstance(container, Json5Array):
+        chunks = [b"["]
+        for member in container.members:
+            encode = encoders.get(member.__class__) or _get_encoder(member)
+            chunks.append(encode(member))
+    else:
+        chunks = [b"{"]
+        entries = _entries(container)
+        for key in sorted(entries):
+            encoded_key = encoded_keys.get(key)
+            if encoded_key is None:
+                encoded_key = encoded_keys[key] = _encode_string(key)
+            value = entries[key]
+            encode = encoders.get(value.__class__) or _get_encoder(value)
+            chunks.append(encoded_key)
+            chunks.append(encode(value))
+
+    return _digest(b"".join(chunks))
+
+
+def _encode_primitive(node: Json5Node) -> bytes:
+    """
+    Encodes a primitive value into bytes, so that no two values get the same
+    bytes, and no value's bytes are the start of another one's.
+    """
+    encode = _ENCODERS.get(node.__class__) or _get_encoder(node)
+    return encode(node)
+
+
+def _encode_number(node: Json5Number) -> bytes:
+    """
+    Encodes a number the way `json5kit.loads()` would load it: as an exact int
+    if there's no decimal point, or else as a float. Floats that equal an int,
+    including negative zero, are encoded as that int, as they load as equal.
+    """
+    value: int | float = node.value
+    if "." not in node.source:
+        try:
+            value = int(node.source)
+        except ValueError:
+            pass
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return b"n" + repr(value).encode() + b";"
+
+
+def _encode_string(string: str) -> bytes:
+    data = string.encode("utf-8", "surrogatepass")
+    return b"%d:" % len(data) + data
+
+
+def _encode_hashed(node: _Structure) -> bytes:
+    assert node._structural_hash is not None
+    return b"h" + node._structural_hash
+
+
+_ENCODERS: dict[type, Callable[[Any], bytes]] = {
+    Json5Number: _encode_number,
+    Json5String: lambda node: b"s" + _encode_string(node.value),
+    Json5Boolean: lambda node: b"t" if node.value else b"f",
+    Json5Null: lambda node: b"z",
+    Json5Identifier: lambda node: b"i" + _encode_string(node.value),
+    Json5Array: _encode_hashed,
+    Json5Object: _encode_hashed,
+}
+
+
+def _get_encoder(node: Json5Node) -> Callable[[Any], bytes]:
+    """Finds the encoder of a subclass of the nodes, and remembers it."""
+    for base in type(node).__mro__:
+        if base in _ENCODERS:
+            encoder = _ENCODERS[type(node)] = _ENCODERS[base]
+            return encoder
+
+    raise TypeError(f"Cannot hash {type(node).__name__}")
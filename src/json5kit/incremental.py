@@ -0,0 +1,180 @@
+"""Incremental reparsing of JSON5 trees after an edit to their source."""
+from __future__ import annotations
+
+from typing import List, Tuple, Union
+
+from json5kit.nodes import (
+    Json5Array,
+    Json5Container,
+    Json5File,
+    Json5Node,
+    Json5Object,
+    Json5Primitive,
+    _invalidate_structural_hashes,
+)
+from json5kit.parser import Json5ParseError, Json5Parser
+from json5kit.spans import shift_offsets
+
+_Collection = Union[Json5Array, Json5Object]
+# Each enclosing container, along with its parent and its index in the parent.
+_Path = List[Tuple[_Collection, Json5Container, int]]
+
+
+def reparse(
+    tree: Json5File,
+    edit_start: int,
+    edit_end: int,
+    new_text: str,
+) -> Json5File:
+    """
+    Updates `tree` after `source[edit_start:edit_end]` is replaced with
+    `new_text`, where `source` is the text that the tree was parsed from.
+
+    Only the smallest array or object that contains the edit is parsed again,
+    and every other node of the tree is reused. If the edited container doesn't
+    parse on its own, for example because a bracket or a quote was added, the
+    containers around it are tried next, up to the whole file.
+
+    The offsets of the nodes have to match the source, so the tree must not be
+    modified in between parsing it and reparsing it. The tree is updated in
+    place, and returned.
+    """
+    if tree.end is None:
+        raise ValueError("Only trees created by a parser can be reparsed")
+
+    if not 0 <= edit_start <= edit_end <= tree.end:
+        raise ValueError(f"Edit range {edit_start}:{edit_end} is out of bounds")
+
+    delta = len(new_text) - (edit_end - edit_start)
+    path = _find_enclosing_containers(tree, edit_start, edit_end)
+
+    for depth in reversed(range(len(path))):
+        container, parent, index = path[depth]
+        assert container.start is not None
+
+        old_source = _source_without_trailing_trivia(container)
+        relative_start = edit_start - container.start
+        relative_end = edit_end - container.start
+        new_source = old_source[:relative_start] + new_text + old_source[relative_end:]
+
+        new_container = _parse_container(new_source)
+        if new_container is None:
+            continue
+
+        new_container.trailing_trivia_nodes = container.trailing_trivia_nodes
+        shift_offsets([new_container], container.start)
+        _replace_child(parent, index, new_container)
+
+        # Everything that comes after the edited container moves by `delta`
+        for _, ancestor, child_index in path[: depth + 1]:
+            shift_offsets(_children_after(ancestor, child_index), delta)
+            assert ancestor.end is not None
+            ancestor.end += delta
+
+        _invalidate_structural_hashes()
+        return tree
+
+    source = tree.to_source()
+    new_tree = Json5Parser(source[:edit_start] + new_text + source[edit_end:]).parse()
+    tree.value = new_tree.value
+    tree.leading_trivia_nodes = new_tree.leading_trivia_nodes
+    tree.trailing_trivia_nodes = new_tree.trailing_trivia_nodes
+    tree.end = new_tree.end
+    _invalidate_structural_hashes()
+    return tree
+
+
+def _find_enclosing_containers(
+    tree: Json5File,
+    edit_start: int,
+    edit_end: int,
+) -> _Path:
+    """Returns the arrays and objects whose brackets surround the edit."""
+    path: _Path = []
+    parent: Json5Container = tree
+    index = 0
+    node = tree.value
+
+    while isinstance(node, (Json5Array, Json5Object)):
+        if node.start is None or node.end is None:
+            raise ValueError("Only trees created by a parser can be reparsed")
+
+        if not (node.start < edit_start and edit_end < node.end):
+            break
+
+        path.append((node, parent, index))
+        children = node.members if isinstance(node, Json5Array) else node.values
+        index = _last_child_starting_before(children, edit_start)
+        if index < 0:
+            break
+
+        parent = node
+        node = children[index]
+
+    return path
+
+
+def _last_child_starting_before(children: list[Json5Node], position: int) -> int:
+    """Binary searches for the last child that starts before `position`."""
+    low, high = 0, len(children)
+    while low < high:
+        middle = (low + high) // 2
+        start = _start_of(children[middle])
+        if start < position:
+            low = middle + 1
+        else:
+            high = middle
+
+    return low - 1
+
+
+def _start_of(node: Json5Node) -> int:
+    start = node.start if isinstance(node, (Json5Primitive, Json5Container)) else None
+    if start is None:
+        raise ValueError("Only trees created by a parser can be reparsed")
+
+    return start
+
+
+def _source_without_trailing_trivia(container: Json5Container) -> str:
+    source = container.to_source()
+    trailing_size = sum(len(trivia.source) for trivia in container.trailing_trivia_nodes)
+    return source[: len(source) - trailing_size]
+
+
+def _parse_container(source: str) -> Json5Node | None:
+    """
+    Parses an array or object, and returns None if the source isn't exactly one
+    well formed array or object.
+    """
+    parser = Json5Parser(source)
+    try:
+        node = parser.parse_node()
+    except (Json5ParseError, ValueError):
+        return None
+
+    # An unterminated container also stops at the end of the source, so ensure
+    # that the closing bracket was actually there.
+    if not parser.scanned or node.to_source() != source:
+        return None
+
+    return node
+
+
+def _replace_child(parent: Json5Container, index: int, node: Json5Node) -> None:
+    if isinstance(parent, Json5File):
+        parent.value = node
+    elif isinstance(parent, Json5Array):
+        parent.members[index] = node
+    else:
+        assert isinstance(parent, Json5Object)
+        parent.values[index] = node
+
+
+def _children_after(parent: Json5Container, index: int) -> list[Json5Node]:
+    if isinstance(parent, Json5Array):
+        return parent.members[index + 1 :]
+    if isinstance(parent, Json5Object):
+        return [*parent.keys[index + 1 :], *parent.values[index + 1 :]]
+
+    return []
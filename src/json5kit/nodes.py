@@ -1,7 +1,10 @@
 from __future__ import annotations
+import io
+import json
+import re
 import sys
 
-from typing import TYPE_CHECKING
+from typing import IO, TYPE_CHECKING, ClassVar, Iterator, TypeVar, Union
 
 if TYPE_CHECKING:
     from typing import Self
@@ -12,10 +15,29 @@ else:
     from typing_extensions import Protocol, Self, runtime_checkable
 
 
+# The rest of a key that can be written without quotes, after its first character.
+_IDENTIFIER_REST_RE = re.compile(r"\w*")
+
+# Bumped by every change to a tree through the methods of its nodes. A change
+# to a container changes the structural hash of every container around it, and
+# nodes don't know their parents, so the hashes that were computed before the
+# change are all treated as outdated.
+_hash_generation = 0
+
+
+def _invalidate_structural_hashes() -> None:
+    """Makes every structural hash that was computed so far outdated."""
+    global _hash_generation
+    _hash_generation += 1
+
+
 @runtime_checkable
 class Json5Node(Protocol):
     """Sets the expectation from a JSON5 node: be able to convert back to source."""
 
+    # Names of the attributes that hold child nodes, or lists of child nodes.
+    _fields: ClassVar[tuple[str, ...]]
+
     trailing_trivia_nodes: list[Json5Trivia]
 
     def to_source(self) -> str:
@@ -24,9 +46,109 @@ class Json5Node(Protocol):
     def to_json(self) -> str:
         ...
 
+    def iter_source(self) -> Iterator[str]:
+        ...
+
+    def iter_json(self) -> Iterator[str]:
+        ...
+
+    def write_source(self, fp: IO[str], buffer_size: int = ...) -> None:
+        ...
+
+    def write_json(self, fp: IO[str], buffer_size: int = ...) -> None:
+        ...
+
+
+def _write_chunks(fp: IO[str], chunks: Iterator[str], buffer_size: int) -> None:
+    """Writes the chunks to the file, roughly `buffer_size` characters at a time."""
+    buffer: list[str] = []
+    buffered_size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered_size += len(chunk)
+        if buffered_size >= buffer_size:
+            fp.write("".join(buffer))
+            buffer.clear()
+            buffered_size = 0
+
+    if buffer:
+        fp.write("".join(buffer))
+
+
+# Names of all the slots of each node class, including the inherited ones.
+_SLOT_NAMES: dict[type, tuple[str, ...]] = {}
+
+
+def _get_slot_names(cls: type) -> tuple[str, ...]:
+    slot_names = _SLOT_NAMES.get(cls)
+    if slot_names is None:
+        slot_names = tuple(
+            name
+            for base in reversed(cls.__mro__)
+            for name in base.__dict__.get("__slots__", ())
+        )
+        _SLOT_NAMES[cls] = slot_names
+
+    return slot_names
+
+
+class _Writable:
+    """
+    Lets a node be written out in chunks, instead of as one big string.
+
+    Nodes that contain arrays or objects override `iter_source` and `iter_json`,
+    everything else is small enough to be yielded as a single chunk.
+
+    Nodes are pickled as a tuple of their slots, instead of a dict of them, which
+    makes pickled trees about a third smaller.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self) -> tuple[object, ...]:
+        return tuple([getattr(self, name) for name in _get_slot_names(type(self))])
+
+    def __setstate__(self, state: tuple[object, ...]) -> None:
+        for name, value in zip(_get_slot_names(type(self)), state):
+            setattr(self, name, value)
+
+    def to_source(self) -> str:
+        raise NotImplementedError
+
+    def to_json(self) -> str:
+        raise NotImplementedError
+
+    def iter_source(self) -> Iterator[str]:
+        """Yields the source of the node in chunks."""
+        yield self.to_source()
 
-class Json5Primitive:
-    """Base class for primitive JSON types such as booleans, null, integers etc."""
+    def iter_json(self) -> Iterator[str]:
+        """Yields the node converted to JSON in chunks."""
+        yield self.to_json()
+
+    def write_source(
+        self, fp: IO[str], buffer_size: int = io.DEFAULT_BUFFER_SIZE
+    ) -> None:
+        """Writes the source of the node to the file, in bounded memory."""
+        _write_chunks(fp, self.iter_source(), buffer_size)
+
+    def write_json(
+        self, fp: IO[str], buffer_size: int = io.DEFAULT_BUFFER_SIZE
+    ) -> None:
+        """Writes the node converted to JSON to the file, in bounded memory."""
+        _write_chunks(fp, self.iter_json(), buffer_size)
+
+
+class Json5Primitive(_Writable):
+    """
+    Base class for primitive JSON types such as booleans, null, integers etc.
+
+    `start` is the offset of the primitive in the parsed source, or None if the
+    node didn't come from a parser.
+    """
+
+    __slots__ = ("source", "value", "trailing_trivia_nodes", "start")
+    _fields: ClassVar[tuple[str, ...]] = ("trailing_trivia_nodes",)
 
     def __init__(
         self,
@@ -37,6 +159,15 @@ class Json5Primitive:
         self.source = source
         self.value = value
         self.trailing_trivia_nodes = trailing_trivia_nodes
+        self.start: int | None = None
+
+    @property
+    def end(self) -> int | None:
+        """The offset just past the primitive, excluding its trailing trivia."""
+        if self.start is None:
+            return None
+
+        return self.start + len(self.source)
 
     def to_source(self) -> str:
         return self.source + "".join(
@@ -57,6 +188,8 @@ class Json5Primitive:
 class Json5Null(Json5Primitive):
     value: None
 
+    __slots__ = ()
+
     def __init__(self, trailing_trivia_nodes: list[Json5Trivia]) -> None:
         super().__init__(
             source="null",
@@ -68,6 +201,8 @@ class Json5Null(Json5Primitive):
 class Json5Boolean(Json5Primitive):
     value: bool
 
+    __slots__ = ()
+
     def __init__(
         self,
         source: str,
@@ -80,6 +215,8 @@ class Json5Boolean(Json5Primitive):
 class Json5Number(Json5Primitive):
     value: float
 
+    __slots__ = ()
+
     def __init__(
         self,
         source: str,
@@ -92,6 +229,8 @@ class Json5Number(Json5Primitive):
 class Json5String(Json5Primitive):
     value: str
 
+    __slots__ = ()
+
     def __init__(
         self,
         source: str,
@@ -111,6 +250,8 @@ class Json5String(Json5Primitive):
 class Json5Identifier(Json5Primitive):
     value: str
 
+    __slots__ = ()
+
     def __init__(
         self,
         source: str,
@@ -123,7 +264,10 @@ class Json5Identifier(Json5Primitive):
         return f'"{self.source}"'
 
 
-class Json5Key:
+class Json5Key(_Writable):
+    __slots__ = ("value", "trailing_trivia_nodes")
+    _fields: ClassVar[tuple[str, ...]] = ("value", "trailing_trivia_nodes")
+
     def __init__(
         self,
         value: Json5String | Json5Identifier,
@@ -132,6 +276,19 @@ class Json5Key:
         self.value = value
         self.trailing_trivia_nodes = trailing_trivia_nodes
 
+    @property
+    def start(self) -> int | None:
+        """The offset of the key in the parsed source."""
+        return self.value.start
+
+    @property
+    def end(self) -> int | None:
+        """The offset just past the colon, excluding the trivia that follows it."""
+        if self.value.start is None:
+            return None
+
+        return self.value.start + len(self.value.to_source()) + 1
+
     def to_source(self) -> str:
         return (
             self.value.to_source()
@@ -143,7 +300,7 @@ class Json5Key:
         return self.value.to_json() + ":"
 
 
-class Json5Container:
+class Json5Container(_Writable):
     """
     Base class for "container nodes", i.e. nodes that contain other nodes.
 
@@ -151,8 +308,24 @@ class Json5Container:
     nodes, while primitive nodes like ints and booleans cannot.
 
     Examples of container nodes include files, arrays and objects.
+
+    `start` and `end` are the offsets of the opening and just past the closing
+    bracket in the parsed source, or None if the node didn't come from a parser.
     """
 
+    __slots__ = (
+        "leading_trivia_nodes",
+        "trailing_trivia_nodes",
+        "start",
+        "end",
+        "_structural_hash",
+        "_structural_hash_generation",
+    )
+    _fields: ClassVar[tuple[str, ...]] = (
+        "leading_trivia_nodes",
+        "trailing_trivia_nodes",
+    )
+
     def __init__(
         self,
         leading_trivia_nodes: list[Json5Trivia],
@@ -160,16 +333,66 @@ class Json5Container:
     ) -> None:
         self.leading_trivia_nodes = leading_trivia_nodes
         self.trailing_trivia_nodes = trailing_trivia_nodes
+        self.start: int | None = None
+        self.end: int | None = None
+        # Kept by `json5kit.hashing.structural_hash()`, along with the value of
+        # `_hash_generation` when it was computed
+        self._structural_hash: bytes | None = None
+        self._structural_hash_generation = 0
 
     def to_source(self) -> str:
         """Converts the node back to its original source."""
-        raise NotImplementedError
+        return "".join(self.iter_source())
 
     def to_json(self) -> str:
+        """Converts the node to JSON, without whitespace."""
+        return "".join(self.iter_json())
+
+    def iter_source(self) -> Iterator[str]:
+        """Yields the source of the node in chunks."""
+        return _iter_chunks(self, json=False)
+
+    def iter_json(self) -> Iterator[str]:
+        """Yields the node converted to JSON in chunks."""
+        return _iter_chunks(self, json=True)
+
+    def _source_parts(self) -> Iterator[_Part]:
+        """Yields the source of the node, with nested containers left as nodes."""
         raise NotImplementedError
 
+    def _json_parts(self) -> Iterator[_Part]:
+        """Yields the node as JSON, with nested containers left as nodes."""
+        raise NotImplementedError
+
+
+_Part = Union[str, Json5Node]
+
+
+def _iter_chunks(node: Json5Container, json: bool) -> Iterator[str]:
+    """
+    Yields the chunks of a container's source or JSON.
+
+    Nested containers are kept on an explicit stack instead of recursing into
+    them, so deeply nested trees can be converted as well.
+    """
+    stack = [node._json_parts() if json else node._source_parts()]
+    while stack:
+        for part in stack[-1]:
+            if isinstance(part, str):
+                yield part
+            elif isinstance(part, Json5Container):
+                stack.append(part._json_parts() if json else part._source_parts())
+                break
+            else:
+                yield part.to_json() if json else part.to_source()
+        else:
+            stack.pop()
+
 
 class Json5File(Json5Container):
+    __slots__ = ("value",)
+    _fields = Json5Container._fields + ("value",)
+
     def __init__(
         self,
         value: Json5Node,
@@ -179,20 +402,42 @@ class Json5File(Json5Container):
         super().__init__(leading_trivia_nodes, trailing_trivia_nodes)
         self.value = value
 
-    def to_source(self) -> str:
-        """Converts the node back to its original source."""
-        return (
-            "".join(trivia.source for trivia in self.leading_trivia_nodes)
-            + self.value.to_source()
-            + "".join(trivia.source for trivia in self.trailing_trivia_nodes)
-        )
+    def _source_parts(self) -> Iterator[_Part]:
+        for trivia in self.leading_trivia_nodes:
+            yield trivia.source
+        yield self.value
+        for trivia in self.trailing_trivia_nodes:
+            yield trivia.source
 
-    def to_json(self) -> str:
-        """Converts the node to JSON, without whitespace."""
-        return self.value.to_json()
+    def _json_parts(self) -> Iterator[_Part]:
+        yield self.value
+
+
+class _LazyBody(Protocol):
+    """The skipped over body of an array or object that was parsed lazily."""
+
+    def body_source(self) -> str:
+        """Returns the source after the leading trivia, up to the closing bracket."""
+        ...
+
+    def load(self, start: int) -> Json5Array | Json5Object:
+        """Parses the body into a container that starts at `start`."""
+        ...
 
 
 class Json5Array(Json5Container):
+    """
+    A JSON5 array.
+
+    When parsed lazily, the members are only parsed when they're first accessed.
+
+    Members can be added and removed with `insert` and `delete`, which keep the
+    commas and the formatting around them in order.
+    """
+
+    __slots__ = ("_members", "_lazy")
+    _fields = Json5Container._fields + ("members",)
+
     def __init__(
         self,
         members: list[Json5Node],
@@ -200,24 +445,122 @@ class Json5Array(Json5Container):
         trailing_trivia_nodes: list[Json5Trivia],
     ) -> None:
         super().__init__(leading_trivia_nodes, trailing_trivia_nodes)
-        self.members = members
+        self._members = members
+        self._lazy: _LazyBody | None = None
+
+    @property
+    def members(self) -> list[Json5Node]:
+        if self._lazy is not None:
+            self._load()
+        return self._members
+
+    @members.setter
+    def members(self, members: list[Json5Node]) -> None:
+        self._lazy = None
+        self._members = members
+        _invalidate_structural_hashes()
+
+    def insert(self, index: int, value: Json5Node) -> None:
+        """
+        Inserts a member before `index`, same as `list.insert`.
+
+        The member gets a comma, followed by the whitespace that separates the
+        opening bracket from the first member.
+        """
+        members = self.members
+        index = len(members) if index > len(members) else index
+        if index < 0:
+            index = max(0, len(members) + index)
+
+        if index == len(members):
+            if members:
+                _separate_appended(self, members[-1], value)
+        else:
+            value.trailing_trivia_nodes = [Json5Comma(), *_indent_of(self)]
+
+        members.insert(index, value)
+        _invalidate_structural_hashes()
+
+    def delete(self, index: int) -> None:
+        """Removes the member at `index`, raising IndexError if there's none."""
+        members = self.members
+        if not -len(members) <= index < len(members):
+            raise IndexError("array index out of range")
+
+        index %= len(members)
+        if index == len(members) - 1 and index > 0:
+            _take_over_separator(members[index - 1], members[index])
+
+        del members[index]
+        _invalidate_structural_hashes()
+
+    def _load(self) -> None:
+        assert self._lazy is not None and self.start is not None
+        loaded = self._lazy.load(self.start)
+        assert isinstance(loaded, Json5Array)
+        self._lazy = None
+        self._members = loaded._members
+
+    def _source_parts(self) -> Iterator[_Part]:
+        chunks = ["["]
+        chunks.extend(trivia.source for trivia in self.leading_trivia_nodes)
+        if self._lazy is not None:
+            # Nothing inside the brackets has been touched, so the original
+            # source can be used as is.
+            chunks.append(self._lazy.body_source())
+            chunks.extend(trivia.source for trivia in self.trailing_trivia_nodes)
+            yield "".join(chunks)
+            return
+
+        for member in self.members:
+            if isinstance(member, Json5Container):
+                yield "".join(chunks)
+                yield member
+                chunks.clear()
+            else:
+                chunks.append(member.to_source())
+
+        chunks.append("]")
+        chunks.extend(trivia.source for trivia in self.trailing_trivia_nodes)
+        yield "".join(chunks)
+
+    def _json_parts(self) -> Iterator[_Part]:
+        chunks = ["["]
+        for member in self.members:
+            if isinstance(member, Json5Container):
+                yield "".join(chunks)
+                yield member
+                chunks.clear()
+            else:
+                chunks.append(member.to_json())
+            chunks.append(",")
+
+        if self.members:
+            chunks.pop()
+        chunks.append("]")
+        yield "".join(chunks)
 
-    def to_source(self) -> str:
-        """Converts the node back to its original source."""
-        return (
-            "["
-            + "".join(trivia.source for trivia in self.leading_trivia_nodes)
-            + "".join(member.to_source() for member in self.members)
-            + "]"
-            + "".join(trivia.source for trivia in self.trailing_trivia_nodes)
-        )
 
-    def to_json(self) -> str:
-        """Converts the node to JSON, without whitespace."""
-        return "[" + ",".join(member.to_json() for member in self.members) + "]"
+class Json5Object(Json5Container):
+    """
+    A JSON5 object.
 
+    When parsed lazily, the keys and values are only parsed when either of them
+    is first accessed.
+
+    Entries can be looked up by key with `get`, `obj[key]` and `key in obj`,
+    and changed with `set` and `delete`. These use an index of the keys that is
+    built on the first lookup. If a key appears more than once, the last entry
+    with that key is used, same as `json5kit.loads`.
+
+    The index notices entries being added or removed, and `Json5Transformer`
+    resets it, but renaming a key in place by any other means requires calling
+    `invalidate_index()` afterwards.
+    """
+
+    __slots__ = ("_keys", "_values", "_lazy", "_index", "_indexed_count")
+    _fields = Json5Container._fields + ("keys", "values")
 
-class Json5Object(Json5Container):
     def __init__(
         self,
         data: list[tuple[Json5Key, Json5Node]],  # TODO: identifier support
@@ -225,40 +568,300 @@ class Json5Object(Json5Container):
         trailing_trivia_nodes: list[Json5Trivia],
     ) -> None:
         super().__init__(leading_trivia_nodes, trailing_trivia_nodes)
-        self.keys: list[Json5Key] = []
-        self.values: list[Json5Node] = []
+        self._keys: list[Json5Key] = []
+        self._values: list[Json5Node] = []
+        self._lazy: _LazyBody | None = None
+        self._index: dict[str, int] | None = None
+        self._indexed_count = 0
         for key, value in data:
-            self.keys.append(key)
-            self.values.append(value)
+            self._keys.append(key)
+            self._values.append(value)
+
+    @property
+    def keys(self) -> list[Json5Key]:
+        if self._lazy is not None:
+            self._load()
+        return self._keys
+
+    @keys.setter
+    def keys(self, keys: list[Json5Key]) -> None:
+        if self._lazy is not None:
+            self._load()
+        self._keys = keys
+        self._index = None
+        _invalidate_structural_hashes()
+
+    @property
+    def values(self) -> list[Json5Node]:
+        if self._lazy is not None:
+            self._load()
+        return self._values
+
+    @values.setter
+    def values(self, values: list[Json5Node]) -> None:
+        if self._lazy is not None:
+            self._load()
+        self._values = values
+        _invalidate_structural_hashes()
+
+    def _load(self) -> None:
+        assert self._lazy is not None and self.start is not None
+        loaded = self._lazy.load(self.start)
+        assert isinstance(loaded, Json5Object)
+        self._lazy = None
+        self._keys = loaded._keys
+        self._values = loaded._values
+
+    def get(self, key: str, default: Json5Node | None = None) -> Json5Node | None:
+        """Returns the value for the given key, or `default` if it's missing."""
+        position = self._find(key)
+        if position is None:
+            return default
+
+        return self.values[position]
+
+    def __getitem__(self, key: str) -> Json5Node:
+        position = self._find(key)
+        if position is None:
+            raise KeyError(key)
+
+        return self.values[position]
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key) is not None
+
+    def set(self, key: str, value: Json5Node) -> None:
+        """
+        Replaces the value for the given key, or adds a new entry at the end.
+
+        If the new value has no trailing trivia, it takes over the trivia of the
+        value it replaces, which includes the comma after it.
+        """
+        position = self._find(key)
+        if position is not None:
+            old_value = self.values[position]
+            if not value.trailing_trivia_nodes:
+                value.trailing_trivia_nodes = list(old_value.trailing_trivia_nodes)
+            self.values[position] = value
+            _invalidate_structural_hashes()
+            return
+
+        key_node = Json5Key(_make_key_value(key), [Json5Whitespace(" ")])
+        if self.values:
+            _separate_appended(self, self.values[-1], value)
+
+        self.keys.append(key_node)
+        self.values.append(value)
+        _invalidate_structural_hashes()
+        if self._index is not None:
+            self._index[key] = len(self.keys) - 1
+            self._indexed_count += 1
+
+    def delete(self, key: str) -> None:
+        """Removes every entry with the given key, raising KeyError if there's none."""
+        if self._find(key) is None:
+            raise KeyError(key)
+
+        keys, values = self.keys, self.values
+        for position in reversed(range(len(keys))):
+            if keys[position].value.value != key:
+                continue
+
+            if position == len(keys) - 1 and position > 0:
+                _take_over_separator(values[position - 1], values[position])
+
+            del keys[position]
+            del values[position]
+
+        self._index = None
+        _invalidate_structural_hashes()
+
+    def invalidate_index(self) -> None:
+        """Makes the next lookup rebuild the index of the keys."""
+        self._index = None
+
+    def _find(self, key: str) -> int | None:
+        """Returns the position of the last entry with the given key."""
+        keys = self.keys
+        index = self._index
+        if index is None or self._indexed_count != len(keys):
+            index = self._build_index()
+
+        position = index.get(key)
+        if position is not None and keys[position].value.value != key:
+            # The entries were changed without going through the index
+            index = self._build_index()
+            position = index.get(key)
+
+        return position
+
+    def _build_index(self) -> dict[str, int]:
+        # Later duplicates overwrite the earlier ones
+        index = {key.value.value: position for position, key in enumerate(self.keys)}
+        self._index = index
+        self._indexed_count = len(self.keys)
+        return index
+
+    def _source_parts(self) -> Iterator[_Part]:
+        chunks = ["{"]
+        chunks.extend(trivia.source for trivia in self.leading_trivia_nodes)
+        if self._lazy is not None:
+            # Nothing inside the braces has been touched, so the original
+            # source can be used as is.
+            chunks.append(self._lazy.body_source())
+            chunks.extend(trivia.source for trivia in self.trailing_trivia_nodes)
+            yield "".join(chunks)
+            return
+
+        for key, value in zip(self.keys, self.values):
+            chunks.append(key.to_source())
+            if isinstance(value, Json5Container):
+                yield "".join(chunks)
+                yield value
+                chunks.clear()
+            else:
+                chunks.append(value.to_source())
+
+        chunks.append("}")
+        chunks.extend(trivia.source for trivia in self.trailing_trivia_nodes)
+        yield "".join(chunks)
+
+    def _json_parts(self) -> Iterator[_Part]:
+        chunks = ["{"]
+        for key, value in zip(self.keys, self.values):
+            chunks.append(key.to_json())
+            if isinstance(value, Json5Container):
+                yield "".join(chunks)
+                yield value
+                chunks.clear()
+            else:
+                chunks.append(value.to_json())
+            chunks.append(",")
+
+        if self.keys:
+            chunks.pop()
+        chunks.append("}")
+        yield "".join(chunks)
+
+
+def _separate_appended(
+    container: Json5Array | Json5Object, last_value: Json5Node, value: Json5Node
+) -> None:
+    """
+    Sets up the trivia for a value that is added after the last one.
 
-    def to_source(self) -> str:
-        """Converts the node back to its original source."""
-        return (
-            "{"
-            + "".join(trivia.source for trivia in self.leading_trivia_nodes)
-            + "".join(
-                f"{key.to_source()}{value.to_source()}"
-                for key, value in zip(self.keys, self.values)
-            )
-            + "}"
-            + "".join(trivia.source for trivia in self.trailing_trivia_nodes)
-        )
+    The previous last value needs a comma now, followed by whatever whitespace
+    separates the opening bracket from the first value. The trivia on the
+    following lines moves along to the new last value.
+    """
+    own_trivia, line_trivia, rest_trivia, has_comma = _split_separator(
+        last_value.trailing_trivia_nodes
+    )
+    indent = _indent_of(container)
+    if line_trivia and not any("\n" in trivia.source for trivia in indent):
+        indent.insert(0, Json5Newline())
+
+    last_value.trailing_trivia_nodes = [
+        *own_trivia,
+        Json5Comma(),
+        *line_trivia,
+        *indent,
+    ]
+    value.trailing_trivia_nodes = [
+        *([Json5Comma()] if has_comma else []),
+        *rest_trivia,
+    ]
+
+
+def _take_over_separator(previous_value: Json5Node, last_value: Json5Node) -> None:
+    """
+    Sets up the trivia for removing the last value: the value before it takes
+    over the trivia on the lines after it, so that the closing bracket stays
+    where it was.
+    """
+    own_trivia, line_trivia, previous_rest_trivia, _ = _split_separator(
+        previous_value.trailing_trivia_nodes
+    )
+    _, _, rest_trivia, has_comma = _split_separator(last_value.trailing_trivia_nodes)
+    if line_trivia and not rest_trivia:
+        # A comment on the line would swallow the closing bracket without a
+        # line break, so the one after the comment is kept.
+        rest_trivia = previous_rest_trivia
+    previous_value.trailing_trivia_nodes = [
+        *own_trivia,
+        *([Json5Comma()] if has_comma or line_trivia else []),
+        *line_trivia,
+        *rest_trivia,
+    ]
+
+
+def _indent_of(container: Json5Array | Json5Object) -> list[Json5Trivia]:
+    """Copies the whitespace between the opening bracket and the first value."""
+    indent: list[Json5Trivia] = [
+        trivia.copy()
+        for trivia in container.leading_trivia_nodes
+        if isinstance(trivia, (Json5Whitespace, Json5Newline))
+    ]
+    return indent or [Json5Whitespace(" ")]
+
+
+def _split_separator(
+    trivia_nodes: list[Json5Trivia],
+) -> tuple[list[Json5Trivia], list[Json5Trivia], list[Json5Trivia], bool]:
+    """
+    Splits the trailing trivia of an object's value into the trivia before the
+    comma, the comments on the same line after the comma, and the trivia from
+    the next line onwards. Also returns whether there was a comma at all.
 
-    def to_json(self) -> str:
-        """Converts the node to JSON, without whitespace."""
-        return (
-            "{"
-            + ",".join(
-                f"{key.to_json()}{value.to_json()}"
-                for key, value in zip(self.keys, self.values)
-            )
-            + "}"
-        )
+    Whitespace on the same line is only kept when there's a comment on it.
+    """
+    comma_position = -1
+    for position, trivia in enumerate(trivia_nodes):
+        if isinstance(trivia, Json5Comma):
+            comma_position = position
+            break
+
+    own_trivia = trivia_nodes[: max(comma_position, 0)]
+    separator_trivia = trivia_nodes[comma_position + 1 :]
+    line_end = len(separator_trivia)
+    for position, trivia in enumerate(separator_trivia):
+        if "\n" in trivia.source:
+            line_end = position
+            break
+
+    line_trivia = separator_trivia[:line_end]
+    if not any(isinstance(trivia, Json5Comment) for trivia in line_trivia):
+        line_trivia = []
+
+    return own_trivia, line_trivia, separator_trivia[line_end:], comma_position >= 0
+
+
+def _is_identifier_key(key: str) -> bool:
+    """
+    Whether the key can be written without quotes. The first character is checked
+    the same way as the parser does, as `\\w` also matches digits like "²", and
+    letter numbers like "Ⅷ" aren't alphabetic.
+    """
+    if not key or not (key[0].isalpha() or key[0] == "_"):
+        return False
 
+    return _IDENTIFIER_REST_RE.fullmatch(key, 1) is not None
 
-class Json5Trivia:
+
+def _make_key_value(key: str) -> Json5String | Json5Identifier:
+    """Creates the node for a new key, leaving it unquoted where possible."""
+    if _is_identifier_key(key):
+        return Json5Identifier(key, [])
+
+    return Json5String(json.dumps(key, ensure_ascii=False), key, [])
+
+
+class Json5Trivia(_Writable):
     """Base class for "trivial" information like whitespace, newlines and comments."""
 
+    __slots__ = ("source",)
+    _fields: ClassVar[tuple[str, ...]] = ()
+
     trailing_trivia_nodes = ()
 
     def __init__(self, source: str) -> None:
@@ -270,18 +873,45 @@ class Json5Trivia:
     def to_json(self) -> str:
         return self.source
 
+    def __reduce__(self) -> tuple[object, ...]:
+        # Shared trivia nodes stay shared when they're unpickled
+        if is_shared_trivia(self):
+            return (_get_shared_trivia, (self.source,))
+
+        return (_new_trivia, (type(self), self.source))
+
+    def copy(self) -> "Self":
+        """Returns an unshared copy of this trivia node."""
+        return _new_trivia(type(self), self.source)
+
+
+_TriviaT = TypeVar("_TriviaT", bound=Json5Trivia)
+
+
+def _new_trivia(trivia_class: type[_TriviaT], source: str) -> _TriviaT:
+    """Creates a trivia node of any type, with the given source."""
+    trivia = trivia_class.__new__(trivia_class)
+    trivia.source = source
+    return trivia
+
 
 class Json5Comment(Json5Trivia):
     """JSON5 single line comments, eg. `// foo`."""
 
+    __slots__ = ()
+
 
 class Json5Whitespace(Json5Trivia):
     """Any run of continuous whitespace characters in a JSON5 file."""
 
+    __slots__ = ()
+
 
 class Json5Newline(Json5Trivia):
     """Newline character in a JSON5 file."""
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(source="\n")
 
@@ -289,5 +919,36 @@ class Json5Newline(Json5Trivia):
 class Json5Comma(Json5Trivia):
     """Comma character in a JSON5 file"""
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(source=",")
+
+
+# Trivia nodes that are shared by every tree parsed with `share_trivia=True`,
+# instead of allocating a new node for each occurrence. They must never be
+# modified in place, `Json5Transformer` hands out copies of them instead.
+SHARED_NEWLINE = Json5Newline()
+SHARED_COMMA = Json5Comma()
+SHARED_WHITESPACE = {
+    indent: Json5Whitespace(indent)
+    for indent in [" " * size for size in range(1, 17)]
+    + ["\t" * size for size in range(1, 5)]
+}
+_SHARED_TRIVIA_IDS = frozenset(
+    id(trivia) for trivia in [SHARED_NEWLINE, SHARED_COMMA, *SHARED_WHITESPACE.values()]
+)
+
+
+def is_shared_trivia(node: object) -> bool:
+    """Returns True if the node is one of the shared trivia nodes."""
+    return id(node) in _SHARED_TRIVIA_IDS
+
+
+def _get_shared_trivia(source: str) -> Json5Trivia:
+    """Returns the shared trivia node with the given source."""
+    if source == "\n":
+        return SHARED_NEWLINE
+    if source == ",":
+        return SHARED_COMMA
+    return SHARED_WHITESPACE[source]
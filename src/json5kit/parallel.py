@@ -0,0 +1,394 @@
+"""Parsing JSON5 in a pool of processes, either many files or one big document."""
+from __future__ import annotations
+import functools
+import os
+import pickle
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from typing import Iterable, Union, cast, overload
+
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
+from json5kit.nodes import Json5Array, Json5File, Json5Key, Json5Node, Json5Object
+from json5kit.parser import (
+    _SKIP_TOKEN_RE,
+    _TRIVIA_RUN_RE,
+    Json5ParseError,
+    Json5Parser,
+    Json5ValueParser,
+)
+from json5kit.spans import shift_offsets
+
+# How many batches of files each worker gets, to balance files of varying size
+# against the overhead of handing out each batch.
+_BATCHES_PER_WORKER = 4
+
+# The smallest part of a document that is worth sending to a worker.
+_MIN_SPLIT_SIZE = 64 * 1024
+
+# Same as `_SKIP_TOKEN_RE`, but also finds the commas between members.
+_SPLIT_TOKEN_RE = re.compile(
+    r"""[\[\]{},]|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|//[^\n]*""", re.DOTALL
+)
+
+
+@overload
+def parse_many(
+    paths: Iterable[Union[str, os.PathLike[str]]],
+    *,
+    workers: int | None = ...,
+    values: Literal[False] = ...,
+    max_depth: int | None = ...,
+    share_trivia: bool = ...,
+) -> list[Json5File | Json5ParseError]:
+    ...
+
+
+@overload
+def parse_many(
+    paths: Iterable[Union[str, os.PathLike[str]]],
+    *,
+    workers: int | None = ...,
+    values: Literal[True],
+    max_depth: int | None = ...,
+    share_trivia: bool = ...,
+) -> list[object]:
+    ...
+
+
+def parse_many(
+    paths: Iterable[Union[str, os.PathLike[str]]],
+    *,
+    workers: int | None = None,
+    values: bool = False,
+    max_depth: int | None = None,
+    share_trivia: bool = False,
+) -> list[Json5File | Json5ParseError] | list[object]:
+    """
+    Parses UTF-8 encoded JSON5 files in a pool of `workers` processes, which
+    defaults to one per CPU. With `workers=1`, the files are parsed in the
+    current process instead.
+
+    Returns the results in the same order as `paths`: a CST for each file, or
+    a Python object like `loads()` with `values=True`. A file that fails to
+    parse, or can't be read or decoded, gets a `Json5ParseError` as its result,
+    and the other files are parsed as usual. Passing `share_trivia=True` makes
+    the trees a lot cheaper to send back from the workers.
+    """
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    parse_path = functools.partial(
+        _parse_path, values=values, max_depth=max_depth, share_trivia=share_trivia
+    )
+    if workers == 1 or len(paths) <= 1:
+        return [parse_path(path) for path in paths]
+
+    pickle_result = functools.partial(
+        _pickle_result, values=values, max_depth=max_depth, share_trivia=share_trivia
+    )
+    chunksize = max(1, len(paths) // (workers * _BATCHES_PER_WORKER))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pickled_results = list(executor.map(pickle_result, paths, chunksize=chunksize))
+
+    results: list[object] = []
+    for path, pickled_result in zip(paths, pickled_results):
+        if isinstance(pickled_result, Json5ParseError):
+            results.append(pickled_result)
+        elif pickled_result is None:
+            results.append(parse_path(path))
+        else:
+            results.append(pickle.loads(pickled_result))
+
+    return results
+
+
+def _pickle_result(
+    path: Union[str, os.PathLike[str]],
+    values: bool,
+    max_depth: int | None,
+    share_trivia: bool,
+) -> bytes | Json5ParseError | None:
+    """
+    Parses a single file inside a worker process, and pickles the result. Returns
+    None if the result is nested too deeply to be pickled.
+    """
+    result = _parse_path(path, values, max_depth, share_trivia)
+    if isinstance(result, Json5ParseError):
+        return result
+
+    try:
+        return pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    except RecursionError:
+        return None
+
+
+def _parse_path(
+    path: Union[str, os.PathLike[str]],
+    values: bool,
+    max_depth: int | None,
+    share_trivia: bool,
+) -> object:
+    """
+    Parses a single file, returning the parse error instead of raising it. A file
+    that can't be read or decoded gets a parse error as well.
+    """
+    parser: Json5Parser
+    source = ""
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+        source = str(data, "utf-8")
+
+        if values:
+            parser = Json5ValueParser(source, max_depth=max_depth)
+            return parser.load()
+
+        parser = Json5Parser(source, max_depth=max_depth, share_trivia=share_trivia)
+        return parser.parse()
+    except Json5ParseError as error:
+        return error
+    except UnicodeDecodeError as error:
+        return Json5ParseError(f"Invalid UTF-8: {error.reason}", error.start, data)
+    except OSError as error:
+        return Json5ParseError(str(error), 0, source)
+    except ValueError as error:
+        # Any other malformed value fails this file only, not the whole batch
+        return Json5ParseError(str(error), parser.current, source)
+
+
+def parse_parallel(
+    source: str,
+    *,
+    workers: int | None = None,
+    max_depth: int | None = None,
+    share_trivia: bool = False,
+) -> Json5File:
+    """
+    Parses one big JSON5 document in a pool of `workers` processes, which
+    defaults to one per CPU.
+
+    The members of the top-level array or object are split into parts of
+    roughly equal size, which are parsed by the workers and put back together
+    into one tree. The tree is the same as the one `parse()` returns, and so
+    are the errors. Documents that are too small to be worth splitting are
+    parsed in the current process.
+
+    Unpickling the nodes that the workers send back takes about as long as
+    parsing them, so this is rarely faster than `parse()`. Plain values are cheap
+    to send, so `loads_parallel()` should speed up large documents instead.
+    """
+    tree = _parse_split(source, workers, max_depth, share_trivia, values=False)
+    if tree is None:
+        parser = Json5Parser(source, max_depth=max_depth, share_trivia=share_trivia)
+        return parser.parse()
+
+    return cast(Json5File, tree)
+
+
+def loads_parallel(
+    source: str,
+    *,
+    workers: int | None = None,
+    max_depth: int | None = None,
+) -> object:
+    """Same as `parse_parallel()`, but returns Python objects like `loads()`."""
+    wrapped_value = _parse_split(source, workers, max_depth, False, values=True)
+    if wrapped_value is None:
+        return Json5ValueParser(source, max_depth=max_depth).load()
+
+    return cast("list[object]", wrapped_value)[0]
+
+
+def _parse_split(
+    source: str,
+    workers: int | None,
+    max_depth: int | None,
+    share_trivia: bool,
+    values: bool,
+) -> object:
+    """
+    Parses the document in parts, and returns the tree, or the value wrapped in
+    a list. Returns None if the document should be parsed in one go instead,
+    because it's too small, or because parsing the parts failed and the error
+    has to come from a regular parse.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    split_count = min(workers * _BATCHES_PER_WORKER, len(source) // _MIN_SPLIT_SIZE)
+    if workers == 1 or split_count < 2:
+        return None
+
+    # The outermost container is parsed up to the start of its first member here
+    parser = Json5Parser(source, max_depth=max_depth, share_trivia=share_trivia)
+    file_leading_trivia_nodes = parser.parse_trivia()
+    closing_char = {"[": "]", "{": "}"}.get(parser.peek())
+    if closing_char is None:
+        return None
+
+    start = parser.current
+    parser.current += 1
+    parser._check_depth(0)
+    leading_trivia_nodes = parser.parse_trivia()
+    split = _split_body(source, parser.current, split_count)
+    if split is None:
+        return None
+
+    end, splits = split
+    boundaries = [parser.current, *splits, end]
+    slices = [source[a:b] for a, b in zip(boundaries, boundaries[1:])]
+    parse_members = functools.partial(
+        _parse_members,
+        closing_char=closing_char,
+        max_depth=None if max_depth is None else max_depth - 1,
+        share_trivia=share_trivia,
+        values=values,
+    )
+    chunksize = max(1, len(slices) // (workers * _BATCHES_PER_WORKER))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(
+                executor.map(
+                    parse_members,
+                    slices,
+                    boundaries,
+                    [False] * (len(slices) - 1) + [True],
+                    chunksize=chunksize,
+                )
+            )
+
+        # Everything after the closing bracket is parsed here
+        parser.current = end + 1
+        trailing_trivia_nodes = parser.parse_trivia()
+        file_trailing_trivia_nodes = parser.parse_trivia()
+        if not parser.scanned:
+            return None
+    except Exception:
+        # Parsing again in one go raises the error at the right position
+        return None
+
+    members = [member for part in parts for member in part]
+    if values:
+        if closing_char == "]":
+            return [members]
+        return [dict(cast("list[tuple[str, object]]", members))]
+
+    container: Json5Array | Json5Object
+    if closing_char == "]":
+        nodes = cast("list[Json5Node]", members)
+        container = Json5Array(nodes, leading_trivia_nodes, trailing_trivia_nodes)
+    else:
+        entries = cast("list[tuple[Json5Key, Json5Node]]", members)
+        container = Json5Object(entries, leading_trivia_nodes, trailing_trivia_nodes)
+
+    container.start = start
+    container.end = end + 1
+    tree = Json5File(container, file_leading_trivia_nodes, file_trailing_trivia_nodes)
+    tree.start = 0
+    tree.end = parser.current
+    return tree
+
+
+def _split_body(
+    source: str, body_start: int, split_count: int
+) -> tuple[int, list[int]] | None:
+    """
+    Finds the bracket that closes the outermost container, and the places where
+    its body can be split into `split_count` parts of roughly the same size.
+
+    Each place is the start of a member, right after a comma and the trivia
+    that follows it. Returns None if the container isn't closed.
+    """
+    split_size = (len(source) - body_start) // split_count
+    next_split = body_start + split_size
+    splits: list[int] = []
+    depth = 1
+    index = body_start
+    while True:
+        # Commas only matter between the members of the outermost container
+        token_re = _SPLIT_TOKEN_RE if depth == 1 else _SKIP_TOKEN_RE
+        match = token_re.search(source, index)
+        if match is None:
+            return None
+
+        index = match.end()
+        char = source[match.start()]
+        if char == "[" or char == "{":
+            depth += 1
+        elif char == "]" or char == "}":
+            depth -= 1
+            if depth == 0:
+                return match.start(), splits
+        elif char == "," and index >= next_split:
+            trivia_match = _TRIVIA_RUN_RE.match(source, index)
+            split = index if trivia_match is None else trivia_match.end()
+            splits.append(split)
+            next_split = split + split_size
+
+
+def _parse_members(
+    source: str,
+    offset: int,
+    is_last: bool,
+    closing_char: str,
+    max_depth: int | None,
+    share_trivia: bool,
+    values: bool,
+) -> list[object]:
+    """
+    Parses a part of the body of the outermost container inside a worker
+    process. Parts other than the last one have to end right after a comma.
+    """
+    parser: Json5Parser
+    members: list[object] = []
+    has_comma = True
+    if values:
+        parser = value_parser = Json5ValueParser(source, max_depth=max_depth)
+        while not parser.scanned:
+            key = value_parser.parse_key() if closing_char == "}" else None
+            _check_not_scanned(parser)
+            value = value_parser.parse_value()
+            members.append(value if key is None else (key, value))
+            has_comma = not parser.scanned
+            if has_comma:
+                parser.consume(",")
+                value_parser.skip_trivia()
+    else:
+        parser = Json5Parser(source, max_depth=max_depth, share_trivia=share_trivia)
+        while not parser.scanned:
+            key_node = parser.parse_object_key() if closing_char == "}" else None
+            _check_not_scanned(parser)
+            node = parser.parse_node()
+            members.append(node if key_node is None else (key_node, node))
+            has_comma = not parser.scanned
+            if has_comma:
+                parser._parse_separator(node, closing_char)
+
+        nodes: list[Json5Node] = []
+        for member in members:
+            if isinstance(member, tuple):
+                nodes.extend(cast("tuple[Json5Key, Json5Node]", member))
+            else:
+                nodes.append(cast(Json5Node, member))
+        shift_offsets(nodes, offset)
+
+    if not has_comma and not is_last:
+        raise Json5ParseError("Expected to find ','", parser.current, source)
+
+    return members
+
+
+def _check_not_scanned(parser: Json5Parser) -> None:
+    if parser.scanned:
+        raise Json5ParseError(
+            "Expected to find JSON5 data, found EOF",
+            index=parser.current,
+            source=parser.source,
+        )
@@ -0,0 +1,906 @@
+"""Parser that converts JSON5 source into a CST."""
+from __future__ import annotations
+import re
+import string
+import sys
+
+from typing import Any, ClassVar, Pattern, Sequence, cast
+
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
+from json5kit.nodes import (
+    Json5Array,
+    Json5Boolean,
+    Json5Comma,
+    Json5Comment,
+    Json5File,
+    Json5Identifier,
+    Json5Key,
+    Json5Newline,
+    Json5Node,
+    Json5Null,
+    Json5Number,
+    Json5Object,
+    Json5Primitive,
+    Json5String,
+    Json5Trivia,
+    Json5Whitespace,
+    SHARED_COMMA,
+    SHARED_NEWLINE,
+    SHARED_WHITESPACE,
+)
+from json5kit.spans import Buffer, index_to_line_column, shift_offsets
+
+# Precompiled patterns that let the parser pull a whole token out of the source
+# in one step, instead of peeking and advancing one character at a time.
+#
+# A newline only becomes its own `Json5Newline` node when it starts a trivia
+# token, otherwise it gets swallowed by the surrounding run of whitespace.
+_TRIVIA_TOKEN_RE = re.compile(r"\n|[ \t\n\r\x0b\x0c]+|//[^\n]*")
+_TRIVIA_RUN_RE = re.compile(r"(?:[ \t\n\r\x0b\x0c]+|//[^\n]*)+")
+_NON_WHITESPACE_RE = re.compile(r"[^ \t\n\r\x0b\x0c]")
+_IDENTIFIER_RE = re.compile(r"\w*")
+_NUMBER_RE = re.compile(r"[+-]?\d*(?:\.\d+)?")
+_STRING_CHUNK_RE = {
+    '"': re.compile(r'[^"\\]*'),
+    "'": re.compile(r"[^'\\]*"),
+}
+# Everything that can contain or close a bracket while skipping over the body of
+# a lazily parsed container: strings, comments and the brackets themselves.
+_SKIP_TOKEN_RE = re.compile(
+    r"""[\[\]{}]|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|//[^\n]*""", re.DOTALL
+)
+_ESCAPES = {
+    "\n": "",  # trailing backslash means ignore the newline
+    "\\": "\\",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "b": "\b",
+    "f": "\f",
+    "v": "\v",
+    "'": "'",
+    '"': '"',
+}
+
+
+class Json5ParseError(Exception):
+    """Raised when the JSON5 string has bad syntax."""
+
+    def __init__(self, message: str, index: int, source: str | Buffer) -> None:
+        self.message = message
+        self.index = index
+        self.line, self.column = index_to_line_column(self.index, source)
+        super().__init__(f"at {self.line}:{self.column}: {message}")
+
+    @classmethod
+    def _at_position(
+        cls, message: str, index: int, line: int, column: int
+    ) -> Json5ParseError:
+        """Creates the error from a known position, without the source."""
+        error = cls.__new__(cls)
+        Exception.__init__(error, f"at {line}:{column}: {message}")
+        error.message = message
+        error.index = index
+        error.line, error.column = line, column
+        return error
+
+    def __reduce__(self) -> tuple[object, ...]:
+        # The source isn't kept around, so the position is pickled instead
+        position = (self.message, self.index, self.line, self.column)
+        return (Json5ParseError._at_position, position)
+
+
+class _Frame:
+    """An array or object that is being parsed, but hasn't been closed yet."""
+
+    __slots__ = (
+        "closing_char",
+        "start",
+        "leading_trivia_nodes",
+        "members",
+        "entries",
+        "key",
+    )
+
+    def __init__(
+        self,
+        closing_char: str,
+        start: int,
+        leading_trivia_nodes: list[Json5Trivia],
+    ) -> None:
+        self.closing_char = closing_char
+        self.start = start
+        self.leading_trivia_nodes = leading_trivia_nodes
+        self.members: list[Json5Node] = []
+        self.entries: list[tuple[Json5Key, Json5Node]] = []
+        self.key: Json5Key | None = None
+
+    def add(self, value: Json5Node) -> None:
+        if self.key is None:
+            self.members.append(value)
+        else:
+            self.entries.append((self.key, value))
+
+    def build(self, end: int, trailing_trivia_nodes: list[Json5Trivia]) -> Json5Node:
+        container: Json5Array | Json5Object
+        if self.closing_char == "]":
+            container = Json5Array(
+                self.members, self.leading_trivia_nodes, trailing_trivia_nodes
+            )
+        else:
+            container = Json5Object(
+                self.entries, self.leading_trivia_nodes, trailing_trivia_nodes
+            )
+
+        container.start = self.start
+        container.end = end
+        return container
+
+
+class _LazyContainerBody:
+    """The body of an array or object, which is only parsed once it's needed."""
+
+    __slots__ = (
+        "parser_class",
+        "source",
+        "closing_char",
+        "start",
+        "body_start",
+        "end",
+        "depth",
+        "max_depth",
+        "share_trivia",
+    )
+
+    def __init__(
+        self,
+        parser: Json5Parser,
+        closing_char: str,
+        start: int,
+        body_start: int,
+        end: int,
+        depth: int,
+    ) -> None:
+        self.parser_class = type(parser)
+        self.source = parser.source
+        self.closing_char = closing_char
+        self.start = start
+        self.body_start = body_start
+        self.end = end
+        self.depth = depth
+        self.max_depth = parser.max_depth
+        self.share_trivia = parser.share_trivia
+
+    def body_source(self) -> str:
+        body = self.source[self.body_start : self.end]
+        return body if isinstance(body, str) else str(body, "utf-8")
+
+    def load(self, start: int) -> Json5Array | Json5Object:
+        max_depth = None if self.max_depth is None else self.max_depth - self.depth
+        parser = self.parser_class(
+            self.source, max_depth, share_trivia=self.share_trivia, lazy=True
+        )
+        parser.current = self.body_start
+        container = parser._parse_nested(self.closing_char)
+        assert isinstance(container, (Json5Array, Json5Object))
+
+        # The skipped body was delimited by counting brackets, which has to
+        # agree with what the parser found.
+        if container.end != self.end:
+            raise Json5ParseError(
+                f"Expected to find '{self.closing_char}'",
+                index=self.end if container.end is None else container.end,
+                source=self.source,
+            )
+
+        parser._move_loaded(container, self.start, start)
+        return container
+
+
+class Json5Parser:
+    """
+    Parser that converts a JSON5 string into a CST.
+
+    If `max_depth` is given, arrays and objects nested deeper than that raise a
+    `Json5ParseError`. Otherwise, any nesting depth is supported.
+
+    If `share_trivia` is True, newlines, commas and common indentation all
+    reuse the same immutable trivia nodes, instead of allocating new ones.
+
+    If `lazy` is True, only the outermost array or object is parsed right away.
+    The nested ones are skipped over by matching brackets, and their members are
+    parsed the first time they are accessed, one level at a time. Syntax errors
+    inside of them are only raised at that point.
+    """
+
+    # What to look for in the source while parsing primitives and skipping over
+    # bodies. `Json5BytesParser` swaps these for the same ones in bytes.
+    _number_re: ClassVar[Pattern[Any]] = _NUMBER_RE
+    _string_chunk_re: ClassVar[dict[str, Pattern[Any]]] = _STRING_CHUNK_RE
+    _skip_token_re: ClassVar[Pattern[Any]] = _SKIP_TOKEN_RE
+    _keywords: ClassVar[tuple[Any, Any, Any]] = ("null", "true", "false")
+    _backslash: ClassVar[Any] = "\\"
+    _opening_brackets: ClassVar[frozenset[Any]] = frozenset("[{")
+    _closing_brackets: ClassVar[frozenset[Any]] = frozenset("]}")
+
+    def __init__(
+        self,
+        source: str,
+        max_depth: int | None = None,
+        share_trivia: bool = False,
+        lazy: bool = False,
+    ) -> None:
+        self.source = source
+        self.current = 0
+        self.max_depth = max_depth
+        self.share_trivia = share_trivia
+        self.lazy = lazy
+
+    @property
+    def scanned(self) -> int:
+        """Returns True if the source has been fully scanned."""
+        return self.current >= len(self.source)
+
+    def advance(self) -> None:
+        """Advance the current pointer."""
+        if self.current < len(self.source):
+            self.current += 1
+
+    def previous(self) -> str:
+        """Returns the previously read character."""
+        return self.source[self.current - 1]
+
+    def _text(self, start: int, end: int) -> str:
+        """Returns the given slice of the source, as a string."""
+        return self.source[start:end]
+
+    def peek(self) -> str:
+        """Returns the current character, without actually consuming it."""
+        return self.source[self.current : self.current + 1]
+
+    def peek_next(self) -> str:
+        """Returns the character one ahead of the current character."""
+        return self.source[self.current + 1 : self.current + 2]
+
+    def peek_non_whitespace(self) -> str:
+        """Returns the first non-whitespace character."""
+        match = _NON_WHITESPACE_RE.search(self.source, self.current)
+        if match is None:
+            return ""
+
+        return match.group()
+
+    def read_char(self) -> str:
+        """
+        Reads one character from the source.
+        If the source has been exhausted, returns an empty string.
+        """
+        char = self.peek()
+        self.advance()
+
+        return char
+
+    def match_next(self, chars: Sequence[str]) -> bool:
+        """
+        Returns True and reads one character from source, but only if it
+        matches any of the given characters. Returns False otherwise.
+        """
+        char = self.source[self.current : self.current + 1]
+        if char and char in chars:
+            self.current += 1
+            return True
+
+        return False
+
+    def consume(self, char: str) -> None:
+        """
+        Consumes the expected character type from source. If the character
+        doesn't match current, raises a parse error.
+        """
+        if self.source.startswith(char, self.current):
+            self.current += 1
+            return
+
+        if self.scanned:
+            raise Json5ParseError(
+                f"Expected to find '{char}', found EOF",
+                index=self.current,
+                source=self.source,
+            )
+
+        current_char = self.read_char()
+        if current_char != char:
+            raise Json5ParseError(
+                f"Expected to find '{char}', found '{current_char}'",
+                index=self.current,
+                source=self.source,
+            )
+
+    def parse(self) -> Json5File:
+        """Scans the source to produce a JSON5 CST."""
+        leading_trivia_nodes = self.parse_trivia()
+        value = self.parse_node()
+        trailing_trivia_nodes = self.parse_trivia()
+
+        # Ensure no more data exists
+        if not self.scanned:
+            token = self.read_char()
+            raise Json5ParseError(f"Unexpected {token}", self.current, self.source)
+
+        tree = Json5File(value, leading_trivia_nodes, trailing_trivia_nodes)
+        tree.start = 0
+        tree.end = self.current
+        return tree
+
+    def parse_node(self) -> Json5Node:
+        """Returns a parsed JSON5 node."""
+        if self.scanned:
+            raise Json5ParseError(
+                "Expected to find JSON5 data, found EOF",
+                index=self.current,
+                source=self.source,
+            )
+
+        return self._parse_nested(closing_char=None)
+
+    def _parse_nested(self, closing_char: str | None) -> Json5Node:
+        """
+        Parses a node along with all of its children.
+
+        Open containers are kept on an explicit stack instead of recursing into
+        them, so the nesting depth isn't limited by Python's recursion limit.
+        If `closing_char` is given, the opening bracket of the outermost
+        container has already been consumed.
+        """
+        stack: list[_Frame] = []
+        node: Json5Node | None = None
+        if closing_char is None:
+            node = self._parse_value_start(stack)
+        else:
+            self._open_container(stack, closing_char)
+
+        while True:
+            if node is not None:
+                if not stack:
+                    return node
+
+                frame = stack[-1]
+                self._parse_separator(node, frame.closing_char)
+                frame.add(node)
+
+            frame = stack[-1]
+            if self.scanned or self.match_next(frame.closing_char):
+                stack.pop()
+                end = self.current
+                trailing_trivia_nodes = self.parse_trivia()
+                node = frame.build(end, trailing_trivia_nodes)
+                continue
+
+            if frame.closing_char == "}":
+                frame.key = self.parse_object_key()
+                if self.scanned:
+                    raise Json5ParseError(
+                        "Expected to find JSON5 data, found EOF",
+                        index=self.current,
+                        source=self.source,
+                    )
+
+            node = self._parse_value_start(stack)
+
+    def _parse_value_start(self, stack: list[_Frame]) -> Json5Node | None:
+        """
+        Parses a primitive, or opens a new container on the stack and returns
+        None if the value is an array or an object.
+        """
+        char = self.source[self.current]
+        if char == "[":
+            self.current += 1
+            if self.lazy and stack:
+                return self._parse_lazy_container(stack, "]")
+            self._open_container(stack, "]")
+            return None
+        elif char == "{":
+            self.current += 1
+            if self.lazy and stack:
+                return self._parse_lazy_container(stack, "}")
+            self._open_container(stack, "}")
+            return None
+        else:
+            return self.parse_primitive()
+
+    def _open_container(self, stack: list[_Frame], closing_char: str) -> None:
+        self._check_depth(len(stack))
+        start = self.current - 1
+        leading_trivia_nodes = self.parse_trivia()
+        stack.append(_Frame(closing_char, start, leading_trivia_nodes))
+
+    def _parse_lazy_container(
+        self, stack: list[_Frame], closing_char: str
+    ) -> Json5Node | None:
+        """
+        Skips over the body of an array or object, to be parsed once accessed.
+        Unterminated containers are opened on the stack as usual instead.
+        """
+        self._check_depth(len(stack))
+        start = self.current - 1
+        leading_trivia_nodes = self.parse_trivia()
+        body_start = self.current
+        end = self._skip_container_body()
+        if end is None:
+            stack.append(_Frame(closing_char, start, leading_trivia_nodes))
+            return None
+
+        container: Json5Array | Json5Object
+        if closing_char == "]":
+            container = Json5Array([], leading_trivia_nodes, [])
+        else:
+            container = Json5Object([], leading_trivia_nodes, [])
+
+        container._lazy = _LazyContainerBody(
+            self, closing_char, start, body_start, end, depth=len(stack)
+        )
+        container.start = start
+        container.end = end
+        self.current = end
+        container.trailing_trivia_nodes = self.parse_trivia()
+        return container
+
+    def _move_loaded(
+        self, container: Json5Array | Json5Object, parsed_start: int, start: int
+    ) -> None:
+        """
+        Moves the offsets of a lazily parsed container that was just loaded from
+        where it was parsed to where it is now. The container might have moved
+        since it was skipped over, by reparsing something before it.
+        """
+        if start != parsed_start:
+            shift_offsets([container], start - parsed_start)
+
+    def _skip_container_body(self) -> int | None:
+        """
+        Returns the index just past the bracket that closes the current
+        container, or None if it isn't closed.
+        """
+        source = self.source
+        skip_token_re = self._skip_token_re
+        opening_brackets = self._opening_brackets
+        closing_brackets = self._closing_brackets
+        depth = 1
+        index = self.current
+        while True:
+            match = skip_token_re.search(source, index)
+            if match is None:
+                return None
+
+            index = match.end()
+            char = source[match.start()]
+            if char in opening_brackets:
+                depth += 1
+            elif char in closing_brackets:
+                depth -= 1
+                if depth == 0:
+                    return index
+
+    def _check_depth(self, depth: int) -> None:
+        """Ensures that a container can be opened inside `depth` other ones."""
+        if self.max_depth is not None and depth >= self.max_depth:
+            raise Json5ParseError(
+                f"Exceeded maximum nesting depth of {self.max_depth}",
+                index=self.current - 1,
+                source=self.source,
+            )
+
+    def parse_primitive(self) -> Json5Primitive:
+        """Returns a parsed JSON primitive."""
+        node: Json5Primitive
+        source = self.source
+        start = self.current
+        char = self.peek()
+        null, true, false = self._keywords
+
+        if char == "n" and source[start : start + 4] == null:
+            self.current += 4
+            node = Json5Null(trailing_trivia_nodes=[])
+
+        elif char == "t" and source[start : start + 4] == true:
+            self.current += 4
+            node = Json5Boolean(
+                source="true",
+                value=True,
+                trailing_trivia_nodes=[],
+            )
+
+        elif char == "f" and source[start : start + 5] == false:
+            self.current += 5
+            node = Json5Boolean(
+                source="false",
+                value=False,
+                trailing_trivia_nodes=[],
+            )
+
+        elif char == '"' or char == "'":
+            self.current += 1
+            # TODO: can remove once mypy has better type narrowing
+            # ref: https://github.com/python/mypy/issues/12535
+            quote_char = cast(Literal['"', "'"], char)
+            string_source, string_value = self.parse_string(quote_char)
+            node = Json5String(string_source, string_value, trailing_trivia_nodes=[])
+
+        # TODO: leading decimal?
+        elif char and (char in string.digits or char in "+-"):
+            number_source, float_value = self.parse_number()
+            node = Json5Number(number_source, float_value, trailing_trivia_nodes=[])
+
+        else:
+            raise Json5ParseError(f"Unexpected {char!r}", self.current, self.source)
+
+        node.start = start
+        node.trailing_trivia_nodes = self.parse_trivia()
+        return node
+
+    def parse_identifier(self) -> str:
+        """
+        Scans keywords and variable names.
+        It doesn't check for the first letter being a non-number because the call-site
+        already confirms that.
+        """
+        # TODO: not full ECMA syntax
+        match = _IDENTIFIER_RE.match(self.source, self.current)
+        assert match is not None  # `\w*` always matches
+        self.current = match.end()
+        return match.group()
+
+    def parse_string(self, quote_char: Literal["'", '"']) -> tuple[str, str]:
+        # TODO: this is probably not all escapes
+        source = self.source
+        text = self._text
+        backslash = self._backslash
+        chunk_re = self._string_chunk_re[quote_char]
+        start_index = self.current
+        unescaped_chunks = []
+        while True:
+            # Everything up to the next quote or backslash is taken verbatim
+            match = chunk_re.match(source, self.current)
+            assert match is not None  # a `*` pattern always matches
+            unescaped_chunks.append(text(self.current, match.end()))
+            self.current = match.end()
+
+            if source[self.current : self.current + 1] != backslash:
+                break
+
+            # Escaping the next character
+            self.current += 1
+            next_char = self.peek()
+            if next_char == "":
+                raise Json5ParseError(
+                    "Unterminated string", index=start_index, source=self.source
+                )
+
+            unescaped_char = _ESCAPES.get(next_char)
+            if unescaped_char is None:
+                escape = "\\" + next_char
+                raise Json5ParseError(
+                    f"Unknown escape sequence: '{escape}'",
+                    index=self.current,
+                    source=self.source,
+                )
+
+            unescaped_chunks.append(unescaped_char)
+            self.current += 1
+
+        # Ensure end quote
+        self.consume(quote_char)
+
+        value = "".join(unescaped_chunks)
+        content = quote_char + text(start_index, self.current)
+        return content, value
+
+    def parse_number(self) -> tuple[str, float]:
+        # TODO: exponent syntax support
+        # TODO: Hexadecimal support
+        start = self.current
+        match = self._number_re.match(self.source, start)
+        assert match is not None  # every part of the pattern is optional
+        self.current = match.end()
+        content = self._text(start, self.current)
+        if not content.lstrip("+-"):
+            # Only a sign, without any digits after it
+            raise Json5ParseError(
+                "Expected to find a digit", index=self.current, source=self.source
+            )
+        return content, float(content)
+
+    def parse_array_member(self) -> Json5Node:
+        value = self.parse_node()
+        self._parse_separator(value, "]")
+        return value
+
+    def parse_array(self) -> Json5Array:
+        return cast(Json5Array, self._parse_nested(closing_char="]"))
+
+    def parse_object_key(self) -> Json5Key:
+        key_value_node: Json5String | Json5Identifier
+        char = self.peek()
+
+        start = self.current
+
+        if char.isalpha() or char == "_":
+            source = self.parse_identifier()
+            trailing_trivia = self.parse_trivia()
+            key_value_node = Json5Identifier(source, trailing_trivia)
+
+        elif char == '"' or char == "'":
+            self.current += 1
+            quote_char = cast(Literal['"', "'"], char)
+            source, value = self.parse_string(quote_char)
+            trailing_trivia = self.parse_trivia()
+            key_value_node = Json5String(source, value, trailing_trivia)
+
+        else:
+            raise Json5ParseError(
+                f"Expected to find identifier",
+                index=self.current,
+                source=self.source,
+            )
+
+        key_value_node.start = start
+        self.consume(":")
+        trivia_after_colon = self.parse_trivia()
+        return Json5Key(key_value_node, trivia_after_colon)
+
+    def parse_object_entry(self) -> tuple[Json5Key, Json5Node]:
+        key_node = self.parse_object_key()
+        value_node = self.parse_node()
+        self._parse_separator(value_node, "}")
+        return key_node, value_node
+
+    def parse_object(self) -> Json5Object:
+        return cast(Json5Object, self._parse_nested(closing_char="}"))
+
+    def _parse_separator(self, value: Json5Node, closing_char: str) -> None:
+        """Parses the comma and trivia following a member of a container."""
+        if self.peek() == closing_char:
+            # Trailing comma not necessary for last element
+            pass
+        else:
+            self.consume(",")
+            value.trailing_trivia_nodes.append(
+                SHARED_COMMA if self.share_trivia else Json5Comma()
+            )
+
+        value.trailing_trivia_nodes.extend(self.parse_trivia())
+
+    def parse_trivia(self) -> list[Json5Trivia]:
+        """
+        Parses and returns all following Trivia nodes.
+
+        Includes newlines, whitespace, and comments (comments end with newline).
+        """
+        trivia_nodes: list[Json5Trivia] = []
+        source = self.source
+        match = _TRIVIA_RUN_RE.match(source, self.current)
+        if match is not None:
+            self.current = match.end()
+            trivia_nodes = self._build_trivia(match.group())
+
+        if source.startswith("/", self.current):
+            # A lone slash, that doesn't start a `//` comment
+            self.current += 1
+            self.consume("/")
+
+        return trivia_nodes
+
+    def _build_trivia(self, run: str) -> list[Json5Trivia]:
+        """Creates the trivia nodes for a run of whitespace and comments."""
+        trivia_nodes: list[Json5Trivia] = []
+        share_trivia = self.share_trivia
+        # The run is made only of trivia tokens, so they tile it exactly
+        for token in _TRIVIA_TOKEN_RE.findall(run):
+            if token == "\n":
+                if share_trivia:
+                    trivia_nodes.append(SHARED_NEWLINE)
+                else:
+                    trivia_nodes.append(Json5Newline())
+            elif token[0] == "/":
+                trivia_nodes.append(Json5Comment(token))
+            elif share_trivia and token in SHARED_WHITESPACE:
+                trivia_nodes.append(SHARED_WHITESPACE[token])
+            else:
+                trivia_nodes.append(Json5Whitespace(token))
+
+        return trivia_nodes
+
+
+class _ValueFrame:
+    """A list or dict that is being loaded, but hasn't been closed yet."""
+
+    __slots__ = ("closing_char", "value", "key")
+
+    def __init__(self, closing_char: str) -> None:
+        self.closing_char = closing_char
+        self.value: list[object] | dict[str, object]
+        self.value = [] if closing_char == "]" else {}
+        self.key = ""
+
+    def add(self, value: object) -> None:
+        if isinstance(self.value, list):
+            self.value.append(value)
+        else:
+            self.value[self.key] = value
+
+
+# Returned in place of a value when an array or object has just been opened.
+_OPENED = object()
+
+
+class Json5ValueParser(Json5Parser):
+    """
+    Parser that converts a JSON5 string straight into Python objects.
+
+    It follows the same grammar as `Json5Parser`, but skips over trivia instead
+    of building nodes for it, and never builds a CST.
+    """
+
+    def load(self) -> object:
+        """Scans the source to produce a Python object."""
+        self.skip_trivia()
+        value = self.parse_value()
+
+        # Ensure no more data exists
+        if not self.scanned:
+            token = self.read_char()
+            raise Json5ParseError(f"Unexpected {token}", self.current, self.source)
+
+        return value
+
+    def parse_value(self) -> object:
+        """Returns a parsed JSON5 value, along with its trailing trivia skipped."""
+        if self.scanned:
+            raise Json5ParseError(
+                "Expected to find JSON5 data, found EOF",
+                index=self.current,
+                source=self.source,
+            )
+
+        return self._load_nested(closing_char=None)
+
+    def _load_nested(self, closing_char: str | None) -> object:
+        """Same as `Json5Parser._parse_nested`, but builds Python objects."""
+        stack: list[_ValueFrame] = []
+        value: object = _OPENED
+        if closing_char is None:
+            value = self._load_value_start(stack)
+        else:
+            self._open_value_container(stack, closing_char)
+
+        while True:
+            if value is not _OPENED:
+                if not stack:
+                    return value
+
+                frame = stack[-1]
+                if self.peek() != frame.closing_char:
+                    self.consume(",")
+                    self.skip_trivia()
+                frame.add(value)
+
+            frame = stack[-1]
+            if self.scanned or self.match_next(frame.closing_char):
+                stack.pop()
+                self.skip_trivia()
+                value = frame.value
+                continue
+
+            if frame.closing_char == "}":
+                frame.key = self.parse_key()
+                if self.scanned:
+                    raise Json5ParseError(
+                        "Expected to find JSON5 data, found EOF",
+                        index=self.current,
+                        source=self.source,
+                    )
+
+            value = self._load_value_start(stack)
+
+    def _load_value_start(self, stack: list[_ValueFrame]) -> object:
+        char = self.source[self.current]
+        if char == "[":
+            self.current += 1
+            self._open_value_container(stack, "]")
+            return _OPENED
+        elif char == "{":
+            self.current += 1
+            self._open_value_container(stack, "}")
+            return _OPENED
+        else:
+            return self.parse_primitive_value()
+
+    def _open_value_container(
+        self, stack: list[_ValueFrame], closing_char: str
+    ) -> None:
+        self._check_depth(len(stack))
+        self.skip_trivia()
+        stack.append(_ValueFrame(closing_char))
+
+    def parse_primitive_value(self) -> object:
+        """Returns a parsed JSON primitive, along with its trailing trivia skipped."""
+        value: object
+        source = self.source
+        char = self.peek()
+
+        if source.startswith("null", self.current):
+            self.current += 4
+            value = None
+
+        elif source.startswith("true", self.current):
+            self.current += 4
+            value = True
+
+        elif source.startswith("false", self.current):
+            self.current += 5
+            value = False
+
+        elif char == '"' or char == "'":
+            self.current += 1
+            quote_char = cast(Literal['"', "'"], char)
+            _, value = self.parse_string(quote_char)
+
+        elif char and (char in string.digits or char in "+-"):
+            number_source, value = self.parse_number()
+            if "." not in number_source:
+                value = int(number_source)
+
+        else:
+            raise Json5ParseError(f"Unexpected {char!r}", self.current, self.source)
+
+        self.skip_trivia()
+        return value
+
+    def parse_array_member_value(self) -> object:
+        value = self.parse_value()
+        if self.peek() != "]":
+            self.consume(",")
+            self.skip_trivia()
+        return value
+
+    def parse_array_value(self) -> list[object]:
+        return cast("list[object]", self._load_nested(closing_char="]"))
+
+    def parse_key(self) -> str:
+        """Returns a parsed object key, skipping the colon and trivia around it."""
+        char = self.peek()
+        if char.isalpha() or char == "_":
+            key = self.parse_identifier()
+        elif char == '"' or char == "'":
+            self.current += 1
+            quote_char = cast(Literal['"', "'"], char)
+            _, key = self.parse_string(quote_char)
+        else:
+            raise Json5ParseError(
+                f"Expected to find identifier",
+                index=self.current,
+                source=self.source,
+            )
+
+        self.skip_trivia()
+        self.consume(":")
+        self.skip_trivia()
+        return key
+
+    def parse_object_value(self) -> dict[str, object]:
+        return cast("dict[str, object]", self._load_nested(closing_char="}"))
+
+    def skip_trivia(self) -> None:
+        """Moves past all following whitespace and comments."""
+        match = _TRIVIA_RUN_RE.match(self.source, self.current)
+        if match is not None:
+            self.current = match.end()
+
+        if self.source.startswith("/", self.current):
+            # A lone slash, that doesn't start a `//` comment
+            self.current += 1
+            self.consume("/")
@@ -0,0 +1,310 @@
+"""Finding nodes in a CST by JSONPath expressions and JSON Pointers."""
+from __future__ import annotations
+import functools
+import re
+
+from typing import Callable, Iterator, List, NoReturn
+
+from json5kit.nodes import Json5Array, Json5File, Json5Node, Json5Object
+
+# Turns the nodes matched so far into the nodes matched by the next segment.
+_Step = Callable[[List[Json5Node]], List[Json5Node]]
+# Selects some of the children of a single node.
+_Selector = Callable[[Json5Node], List[Json5Node]]
+
+_NAME_RE = re.compile(r"[\w$-]+")
+_INDEX_OR_SLICE_RE = re.compile(r"(-?\d+)?(?:(:)(-?\d+)?(?::(-?\d+)?)?)?")
+_QUOTED_NAME_RE = {
+    '"': re.compile(r'"((?:[^"\\]|\\.)*)"', re.DOTALL),
+    "'": re.compile(r"'((?:[^'\\]|\\.)*)'", re.DOTALL),
+}
+_QUOTED_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+_POINTER_INDEX_RE = re.compile(r"0|[1-9]\d*")
+
+# How many compiled paths and pointers are kept around.
+_CACHE_SIZE = 256
+
+
+class Json5PathError(Exception):
+    """Raised for a malformed JSONPath expression or JSON Pointer."""
+
+
+class Json5Path:
+    """
+    A compiled JSONPath expression, that finds nodes in a CST.
+
+    Supports the root `$`, names as `.name` or `['name']`, indexes as `[0]` or
+    `[-1]`, slices as `[start:stop:step]`, wildcards as `.*` or `[*]`, unions
+    like `['a', 'b']` or `[0, 2]`, and recursive descent as `..name`, `..*` or
+    `..[0]`. Filter and script expressions aren't supported.
+
+    Only the arrays and objects that the path leads into are visited, so a
+    lazily parsed tree only has those loaded. Recursive descent still has to
+    visit every array and object below, but skips over the rest of the nodes.
+    """
+
+    __slots__ = ("path", "_steps")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._steps = _compile_steps(path)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.path!r})"
+
+    def find(self, node: Json5Node) -> list[Json5Node]:
+        """
+        Returns the nodes that the path matches. These are the nodes in the
+        tree itself, so changing them changes the tree.
+        """
+        if isinstance(node, Json5File):
+            node = node.value
+
+        nodes = [node]
+        for step in self._steps:
+            if not nodes:
+                break
+            nodes = step(nodes)
+
+        return nodes
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def compile_path(path: str) -> Json5Path:
+    """Compiles a JSONPath expression, reusing it if it was compiled recently."""
+    return Json5Path(path)
+
+
+def query(node: Json5Node, path: str) -> list[Json5Node]:
+    """
+    Returns the nodes matched by a JSONPath expression like
+    `$.services[*].port`, see `Json5Path` for the supported syntax.
+    """
+    return compile_path(path).find(node)
+
+
+def resolve_pointer(node: Json5Node, pointer: str) -> Json5Node:
+    """
+    Returns the node that a JSON Pointer like `/services/0/port` refers to,
+    raising KeyError if there's none.
+    """
+    if isinstance(node, Json5File):
+        node = node.value
+
+    for token in _parse_pointer(pointer):
+        child: Json5Node | None = None
+        if isinstance(node, Json5Object):
+            child = node.get(token)
+        elif isinstance(node, Json5Array) and _POINTER_INDEX_RE.fullmatch(token):
+            members = node.members
+            index = int(token)
+            if index < len(members):
+                child = members[index]
+
+        if child is None:
+            raise KeyError(pointer)
+        node = child
+
+    return node
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _parse_pointer(pointer: str) -> tuple[str, ...]:
+    if not pointer:
+        return ()
+    if not pointer.startswith("/"):
+        raise Json5PathError(f"JSON Pointer has to start with '/': {pointer!r}")
+    if re.search(r"~(?![01])", pointer):
+        raise Json5PathError(f"Invalid escape in JSON Pointer: {pointer!r}")
+
+    return tuple(
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    )
+
+
+def _compile_steps(path: str) -> list[_Step]:
+    """Splits the path into its segments, and compiles each one into a step."""
+    if not path.startswith("$"):
+        raise Json5PathError(f"JSONPath has to start with '$': {path!r}")
+
+    steps: list[_Step] = []
+    index = 1
+    while index < len(path):
+        descendants = path.startswith("..", index)
+        if descendants:
+            index += 2
+            if path.startswith(".", index):
+                _raise_unexpected(path, index)
+        elif path.startswith(".", index):
+            index += 1
+            if path.startswith("[", index):
+                _raise_unexpected(path, index)
+        elif not path.startswith("[", index):
+            _raise_unexpected(path, index)
+
+        if path.startswith("[", index):
+            selector, index = _compile_brackets(path, index + 1)
+        elif path.startswith("*", index):
+            selector = _select_all
+            index += 1
+        else:
+            match = _NAME_RE.match(path, index)
+            if match is None:
+                _raise_unexpected(path, index)
+            selector = _select_name(match.group())
+            index = match.end()
+
+        steps.append(_descendants_step(selector) if descendants else _step(selector))
+
+    return steps
+
+
+def _compile_brackets(path: str, index: int) -> tuple[_Selector, int]:
+    """
+    Compiles the selectors inside of brackets, starting right after the `[`.
+    Returns the selector, and the index right after the closing `]`.
+    """
+    selectors: list[_Selector] = []
+    while True:
+        index = _skip_whitespace(path, index)
+        char = path[index : index + 1]
+        if char == "*":
+            selectors.append(_select_all)
+            index += 1
+        elif char == '"' or char == "'":
+            quoted_match = _QUOTED_NAME_RE[char].match(path, index)
+            if quoted_match is None:
+                raise Json5PathError(f"Unterminated name in JSONPath: {path!r}")
+            name = _QUOTED_ESCAPE_RE.sub(r"\1", quoted_match.group(1))
+            selectors.append(_select_name(name))
+            index = quoted_match.end()
+        elif char == "?" or char == "(":
+            raise Json5PathError(f"Filter expressions aren't supported: {path!r}")
+        else:
+            match = _INDEX_OR_SLICE_RE.match(path, index)
+            assert match is not None  # every part of the pattern is optional
+            if not match.group():
+                _raise_unexpected(path, index)
+            start, colon, stop, step = match.groups()
+            if colon is None:
+                selectors.append(_select_index(int(start)))
+            else:
+                selectors.append(
+                    _select_slice(_to_int(start), _to_int(stop), _to_int(step))
+                )
+            index = match.end()
+
+        index = _skip_whitespace(path, index)
+        if path.startswith("]", index):
+            break
+        if not path.startswith(",", index):
+            _raise_unexpected(path, index)
+        index += 1
+
+    if len(selectors) == 1:
+        return selectors[0], index + 1
+
+    def select_union(node: Json5Node) -> list[Json5Node]:
+        return [child for selector in selectors for child in selector(node)]
+
+    return select_union, index + 1
+
+
+def _skip_whitespace(path: str, index: int) -> int:
+    while path[index : index + 1].isspace():
+        index += 1
+    return index
+
+
+def _raise_unexpected(path: str, index: int) -> NoReturn:
+    if index >= len(path):
+        raise Json5PathError(f"Unexpected end of JSONPath: {path!r}")
+    raise Json5PathError(f"Unexpected {path[index]!r} at {index} in JSONPath: {path!r}")
+
+
+def _to_int(number: str | None) -> int | None:
+    return None if number is None else int(number)
+
+
+def _step(selector: _Selector) -> _Step:
+    def step(nodes: list[Json5Node]) -> list[Json5Node]:
+        if len(nodes) == 1:
+            return selector(nodes[0])
+        return [child for node in nodes for child in selector(node)]
+
+    return step
+
+
+def _descendants_step(selector: _Selector) -> _Step:
+    def step(nodes: list[Json5Node]) -> list[Json5Node]:
+        return [
+            child
+            for node in nodes
+            for container in _iter_containers(node)
+            for child in selector(container)
+        ]
+
+    return step
+
+
+def _iter_containers(node: Json5Node) -> Iterator[Json5Node]:
+    """Yields the node and every array and object inside of it, in document order."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Json5Object):
+            children = node.values
+        elif isinstance(node, Json5Array):
+            children = node.members
+        else:
+            continue
+
+        yield node
+        stack.extend(
+            child
+            for child in reversed(children)
+            if isinstance(child, (Json5Array, Json5Object))
+        )
+
+
+def _select_all(node: Json5Node) -> list[Json5Node]:
+    if isinstance(node, Json5Object):
+        return list(node.values)
+    if isinstance(node, Json5Array):
+        return list(node.members)
+    return []
+
+
+def _select_name(name: str) -> _Selector:
+    def select_name(node: Json5Node) -> list[Json5Node]:
+        if isinstance(node, Json5Object):
+            child = node.get(name)
+            if child is not None:
+                return [child]
+        return []
+
+    return select_name
+
+
+def _select_index(index: int) -> _Selector:
+    def select_index(node: Json5Node) -> list[Json5Node]:
+        if isinstance(node, Json5Array):
+            members = node.members
+            if -len(members) <= index < len(members):
+                return [members[index]]
+        return []
+
+    return select_index
+
+
+def _select_slice(start: int | None, stop: int | None, step: int | None) -> _Selector:
+    if step == 0:
+        raise Json5PathError("Slice step cannot be zero")
+    members_slice = slice(start, stop, step)
+
+    def select_slice(node: Json5Node) -> list[Json5Node]:
+        if isinstance(node, Json5Array):
+            return node.members[members_slice]
+        return []
+
+    return select_slice
@@ -0,0 +1,210 @@
+"""Reading the records of a JSON5 file one at a time, as they're parsed."""
+from __future__ import annotations
+import codecs
+import contextlib
+import os
+
+from typing import IO, Callable, ContextManager, Iterator, TypeVar, Union
+
+from json5kit.nodes import Json5Node
+from json5kit.parser import (
+    _NON_WHITESPACE_RE,
+    Json5ParseError,
+    Json5Parser,
+    Json5ValueParser,
+)
+from json5kit.spans import shift_offsets
+from json5kit.stream import _INCOMPLETE_TOKEN_SIZE, _InputPosition
+
+_T = TypeVar("_T")
+
+
+class _RecordReader:
+    """
+    Reads a file into a parser in chunks, dropping the input that has already
+    been parsed.
+    """
+
+    def __init__(
+        self, parser: Json5Parser, file: IO[str] | IO[bytes], chunk_size: int
+    ) -> None:
+        self.parser = parser
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.position = _InputPosition()
+        self.eof = False
+
+    def read(self, parse_step: Callable[[], _T]) -> _T:
+        """
+        Runs one step of the parse. If the step runs into the end of the input
+        that has been read so far, more of the file is read and it's run again.
+        """
+        parser = self.parser
+        while True:
+            start = parser.current
+            try:
+                result = parse_step()
+            except (Json5ParseError, ValueError) as error:
+                if (
+                    self.eof
+                    or len(parser.source) - parser.current >= _INCOMPLETE_TOKEN_SIZE
+                ):
+                    if isinstance(error, Json5ParseError):
+                        raise self.position.shift_error(error) from None
+                    raise
+            else:
+                if self.eof or parser.current < len(parser.source) - 1:
+                    return result
+
+            parser.current = start
+            self._read_more()
+
+    def _read_more(self) -> None:
+        parser = self.parser
+        self.position.advance(parser.source[: parser.current])
+        kept = parser.source[parser.current :]
+
+        # Reading at least as much as is kept, so that a record which is much
+        # bigger than a chunk is only parsed again a few times
+        chunk = self.file.read(max(self.chunk_size, len(kept)))
+        if not chunk:
+            self.eof = True
+        if isinstance(chunk, bytes):
+            text = self.decoder.decode(chunk, final=self.eof)
+        else:
+            text = chunk
+
+        parser.source = kept + text
+        parser.current = 0
+
+    def iter_array_members(
+        self,
+        skip_trivia: Callable[[], object],
+        parse_member: Callable[[], _T],
+    ) -> Iterator[_T]:
+        """Yields the members of the top-level array, as they're parsed."""
+        parser = self.parser
+        self.read(skip_trivia)
+        self.read(self._open_array)
+        self.read(skip_trivia)
+        # The members are parsed on their own, but are nested in the array
+        if parser.max_depth is not None:
+            parser.max_depth -= 1
+
+        # Like `Json5Parser`, an unterminated array ends at the end of the file
+        while not parser.scanned:
+            if parser.peek() == "]":
+                self.read(lambda: self._parse_end(skip_trivia))
+                return
+
+            yield self.read(parse_member)
+
+    def iter_lines(
+        self,
+        skip_trivia: Callable[[], object],
+        parse_line: Callable[[], _T],
+    ) -> Iterator[_T]:
+        """Yields the values of a JSON5 lines file, as they're parsed."""
+        parser = self.parser
+        self.read(skip_trivia)
+        while not parser.scanned:
+            yield self.read(lambda: self._parse_line(parse_line))
+
+    def _parse_line(self, parse_line: Callable[[], _T]) -> _T:
+        """Parses a value of a JSON5 lines file, which has to end its line."""
+        parser = self.parser
+        start = parser.current
+        value = parse_line()
+
+        # Only trivia can follow the value on its line. A comment would run up
+        # to the newline, so the next value has to be on a line of its own.
+        if not parser.scanned:
+            source = parser.source
+            line_start = source.rfind("\n", start, parser.current) + 1
+            if not line_start or _NON_WHITESPACE_RE.search(
+                source, line_start, parser.current
+            ):
+                token = parser.peek()
+                raise Json5ParseError(
+                    f"Expected to find a newline, found {token!r}",
+                    index=parser.current,
+                    source=source,
+                )
+
+        return value
+
+    def _open_array(self) -> None:
+        parser = self.parser
+        parser.consume("[")
+        parser._check_depth(0)
+
+    def _parse_end(self, skip_trivia: Callable[[], object]) -> None:
+        parser = self.parser
+        parser.consume("]")
+        skip_trivia()
+
+        # Ensure no more data exists
+        if not parser.scanned:
+            token = parser.read_char()
+            raise Json5ParseError(f"Unexpected {token}", parser.current, parser.source)
+
+
+def iter_records(
+    file: Union[str, os.PathLike[str], IO[str], IO[bytes]],
+    lines: bool = False,
+    max_depth: int | None = None,
+    share_trivia: bool = False,
+    chunk_size: int = 65536,
+) -> Iterator[Json5Node]:
+    """
+    Yields the members of a file's top-level JSON5 array as CST nodes, each one
+    as soon as it has been parsed. With `lines=True`, the file is a JSON5 lines
+    file instead, i.e. values separated by newlines.
+
+    `file` is a path, or a text or binary file object. It's read `chunk_size`
+    characters (or bytes) at a time, so that memory is bounded by the size of
+    the largest record. Offsets are counted in characters.
+    """
+    with _open(file) as opened_file:
+        parser = Json5Parser("", max_depth, share_trivia=share_trivia)
+        reader = _RecordReader(parser, opened_file, chunk_size)
+        if lines:
+            nodes = reader.iter_lines(parser.parse_trivia, parser.parse_node)
+        else:
+            nodes = reader.iter_array_members(
+                parser.parse_trivia, parser.parse_array_member
+            )
+
+        for node in nodes:
+            if reader.position.index:
+                shift_offsets([node], reader.position.index)
+            yield node
+
+
+def iter_record_values(
+    file: Union[str, os.PathLike[str], IO[str], IO[bytes]],
+    lines: bool = False,
+    max_depth: int | None = None,
+    chunk_size: int = 65536,
+) -> Iterator[object]:
+    """Same as `iter_records()`, but yields plain Python objects like `loads()`."""
+    with _open(file) as opened_file:
+        parser = Json5ValueParser("", max_depth)
+        reader = _RecordReader(parser, opened_file, chunk_size)
+        if lines:
+            yield from reader.iter_lines(parser.skip_trivia, parser.parse_value)
+        else:
+            yield from reader.iter_array_members(
+                parser.skip_trivia, parser.parse_array_member_value
+            )
+
+
+def _open(
+    file: Union[str, os.PathLike[str], IO[str], IO[bytes]],
+) -> ContextManager[Union[IO[str], IO[bytes]]]:
+    """Opens a path for reading, or leaves a file object open for the caller."""
+    if isinstance(file, (str, os.PathLike)):
+        return open(file, "rb")
+
+    return contextlib.nullcontext(file)
@@ -0,0 +1,310 @@
+"""A compact binary format for storing parsed CSTs, and loading them back fast."""
+from __future__ import annotations
+import contextlib
+import gc
+import marshal
+import sys
+from array import array
+
+from typing import Any, Iterable, Iterator, Tuple, Union, cast
+
+from json5kit.nodes import (
+    Json5Array,
+    Json5Boolean,
+    Json5Comma,
+    Json5Comment,
+    Json5Container,
+    Json5File,
+    Json5Identifier,
+    Json5Key,
+    Json5Newline,
+    Json5Node,
+    Json5Null,
+    Json5Number,
+    Json5Object,
+    Json5Primitive,
+    Json5String,
+    Json5Trivia,
+    Json5Whitespace,
+    _get_shared_trivia,
+    _new_trivia,
+    is_shared_trivia,
+)
+
+_MAGIC = b"J5CST"
+_FORMAT_VERSION = 1
+
+_PRIMITIVE_CLASSES: list[type[Json5Primitive]] = [
+    Json5Null,
+    Json5Boolean,
+    Json5Number,
+    Json5String,
+    Json5Identifier,
+]
+_TRIVIA_CLASSES: list[type[Json5Trivia]] = [
+    Json5Comment,
+    Json5Whitespace,
+    Json5Newline,
+    Json5Comma,
+]
+
+# The structure is a flat list of ints. Arrays and objects are opened by these
+# codes and closed by `_END`. Any other code is a primitive: a value when it's
+# positive, or the key of an object's entry when it's negative. Its absolute
+# value is its index in the table of primitives, plus `_FIRST_PRIMITIVE`.
+_ARRAY = 0
+_OBJECT = 1
+_END = 2
+_FIRST_PRIMITIVE = 3
+
+# Stands for an offset of None, i.e. a node that didn't come from a parser.
+_NO_OFFSET = -1
+
+_TriviaSpec = Tuple[int, str, bool]
+
+
+@contextlib.contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Turns off the garbage collector for a while. Creating as many objects as a
+    big tree has keeps triggering it, and then it takes most of the time, even
+    though trees don't have any reference cycles for it to find.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def dump_cst(tree: Json5File) -> bytes:
+    """
+    Serializes a tree into bytes, that `load_cst()` turns back into the same
+    tree, offsets and all.
+
+    Primitives and runs of trivia are stored once in a table, and the tree
+    refers to them by their index. Lazily parsed arrays and objects are loaded
+    first. Like pickle, the format is only meant for data you trust.
+    """
+    primitives: dict[object, int] = {}
+    trivia_runs: dict[tuple[_TriviaSpec, ...], int] = {(): 0}
+    structure: list[int] = []
+
+    def add_trivia(trivia_nodes: list[Json5Trivia]) -> None:
+        if not trivia_nodes:
+            structure.append(0)
+            return
+
+        run = tuple(
+            (
+                _TRIVIA_CLASSES.index(type(trivia)),
+                trivia.source,
+                is_shared_trivia(trivia),
+            )
+            for trivia in trivia_nodes
+        )
+        structure.append(trivia_runs.setdefault(run, len(trivia_runs)))
+
+    def add_primitive(node: Json5Primitive, is_key: bool = False) -> None:
+        value = node.value
+        # 1 and 1.0 (and True) are equal, but have to stay apart
+        key = (type(node), node.source, type(value), value)
+        code = primitives.setdefault(key, len(primitives)) + _FIRST_PRIMITIVE
+        structure.append(-code if is_key else code)
+        structure.append(_NO_OFFSET if node.start is None else node.start)
+        add_trivia(node.trailing_trivia_nodes)
+
+    def add_container(node: Json5Container) -> None:
+        structure.append(_NO_OFFSET if node.start is None else node.start)
+        structure.append(_NO_OFFSET if node.end is None else node.end)
+        add_trivia(node.leading_trivia_nodes)
+        add_trivia(node.trailing_trivia_nodes)
+
+    add_container(tree)
+    # Nested containers are kept on an explicit stack instead of recursing
+    stack: list[Iterator[Union[Json5Node, Json5Key]]] = [iter([tree.value])]
+    while stack:
+        for node in stack[-1]:
+            if isinstance(node, Json5Primitive):
+                add_primitive(node)
+            elif isinstance(node, Json5Key):
+                add_primitive(node.value, is_key=True)
+                add_trivia(node.trailing_trivia_nodes)
+            elif isinstance(node, Json5Array):
+                structure.append(_ARRAY)
+                add_container(node)
+                stack.append(iter(node.members))
+                break
+            elif isinstance(node, Json5Object):
+                structure.append(_OBJECT)
+                add_container(node)
+                stack.append(_iter_entries(node))
+                break
+            else:
+                raise TypeError(f"Cannot serialize {type(node).__name__}")
+        else:
+            stack.pop()
+            if stack:
+                structure.append(_END)
+
+    primitive_keys = cast("list[tuple[type, str, type, object]]", list(primitives))
+    primitive_table = [
+        (_PRIMITIVE_CLASSES.index(primitive_class), source, value)
+        for primitive_class, source, _, value in primitive_keys
+    ]
+    # Offsets only take 8 bytes in documents of more than 2 GB
+    typecode = "i" if max(structure) < 2**31 else "q"
+    structure_array = array(typecode, structure)
+    if sys.byteorder != "little":
+        structure_array.byteswap()
+    header = _MAGIC + bytes([_FORMAT_VERSION]) + typecode.encode()
+    return header + marshal.dumps(
+        (primitive_table, list(trivia_runs), structure_array.tobytes()), 4
+    )
+
+
+def _iter_entries(node: Json5Object) -> Iterator[Union[Json5Node, Json5Key]]:
+    for key, value in zip(node.keys, node.values):
+        yield key
+        yield value
+
+
+def load_cst(data: bytes) -> Json5File:
+    """Loads a tree that was serialized by `dump_cst()`."""
+    if data[: len(_MAGIC)] != _MAGIC or len(data) < len(_MAGIC) + 2:
+        raise ValueError("Not a serialized JSON5 CST")
+    version = data[len(_MAGIC)]
+    if version != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported JSON5 CST format version: {version}")
+
+    typecode = chr(data[len(_MAGIC) + 1])
+    with _gc_paused():
+        return _decode(data[len(_MAGIC) + 2 :], typecode)
+
+
+def _decode(payload: bytes, typecode: str) -> Json5File:
+    primitive_table, trivia_table, structure_bytes = marshal.loads(payload)
+    structure = array(typecode)
+    structure.frombytes(structure_bytes)
+    if sys.byteorder != "little":
+        structure.byteswap()
+
+    # Padded so that the codes of primitives can be used as indexes. The class
+    # is Any, as it's the key's string or identifier class for negative codes.
+    primitives: list[tuple[Any, str, object]] = [
+        (Json5Null, "", None)
+    ] * _FIRST_PRIMITIVE
+    primitives.extend(
+        (_PRIMITIVE_CLASSES[class_index], source, value)
+        for class_index, source, value in primitive_table
+    )
+    # Runs of shared trivia are copied as is, other runs have nodes to create
+    trivia_runs: list[tuple[Json5Trivia, ...] | list[object]] = []
+    for run in trivia_table:
+        if all(shared for _, _, shared in run):
+            trivia_runs.append(
+                tuple(_get_shared_trivia(source) for _, source, _ in run)
+            )
+        else:
+            trivia_runs.append(
+                [
+                    (
+                        _get_shared_trivia(source)
+                        if shared
+                        else (_TRIVIA_CLASSES[class_index], source)
+                    )
+                    for class_index, source, shared in run
+                ]
+            )
+
+    codes = iter(structure)
+    next_code = codes.__next__
+    new = object.__new__
+
+    def read_trivia() -> list[Json5Trivia]:
+        run = trivia_runs[next_code()]
+        if run.__class__ is tuple:
+            return [*run]
+        return _build_trivia(run)
+
+    def read_container(node: Json5Container) -> None:
+        start = next_code()
+        end = next_code()
+        node.start = None if start == _NO_OFFSET else start
+        node.end = None if end == _NO_OFFSET else end
+        node.leading_trivia_nodes = read_trivia()
+        node.trailing_trivia_nodes = read_trivia()
+        node._structural_hash = None
+        node._structural_hash_generation = 0
+
+    tree = new(Json5File)
+    read_container(tree)
+
+    # This is the hot loop, so reading the trivia of primitives is inlined
+    root: list[Json5Node] = []
+    members = root
+    keys: list[Json5Key] = []
+    stack: list[tuple[list[Json5Node], list[Json5Key]]] = []
+    for code in codes:
+        if code >= _FIRST_PRIMITIVE:
+            primitive_class, source, value = primitives[code]
+            node = new(primitive_class)
+            node.source = source
+            node.value = value
+            start = next_code()
+            node.start = None if start == _NO_OFFSET else start
+            run = trivia_runs[next_code()]
+            if run.__class__ is tuple:
+                node.trailing_trivia_nodes = [*run]
+            else:
+                node.trailing_trivia_nodes = _build_trivia(run)
+            members.append(node)
+        elif code < 0:
+            primitive_class, source, value = primitives[-code]
+            node = new(primitive_class)
+            node.source = source
+            node.value = value
+            start = next_code()
+            node.start = None if start == _NO_OFFSET else start
+            key = new(Json5Key)
+            key.value = node
+            node.trailing_trivia_nodes = read_trivia()
+            key.trailing_trivia_nodes = read_trivia()
+            keys.append(key)
+        elif code == _ARRAY:
+            array_node = new(Json5Array)
+            read_container(array_node)
+            array_node._lazy = None
+            members.append(array_node)
+            stack.append((members, keys))
+            members = array_node._members = []
+        elif code == _OBJECT:
+            object_node = new(Json5Object)
+            read_container(object_node)
+            object_node._lazy = None
+            object_node._index = None
+            object_node._indexed_count = 0
+            members.append(object_node)
+            stack.append((members, keys))
+            members = object_node._values = []
+            keys = object_node._keys = []
+        else:
+            members, keys = stack.pop()
+
+    (tree.value,) = root
+    return tree
+
+
+def _build_trivia(run: Iterable[object]) -> list[Json5Trivia]:
+    """Creates the trivia nodes of a run that has unshared trivia in it."""
+    trivia_nodes: list[Json5Trivia] = []
+    for spec in run:
+        if spec.__class__ is tuple:
+            trivia_class, source = cast("tuple[type[Json5Trivia], str]", spec)
+            trivia_nodes.append(_new_trivia(trivia_class, source))
+        else:
+            trivia_nodes.append(cast(Json5Trivia, spec))
+
+    return trivia_nodes
@@ -0,0 +1,172 @@
+"""Source offsets of CST nodes, and converting offsets into lines and columns."""
+from __future__ import annotations
+from bisect import bisect_right
+import mmap
+import re
+
+from typing import Iterator, Union, cast
+
+from json5kit.nodes import (
+    Json5Array,
+    Json5Container,
+    Json5File,
+    Json5Key,
+    Json5Node,
+    Json5Object,
+    Json5Primitive,
+    Json5Trivia,
+)
+
+# UTF-8 encoded sources that can be parsed without decoding them first.
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+_NEWLINE_RE = re.compile("\n")
+_NEWLINE_BYTES_RE = re.compile(b"\n")
+
+
+def index_to_line_column(index: int, source: str | Buffer) -> tuple[int, int]:
+    """
+    Converts the tokenizer index into a line and column for the error.
+
+    For a UTF-8 encoded source the index is a byte offset, but the column is
+    still counted in characters.
+    """
+    index = min(index, len(source))
+    if not isinstance(source, str):
+        line, line_start = 1, 0
+        for match in _NEWLINE_BYTES_RE.finditer(source, 0, index):
+            line += 1
+            line_start = match.end()
+
+        return line, len(str(source[line_start:index], "utf-8", "replace"))
+
+    line = source.count("\n", 0, index) + 1
+    column = index - (source.rfind("\n", 0, index) + 1)
+    return line, column
+
+
+class LineIndex:
+    """
+    Maps offsets in a source to lines and columns, and back.
+
+    The start of every line is found once when the index is created, after which
+    each lookup is a binary search. Lines start at 1, and columns at 0.
+    """
+
+    __slots__ = ("line_starts", "length")
+
+    def __init__(self, source: str) -> None:
+        self.line_starts = [0]
+        self.line_starts.extend(match.end() for match in _NEWLINE_RE.finditer(source))
+        self.length = len(source)
+
+    def line_column(self, index: int) -> tuple[int, int]:
+        """Returns the line and column of the given offset."""
+        index = min(index, self.length)
+        line = bisect_right(self.line_starts, index)
+        return line, index - self.line_starts[line - 1]
+
+    def index(self, line: int, column: int) -> int:
+        """Returns the offset of the given line and column."""
+        if not 1 <= line <= len(self.line_starts):
+            raise ValueError(f"Line {line} is out of bounds")
+
+        return self.line_starts[line - 1] + column
+
+
+def shift_offsets(nodes: list[Json5Node], delta: int) -> None:
+    """Moves the offsets of the given nodes and all of their children by `delta`."""
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Json5Key):
+            stack.append(node.value)
+            continue
+
+        if isinstance(node, (Json5Primitive, Json5Container)):
+            if node.start is not None:
+                node.start += delta
+        if isinstance(node, Json5Container) and node.end is not None:
+            node.end += delta
+
+        # The children of a lazily parsed container get shifted when it's loaded
+        if isinstance(node, Json5Array) and node._lazy is None:
+            stack.extend(node.members)
+        elif isinstance(node, Json5Object) and node._lazy is None:
+            stack.extend(node.keys)
+            stack.extend(node.values)
+
+
+# Marks the point in a node's source where the node itself ends, and only its
+# trailing trivia follows.
+_END = object()
+_SpanPart = Union[str, Json5Node, object]
+
+
+def iter_spans(node: Json5Node) -> Iterator[tuple[Json5Node, int, int]]:
+    """
+    Yields every node in the tree starting at `node` (including `node` itself),
+    along with the offsets of its start and end in the source.
+
+    Like the `start` and `end` attributes of the nodes, a span doesn't include
+    the trailing trivia of the node. Nodes are yielded as soon as their end is
+    known, so in the order of their end offsets, with children before parents.
+
+    Trivia nodes don't store their own offsets since they can be shared, so
+    they are counted from the nearest node that does, or from 0.
+    """
+    start = getattr(node, "start", None)
+    offset = start if isinstance(start, int) else 0
+
+    stack = [(node, offset, _span_parts(node))]
+    while stack:
+        current, current_start, parts = stack[-1]
+        for part in parts:
+            if part is _END:
+                yield current, current_start, offset
+            elif isinstance(part, str):
+                offset += len(part)
+            else:
+                child = cast(Json5Node, part)
+                stack.append((child, offset, _span_parts(child)))
+                break
+        else:
+            stack.pop()
+
+
+def _span_parts(node: Json5Node) -> Iterator[_SpanPart]:
+    """Yields the child nodes and punctuation of a node in source order."""
+    if isinstance(node, Json5Trivia):
+        yield node.source
+        yield _END
+        return
+
+    if isinstance(node, Json5Primitive):
+        yield node.source
+    elif isinstance(node, Json5Key):
+        yield node.value
+        yield ":"
+    elif isinstance(node, Json5File):
+        yield from node.leading_trivia_nodes
+        yield node.value
+    elif isinstance(node, Json5Array):
+        yield "["
+        yield from node.leading_trivia_nodes
+        yield from node.members
+        yield "]"
+    elif isinstance(node, Json5Object):
+        yield "{"
+        yield from node.leading_trivia_nodes
+        for key, value in zip(node.keys, node.values):
+            yield key
+            yield value
+        yield "}"
+    else:
+        raise NotImplementedError(f"Unknown node type: {type(node).__name__}")
+
+    # A file's trailing trivia is part of it, since it has no closing bracket
+    if not isinstance(node, Json5File):
+        yield _END
+    yield from node.trailing_trivia_nodes
+    if isinstance(node, Json5File):
+        yield _END
@@ -0,0 +1,174 @@
+"""Opt-in statistics about where a parse spends its time, and what it builds."""
+from __future__ import annotations
+import sys
+from collections import Counter
+from time import perf_counter
+
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
+from json5kit.nodes import Json5File, Json5Key, Json5Node, Json5Primitive, Json5Trivia
+from json5kit.parser import Json5Parser, _Frame
+
+# The parts of a parse that are timed. They never call each other, so their
+# times add up, and whatever is left of the total is spent on building the
+# containers and the nodes of primitives.
+PHASES = ("parse_trivia", "parse_string", "parse_number", "parse_identifier")
+
+
+class Json5ParseStats:
+    """
+    Time and counts collected by `Json5InstrumentedParser`, added up over all
+    the parses that it's passed to.
+
+    `phase_seconds` and `phase_counts` have the time spent in, and the number
+    of calls to, each of `PHASES`. `node_counts` has the number of nodes built,
+    by class name. `trivia_chars` is how much of the source was whitespace,
+    comments and commas, and `payload_chars` how much was everything else.
+    """
+
+    def __init__(self) -> None:
+        self.parses = 0
+        self.seconds = 0.0
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.phase_counts = dict.fromkeys(PHASES, 0)
+        self.node_counts: Counter[str] = Counter()
+        self.trivia_chars = 0
+        self.payload_chars = 0
+        self.max_depth = 0
+
+    @property
+    def other_seconds(self) -> float:
+        """Time spent outside of the timed phases."""
+        return self.seconds - sum(self.phase_seconds.values())
+
+    def to_dict(self) -> dict[str, int | float]:
+        """Returns the stats as a flat dictionary, to be sent on to metrics."""
+        stats: dict[str, int | float] = {
+            "parses": self.parses,
+            "seconds": self.seconds,
+            "other_seconds": self.other_seconds,
+            "trivia_chars": self.trivia_chars,
+            "payload_chars": self.payload_chars,
+            "max_depth": self.max_depth,
+        }
+        for phase in PHASES:
+            stats[f"{phase}.seconds"] = self.phase_seconds[phase]
+            stats[f"{phase}.count"] = self.phase_counts[phase]
+        for class_name, count in sorted(self.node_counts.items()):
+            stats[f"nodes.{class_name}"] = count
+
+        return stats
+
+
+class Json5InstrumentedParser(Json5Parser):
+    """
+    Same as `Json5Parser`, but collects `Json5ParseStats` as it parses.
+
+    Timing every phase makes parsing about twice as slow, and that overhead is
+    part of the times it reports. `Json5Parser` itself is left as it is, so the
+    stats cost nothing when they're not asked for.
+
+    With `lazy=True`, the arrays and objects that are skipped over are counted,
+    but what's inside of them isn't, as it's only parsed once it's accessed.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        max_depth: int | None = None,
+        share_trivia: bool = False,
+        lazy: bool = False,
+        stats: Json5ParseStats | None = None,
+    ) -> None:
+        super().__init__(source, max_depth, share_trivia=share_trivia, lazy=lazy)
+        self.stats = Json5ParseStats() if stats is None else stats
+
+    def parse(self) -> Json5File:
+        stats = self.stats
+        start_time = perf_counter()
+        start = self.current
+        trivia_chars = stats.trivia_chars
+        try:
+            tree = super().parse()
+        finally:
+            stats.parses += 1
+            stats.seconds += perf_counter() - start_time
+
+        stats.node_counts["Json5File"] += 1
+        parsed_trivia_chars = stats.trivia_chars - trivia_chars
+        stats.payload_chars += self.current - start - parsed_trivia_chars
+        return tree
+
+    def _open_container(self, stack: list[_Frame], closing_char: str) -> None:
+        self._count_container(len(stack), closing_char)
+        super()._open_container(stack, closing_char)
+
+    def _parse_lazy_container(
+        self, stack: list[_Frame], closing_char: str
+    ) -> Json5Node | None:
+        self._count_container(len(stack), closing_char)
+        return super()._parse_lazy_container(stack, closing_char)
+
+    def _count_container(self, depth: int, closing_char: str) -> None:
+        stats = self.stats
+        stats.node_counts["Json5Array" if closing_char == "]" else "Json5Object"] += 1
+        if depth + 1 > stats.max_depth:
+            stats.max_depth = depth + 1
+
+    def parse_primitive(self) -> Json5Primitive:
+        node = super().parse_primitive()
+        self.stats.node_counts[type(node).__name__] += 1
+        return node
+
+    def parse_object_key(self) -> Json5Key:
+        key = super().parse_object_key()
+        node_counts = self.stats.node_counts
+        node_counts["Json5Key"] += 1
+        node_counts[type(key.value).__name__] += 1
+        return key
+
+    def parse_identifier(self) -> str:
+        start_time = perf_counter()
+        identifier = super().parse_identifier()
+        self._add_phase("parse_identifier", start_time)
+        return identifier
+
+    def parse_string(self, quote_char: Literal["'", '"']) -> tuple[str, str]:
+        start_time = perf_counter()
+        string = super().parse_string(quote_char)
+        self._add_phase("parse_string", start_time)
+        return string
+
+    def parse_number(self) -> tuple[str, float]:
+        start_time = perf_counter()
+        number = super().parse_number()
+        self._add_phase("parse_number", start_time)
+        return number
+
+    def _parse_separator(self, value: Json5Node, closing_char: str) -> None:
+        has_comma = self.peek() != closing_char
+        super()._parse_separator(value, closing_char)
+        if has_comma:
+            self.stats.node_counts["Json5Comma"] += 1
+            self.stats.trivia_chars += 1
+
+    def parse_trivia(self) -> list[Json5Trivia]:
+        start_time = perf_counter()
+        start = self.current
+        trivia_nodes = super().parse_trivia()
+        self._add_phase("parse_trivia", start_time)
+
+        stats = self.stats
+        stats.trivia_chars += self.current - start
+        node_counts = stats.node_counts
+        for trivia in trivia_nodes:
+            node_counts[type(trivia).__name__] += 1
+        return trivia_nodes
+
+    def _add_phase(self, phase: str, start_time: float) -> None:
+        stats = self.stats
+        stats.phase_seconds[phase] += perf_counter() - start_time
+        stats.phase_counts[phase] += 1
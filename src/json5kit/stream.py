@@ -0,0 +1,287 @@
+"""Push parser that builds a JSON5 CST from chunks of input as they arrive."""
+from __future__ import annotations
+import codecs
+
+from typing import Callable, TypeVar, cast
+
+from json5kit.nodes import Json5File, Json5Key, Json5Node, Json5Primitive, Json5Trivia
+from json5kit.parser import Json5ParseError, Json5Parser, _Frame
+
+# Errors that a step raises might only be caused by the input being cut short,
+# if they happen this close to the end of the available input.
+_INCOMPLETE_TOKEN_SIZE = 5
+
+_T = TypeVar("_T")
+
+
+class _InputPosition:
+    """
+    Where the input that is kept around starts in the whole source, once the
+    parsed part before it has been dropped.
+    """
+
+    __slots__ = ("index", "line", "column")
+
+    def __init__(self) -> None:
+        self.index = 0
+        self.line = 1
+        self.column = 0
+
+    def advance(self, dropped: str) -> None:
+        """Moves the position past the given text."""
+        newline_count = dropped.count("\n")
+        if newline_count:
+            self.line += newline_count
+            self.column = len(dropped) - dropped.rfind("\n") - 1
+        else:
+            self.column += len(dropped)
+
+        self.index += len(dropped)
+
+    def shift_error(self, error: Json5ParseError) -> Json5ParseError:
+        """Moves an error's position from the kept input to the whole source."""
+        line = self.line + error.line - 1
+        column = error.column + (self.column if error.line == 1 else 0)
+        index = self.index + error.index
+        return Json5ParseError._at_position(error.message, index, line, column)
+
+
+class Json5StreamParser:
+    """
+    Parser that is fed JSON5 source in chunks, and builds the same CST as
+    parsing the whole source at once.
+
+    Everything that can be parsed is parsed as soon as it's fed, and only the
+    unparsed remainder of the input is kept around. A token that is split
+    across chunks is parsed once the rest of it arrives, and syntax errors are
+    raised as soon as they're certain. `close()` finishes the parse and returns
+    the tree.
+
+    Chunks can be strings, or UTF-8 encoded bytes.
+    """
+
+    def __init__(
+        self, max_depth: int | None = None, share_trivia: bool = False
+    ) -> None:
+        self._parser = Json5Parser("", max_depth=max_depth, share_trivia=share_trivia)
+        self._decoder: codecs.IncrementalDecoder | None = None
+        self._closed = False
+
+        self._position = _InputPosition()
+
+        # Parser state in between steps
+        self._leading_trivia_nodes: list[Json5Trivia] | None = None
+        self._stack: list[_Frame] = []
+        self._node: Json5Node | None = None
+        self._value: Json5Node | None = None
+        self._tree: Json5File | None = None
+
+    def feed(self, chunk: str | bytes) -> None:
+        """Adds the next chunk of the source, and parses as far as possible."""
+        if self._closed:
+            raise ValueError("Cannot feed a closed parser")
+
+        if isinstance(chunk, bytes):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8")()
+            chunk = self._decoder.decode(chunk)
+
+        self._append(chunk)
+        self._run()
+
+    def close(self) -> Json5File:
+        """Marks the end of the source, and returns the parsed tree."""
+        if not self._closed:
+            if self._decoder is not None:
+                self._append(self._decoder.decode(b"", final=True))
+            self._closed = True
+            self._run()
+
+        assert self._tree is not None
+        return self._tree
+
+    def _append(self, text: str) -> None:
+        """Drops the parsed part of the input, and adds the new text to it."""
+        parser = self._parser
+        self._position.advance(parser.source[: parser.current])
+        parser.source = parser.source[parser.current :] + text
+        parser.current = 0
+
+    def _run(self) -> None:
+        try:
+            while self._tree is None and self._step():
+                pass
+        except Json5ParseError as error:
+            raise self._position.shift_error(error) from None
+
+    def _step(self) -> bool:
+        """
+        Parses the next token along with the trivia after it, and returns False
+        if there isn't enough input to do so yet.
+        """
+        parser = self._parser
+        stack = self._stack
+
+        if self._leading_trivia_nodes is None:
+            done, trivia_nodes = self._attempt(self._parse_leading_trivia)
+            if done:
+                self._leading_trivia_nodes = trivia_nodes
+            return done
+
+        if self._value is not None:
+            done, trivia_nodes = self._attempt(self._parse_end)
+            if done and self._closed:
+                self._build_tree(trivia_nodes)
+            return done
+
+        node = self._node
+        if node is not None:
+            if not stack:
+                self._value = node
+                self._node = None
+                return True
+
+            frame = stack[-1]
+            trivia_count = len(node.trailing_trivia_nodes)
+
+            def undo_separator() -> None:
+                assert node is not None
+                del node.trailing_trivia_nodes[trivia_count:]
+
+            done, _ = self._attempt(
+                lambda: self._parse_separator(node, frame.closing_char),
+                undo_separator,
+            )
+            if done:
+                frame.add(node)
+                frame.key = None
+                self._node = None
+            return done
+
+        if stack:
+            frame = stack[-1]
+            at_end = (
+                parser.scanned or parser.source[parser.current] == frame.closing_char
+            )
+            if at_end and (frame.closing_char == "]" or frame.key is None):
+                done, container_end = self._attempt(self._parse_container_end)
+                if done:
+                    end, trailing_trivia_nodes = container_end
+                    stack.pop()
+                    self._node = frame.build(end, trailing_trivia_nodes)
+                return done
+
+            if frame.closing_char == "}" and frame.key is None:
+                done, key = self._attempt(self._parse_object_key)
+                if done:
+                    frame.key = key
+                return done
+
+        stack_size = len(stack)
+
+        def undo_value() -> None:
+            del stack[stack_size:]
+
+        done, self._node = self._attempt(self._parse_value_start, undo_value)
+        return done
+
+    def _attempt(
+        self,
+        parse_step: Callable[[], _T],
+        undo: Callable[[], None] | None = None,
+    ) -> tuple[bool, _T]:
+        """
+        Runs one step of the parse, and returns whether it's done along with its
+        result. If the step ran into the end of the input that is available so
+        far, it's undone and has to be tried again once there's more input,
+        since the rest of the token might still be coming.
+        """
+        parser = self._parser
+        start = parser.current
+        try:
+            result = parse_step()
+        except (Json5ParseError, ValueError):
+            if (
+                self._closed
+                or len(parser.source) - parser.current >= _INCOMPLETE_TOKEN_SIZE
+            ):
+                raise
+        else:
+            if self._closed or parser.current < len(parser.source) - 1:
+                return True, result
+
+        if undo is not None:
+            undo()
+        parser.current = start
+        return False, cast(_T, None)
+
+    def _parse_leading_trivia(self) -> list[Json5Trivia]:
+        return self._parser.parse_trivia()
+
+    def _parse_separator(self, node: Json5Node, closing_char: str) -> None:
+        self._parser._parse_separator(node, closing_char)
+
+    def _parse_value_start(self) -> Json5Node | None:
+        parser = self._parser
+        if parser.scanned:
+            if self._closed:
+                raise Json5ParseError(
+                    "Expected to find JSON5 data, found EOF",
+                    index=parser.current,
+                    source=parser.source,
+                )
+            raise ValueError("The value hasn't arrived yet")
+
+        stack = self._stack
+        stack_size = len(stack)
+        node = parser._parse_value_start(stack)
+        if isinstance(node, Json5Primitive):
+            assert node.start is not None
+            node.start += self._position.index
+        elif len(stack) > stack_size:
+            stack[-1].start += self._position.index
+
+        return node
+
+    def _parse_object_key(self) -> Json5Key:
+        parser = self._parser
+        key = parser.parse_object_key()
+        assert key.value.start is not None
+        key.value.start += self._position.index
+        if parser.scanned and self._closed:
+            raise Json5ParseError(
+                "Expected to find JSON5 data, found EOF",
+                index=parser.current,
+                source=parser.source,
+            )
+
+        return key
+
+    def _parse_container_end(self) -> tuple[int, list[Json5Trivia]]:
+        parser = self._parser
+        if parser.scanned:
+            if not self._closed:
+                raise ValueError("The closing bracket hasn't arrived yet")
+        else:
+            parser.consume(self._stack[-1].closing_char)
+
+        end = self._position.index + parser.current
+        return end, parser.parse_trivia()
+
+    def _parse_end(self) -> list[Json5Trivia]:
+        parser = self._parser
+        trailing_trivia_nodes = parser.parse_trivia()
+
+        # Ensure no more data exists
+        if not parser.scanned:
+            token = parser.read_char()
+            raise Json5ParseError(f"Unexpected {token}", parser.current, parser.source)
+
+        return trailing_trivia_nodes
+
+    def _build_tree(self, trailing_trivia_nodes: list[Json5Trivia]) -> None:
+        assert self._leading_trivia_nodes is not None and self._value is not None
+        tree = Json5File(self._value, self._leading_trivia_nodes, trailing_trivia_nodes)
+        tree.start = 0
+        tree.end = self._position.index + self._parser.current
+        self._tree = tree
@@ -1,10 +1,55 @@
 from __future__ import annotations
 from collections import deque
 import inspect
+from operator import attrgetter
 
-from typing import Callable, Iterator
+from typing import Any, Callable, ClassVar, Dict, Iterator, Optional, cast
 
-from json5kit.nodes import Json5Node
+from json5kit.nodes import (
+    Json5Container,
+    Json5Node,
+    Json5Object,
+    Json5Trivia,
+    _invalidate_structural_hashes,
+    is_shared_trivia,
+)
+
+# Gets the values of all `_fields` of a node class at once, as a tuple.
+_FieldsGetter = Callable[[Json5Node], "tuple[object, ...]"]
+_fields_getters: dict[type, _FieldsGetter] = {}
+
+# Types that are known to pass an `isinstance(value, Json5Node)` check, which is
+# slow for a runtime checkable protocol.
+_node_types: set[type] = set()
+
+# A visitor method looked up on the class, called with the visitor and the node.
+_VisitorFunction = Callable[[Any, Json5Node], object]
+
+
+def _get_fields_getter(node_type: type[Json5Node]) -> _FieldsGetter:
+    fields = node_type._fields
+    if not fields:
+        getter: _FieldsGetter = lambda node: ()
+    elif len(fields) == 1:
+        single_getter = attrgetter(fields[0])
+        getter = lambda node: (single_getter(node),)
+    else:
+        getter = attrgetter(*fields)
+
+    _fields_getters[node_type] = getter
+    return getter
+
+
+def _is_node(value: object) -> bool:
+    value_type = type(value)
+    if value_type in _node_types:
+        return True
+
+    if isinstance(value, Json5Node):
+        _node_types.add(value_type)
+        return True
+
+    return False
 
 
 def iter_child_nodes(node: Json5Node) -> Iterator[Json5Node]:
@@ -12,13 +57,12 @@ def iter_child_nodes(node: Json5Node) -> Iterator[Json5Node]:
     Yield all direct child nodes of `node`, that is, all fields that are nodes
     and all items of fields that are lists of nodes.
     """
-    for field in vars(node).values():
-        if isinstance(field, Json5Node):
-            yield field
-        elif isinstance(field, list):
-            for item in field:
-                if isinstance(item, Json5Node):
-                    yield item
+    getter = _fields_getters.get(type(node)) or _get_fields_getter(type(node))
+    for value in getter(node):
+        if isinstance(value, list):
+            yield from value
+        else:
+            yield cast(Json5Node, value)
 
 
 def walk(node: Json5Node) -> Iterator[Json5Node]:
@@ -41,24 +85,55 @@ def _remove_prefix(string: str, prefix: str) -> str:
     return string
 
 
+class _DispatchTable(Dict[type, Optional[_VisitorFunction]]):
+    """The visitor methods of a visitor class, by node type, found as needed."""
+
+    def __init__(self, visitor_class: type[Json5VisitorBase]) -> None:
+        super().__init__()
+        self.visitor_class = visitor_class
+
+    def __missing__(self, node_type: type) -> _VisitorFunction | None:
+        return self.visitor_class._find_visitor_function(node_type)
+
+
 class Json5VisitorBase:
-    """Base class for Json5Visitor and Json5Transformer."""
+    """
+    Base class for Json5Visitor and Json5Transformer.
 
-    def _get_visitor(self, node: Json5Node) -> Callable[..., object] | None:
-        """Finds a visitor method corresponding to given node"""
-        object_type = _remove_prefix(node.__class__.__name__, "Json5")
+    The visitor method for each node type is looked up once per visitor class,
+    and kept in a dispatch table. Methods added to the class after it has
+    visited a node of that type are not picked up.
+    """
+
+    _dispatch: ClassVar[_DispatchTable]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = _DispatchTable(cls)
+
+    @classmethod
+    def _find_visitor_function(cls, node_type: type) -> _VisitorFunction | None:
+        """Finds the visitor method for the node type, and adds it to the table."""
+        object_type = _remove_prefix(node_type.__name__, "Json5")
         method_name = "visit_" + object_type
-        method = getattr(self, method_name, None)
-        if inspect.ismethod(method):
-            return method
 
-        return None
+        function: _VisitorFunction | None = None
+        attribute = inspect.getattr_static(cls, method_name, None)
+        # Static methods and plain callables wouldn't be bound to the visitor
+        if inspect.isfunction(attribute):
+            function = attribute
+        elif isinstance(attribute, classmethod):
+            method = getattr(cls, method_name)
+            function = lambda visitor, node: method(node)
+
+        cls._dispatch[node_type] = function
+        return function
 
     def visit(self, node: Json5Node) -> object:
         """Finds the method to call for the given node."""
-        visitor = self._get_visitor(node)
-        if visitor is not None:
-            return visitor(node)
+        function = self._dispatch[type(node)]
+        if function is not None:
+            return function(self, node)
         else:
             return self.generic_visit(node)
 
@@ -66,12 +141,19 @@ class Json5VisitorBase:
         raise NotImplementedError
 
 
+Json5VisitorBase._dispatch = _DispatchTable(Json5VisitorBase)
+
+
 class Json5Visitor(Json5VisitorBase):
     """Base class to create visitors for specific nodes of JSON5 trees."""
 
     def visit(self, node: Json5Node) -> None:
         """Finds the method to call for the given node."""
-        super().visit(node)
+        function = self._dispatch[type(node)]
+        if function is not None:
+            function(self, node)
+        else:
+            self.generic_visit(node)
 
     def generic_visit(self, node: Json5Node) -> None:
         for child in iter_child_nodes(node):
@@ -90,27 +172,45 @@ class Json5Transformer(Json5VisitorBase):
         Finds the method to call for the given node, and returns the replacement
         node for the given node.
         """
-        returned_node = super().visit(node)
-        if not isinstance(returned_node, Json5Node):
+        returned_node: object
+        function = self._dispatch[type(node)]
+        if function is None:
+            returned_node = self.generic_visit(node)
+        else:
+            if is_shared_trivia(node):
+                # Shared trivia nodes are immutable, so the visitor gets its own
+                # copy to modify and return instead.
+                assert isinstance(node, Json5Trivia)
+                node = node.copy()
+
+            returned_node = function(self, node)
+
+        if not _is_node(returned_node):
             raise Json5TransformError(f"Expected JSON5 node, got {returned_node}")
 
-        return returned_node
+        return cast(Json5Node, returned_node)
 
     def generic_visit(self, node: Json5Node) -> Json5Node:
-        for field, old_value in vars(node).items():
-            if isinstance(old_value, Json5Node):
-                new_node = self.visit(old_value)
-                setattr(node, field, new_node)
-
-            elif isinstance(old_value, list):
+        getter = _fields_getters.get(type(node)) or _get_fields_getter(type(node))
+        for field, old_value in zip(node._fields, getter(node)):
+            if isinstance(old_value, list):
                 new_values: list[Json5Node] = []
 
                 for value in old_value:
-                    assert isinstance(value, Json5Node)
                     value = self.visit(value)
                     new_values.append(value)
 
                 # Replace old nodes with new nodes
                 old_value[:] = new_values
 
+            else:
+                new_node = self.visit(cast(Json5Node, old_value))
+                setattr(node, field, new_node)
+
+        if isinstance(node, Json5Object):
+            # The keys might have been replaced or renamed
+            node.invalidate_index()
+        if isinstance(node, Json5Container):
+            _invalidate_structural_hashes()
+
         return node
@@ -1,9 +1,16 @@
 from __future__ import annotations
+import io
+import pickle
+import sys
+from pathlib import Path
 from textwrap import dedent
+from typing import IO, Callable
 
 import pytest
 
 import json5kit
+from json5kit.spans import index_to_line_column
+from json5kit.visitor import walk
 
 
 @pytest.mark.parametrize(
@@ -18,6 +25,8 @@ import json5kit
         ("-32",),
         ("234.9  ",),
         ("[1, 2, 'abc',]",),
+        ("""['it\\'s', "a\\\\b\\nc", "line \\\n break"]""",),
+        ("[1,  \n  \n\t2]",),
         ("\n[true,]\t\n",),
         (
             """
@@ -65,6 +74,29 @@ def test_json5_roundtrip(source: str) -> None:
     assert json5kit.parse(source).to_source() == source
 
 
+@pytest.mark.parametrize(
+    ("source", "message"),
+    (
+        ('"abc', "at 1:4: Expected to find '\"', found EOF"),
+        ("'a\\qb'", "at 1:3: Unknown escape sequence: '\\q'"),
+        ("[1 2]", "at 1:4: Expected to find ',', found '2'"),
+        ("[1, /* no */ 2]", "at 1:6: Expected to find '/', found '*'"),
+        ("{\n  a: 1\n}  }", "at 3:4: Unexpected }"),
+        ("[1, ?]", "at 1:4: Unexpected '?'"),
+    ),
+)
+def test_json5_parse_errors(source: str, message: str) -> None:
+    """Tests that bad syntax is reported with its position."""
+    with pytest.raises(json5kit.Json5ParseError) as exc_info:
+        json5kit.parse(source)
+
+    assert str(exc_info.value) == message
+    with pytest.raises(json5kit.Json5ParseError) as exc_info:
+        json5kit.parse_bytes(source.encode())
+
+    assert str(exc_info.value) == message
+
+
 def test_json5_visitor_transformer() -> None:
     source = dedent(
         """
@@ -137,3 +169,1079 @@ def test_json5_to_json(source: str, json: str) -> None:
     """Tests to ensure JSON5 features are parsed and converted to JSON properly."""
     assert json5kit.parse(source).to_source() == source
     assert json5kit.parse(source).to_json() == json
+
+
+@pytest.mark.parametrize(
+    ("source", "value"),
+    (
+        ("  42 // answer", 42),
+        ("-2.5", -2.5),
+        ("'it\\'s'", "it's"),
+        ("[1, 'a', null, true, false,]", [1, "a", None, True, False]),
+        (
+            """
+            {
+                foo: "bar", // test
+                barBaz_buzz1: // another comment
+                    [
+                        {a: 1.5},
+                        'other stuff',
+                    ],
+                'more keys': null, // heh
+            }
+            """,
+            {
+                "foo": "bar",
+                "barBaz_buzz1": [{"a": 1.5}, "other stuff"],
+                "more keys": None,
+            },
+        ),
+    ),
+)
+def test_json5_loads(source: str, value: object) -> None:
+    """Tests that JSON5 can be loaded straight into Python objects."""
+    assert json5kit.loads(source) == value
+    assert json5kit.load(io.StringIO(source)) == value
+
+
+def test_json5_deeply_nested() -> None:
+    """Tests that nesting depth isn't limited by the recursion limit."""
+    depth = 10 * sys.getrecursionlimit()
+    source = "[{a: " * depth + "1" + "}]" * depth
+
+    tree = json5kit.parse(source)
+    assert tree.to_source() == source
+    assert tree.to_json() == '[{"a":' * depth + "1" + "}]" * depth
+
+    node = tree.value
+    for _ in range(depth):
+        assert isinstance(node, json5kit.Json5Array)
+        object_node = node.members[0]
+        assert isinstance(object_node, json5kit.Json5Object)
+        node = object_node.values[0]
+    assert isinstance(node, json5kit.Json5Number)
+
+    value = json5kit.loads(source)
+    for _ in range(depth):
+        assert isinstance(value, list)
+        value_dict = value[0]
+        assert isinstance(value_dict, dict)
+        value = value_dict["a"]
+    assert value == 1
+
+
+@pytest.mark.parametrize("load", (json5kit.parse, json5kit.loads))
+def test_json5_max_depth(load: Callable[..., object]) -> None:
+    """Tests that documents nested deeper than `max_depth` are rejected."""
+    assert load("[[1], {a: []}]", max_depth=3)
+
+    with pytest.raises(json5kit.Json5ParseError) as exc_info:
+        load("[\n  [{a: [[]]}]]", max_depth=3)
+
+    assert str(exc_info.value) == "at 2:7: Exceeded maximum nesting depth of 3"
+
+
+def test_json5_nodes_use_slots() -> None:
+    """Tests that nodes don't carry a `__dict__`, and their fields are all listed."""
+    tree = json5kit.parse("{a: [1, 'b', null], // comment\n c: {d: true}}")
+
+    node_types = set()
+    for node in walk(tree):
+        assert not hasattr(node, "__dict__")
+        node_types.add(type(node).__name__)
+
+    assert node_types == {
+        "Json5File",
+        "Json5Object",
+        "Json5Key",
+        "Json5Identifier",
+        "Json5Array",
+        "Json5Number",
+        "Json5String",
+        "Json5Null",
+        "Json5Boolean",
+        "Json5Comma",
+        "Json5Whitespace",
+        "Json5Comment",
+        "Json5Newline",
+    }
+
+
+def test_json5_share_trivia() -> None:
+    """Tests that shared trivia nodes are reused, and copied before modifying."""
+    source = "[\n  1,\n  2,\n  3,  // comment\n]"
+    tree = json5kit.parse(source, share_trivia=True)
+    assert tree.to_source() == source
+    assert tree.to_json() == "[1,2,3]"
+
+    array = tree.value
+    assert isinstance(array, json5kit.Json5Array)
+    first_trivia, second_trivia, _ = (
+        member.trailing_trivia_nodes for member in array.members
+    )
+    assert first_trivia[0] is second_trivia[0]  # comma
+    assert first_trivia[1] is second_trivia[1]  # newline
+    assert first_trivia[2] is second_trivia[2]  # indentation
+    assert first_trivia[2] is array.leading_trivia_nodes[1]
+
+    class DoubleWhitespace(json5kit.Json5Transformer):
+        def visit_Whitespace(
+            self, node: json5kit.Json5Whitespace
+        ) -> json5kit.Json5Whitespace:
+            node.source *= 2
+            return node
+
+    DoubleWhitespace().visit(tree)
+    assert tree.to_source() == "[\n    1,\n    2,\n    3,    // comment\n]"
+    # Other trees using the same shared nodes don't change.
+    assert json5kit.parse(source, share_trivia=True).to_source() == source
+
+
+def test_json5_write_source() -> None:
+    """Tests that trees can be written out to files in chunks."""
+    source = dedent(
+        """
+        {
+          items: [1, 2, 'three', {nested: [true, null]}],  // comment
+          "other": 4.5,
+        }
+        """
+    )
+    json = '{"items":[1,2,"three",{"nested":[true,null]}],"other":4.5}'
+    tree = json5kit.parse(source)
+    assert "".join(tree.iter_source()) == source
+    assert "".join(tree.iter_json()) == json
+
+    class RecordingStringIO(io.StringIO):
+        def __init__(self) -> None:
+            super().__init__()
+            self.write_count = 0
+
+        def write(self, data: str) -> int:
+            self.write_count += 1
+            return super().write(data)
+
+    for buffer_size, write_count in ((1, len(list(tree.iter_source()))), (1024, 1)):
+        fp = RecordingStringIO()
+        tree.write_source(fp, buffer_size=buffer_size)
+        assert fp.getvalue() == source
+        assert fp.write_count == write_count
+
+    fp = RecordingStringIO()
+    tree.write_json(fp, buffer_size=16)
+    assert fp.getvalue() == json
+
+    assert isinstance(tree.value, json5kit.Json5Object)
+    fp = RecordingStringIO()
+    tree.value.values[1].write_source(fp)
+    assert fp.getvalue() == "4.5,\n"
+
+
+def test_json5_reparse() -> None:
+    """Tests that edits only reparse the smallest container around them."""
+    source = "{\n  a: [1, 2, {b: 'c'}],\n  d: {e: [true]},  // comment\n}\n"
+    tree = json5kit.parse(source)
+    root = tree.value
+    assert isinstance(root, json5kit.Json5Object)
+    a_array, d_object = root.values
+    assert isinstance(a_array, json5kit.Json5Array)
+    assert isinstance(d_object, json5kit.Json5Object)
+    assert (a_array.start, a_array.end) == (7, 23)
+    first_member = a_array.members[0]
+
+    # Replace the `2` with `42, 43`
+    edit_start = source.index("2")
+    json5kit.reparse(tree, edit_start, edit_start + 1, "42, 43")
+    source = source[:edit_start] + "42, 43" + source[edit_start + 1 :]
+    assert tree.to_source() == source
+
+    new_a_array = root.values[0]
+    assert isinstance(new_a_array, json5kit.Json5Array)
+    assert new_a_array is not a_array
+    assert new_a_array.members[0] is not first_member
+    assert root.values[1] is d_object
+    assert (new_a_array.start, new_a_array.end) == (7, 28)
+    assert (d_object.start, d_object.end) == (35, 46)
+    assert root.end == len(source) - 1
+
+    # `[true], f: [1]` isn't one array, so the object around it gets reparsed
+    edit_start = source.index("true]")
+    json5kit.reparse(tree, edit_start, edit_start + 5, "true], f: [1]")
+    source = source[:edit_start] + "true], f: [1]" + source[edit_start + 5 :]
+    assert tree.to_source() == source
+    assert tree.value is root
+    assert root.values[0] is new_a_array
+    assert root.values[1] is not d_object
+    assert json5kit.parse(source).to_json() == tree.to_json()
+
+    with pytest.raises(json5kit.Json5ParseError):
+        edit_start = source.index(":")
+        json5kit.reparse(tree, edit_start, edit_start + 1, "")
+
+
+def test_json5_spans() -> None:
+    """Tests the source offsets of nodes, and converting them to lines."""
+    source = "// config\n{\n  a: [1, 'two'],  // comment\n  b: null,\n}\n"
+    tree = json5kit.parse(source)
+    spans = list(json5kit.iter_spans(tree))
+    assert len(spans) == sum(1 for _ in walk(tree))
+    assert spans[-1] == (tree, 0, len(source))
+
+    for node, start, end in spans:
+        node_source = node.to_source()
+        if node is not tree:
+            trailing_trivia = "".join(t.source for t in node.trailing_trivia_nodes)
+            node_source = node_source[: len(node_source) - len(trailing_trivia)]
+        assert source[start:end] == node_source
+        if not isinstance(node, json5kit.Json5Trivia):
+            assert (getattr(node, "start"), getattr(node, "end")) == (start, end)
+
+    line_index = json5kit.LineIndex(source)
+    for index in range(len(source) + 1):
+        line_column = index_to_line_column(index, source)
+        assert line_index.line_column(index) == line_column
+        assert line_index.index(*line_column) == index
+
+    assert line_index.line_column(source.index("null")) == (4, 5)
+    with pytest.raises(ValueError):
+        line_index.index(7, 0)
+
+
+def test_json5_lazy_parse() -> None:
+    """Tests that nested containers are only parsed once they're accessed."""
+    source = dedent(
+        """
+        {
+          a: [1, {b: 'c'}],  // comment
+          d: {e: [true, null], f: "]}"},
+          g: {oops: [1 2]},
+        }
+        """
+    )
+    tree = json5kit.parse(source, lazy=True)
+    root = tree.value
+    assert isinstance(root, json5kit.Json5Object)
+    a_array, d_object, g_object = root.values
+    assert isinstance(a_array, json5kit.Json5Array)
+    assert isinstance(d_object, json5kit.Json5Object)
+    assert a_array._lazy is not None
+    assert d_object._lazy is not None
+    assert tree.to_source() == source
+
+    # Accessing the members parses one more level
+    b_object = a_array.members[1]
+    assert isinstance(b_object, json5kit.Json5Object)
+    assert a_array._lazy is None
+    assert b_object._lazy is not None
+    assert d_object._lazy is not None
+    assert b_object.to_json() == '{"b":"c"}'
+    assert d_object.to_json() == '{"e":[true,null],"f":"]}"}'
+
+    # Offsets and contents match what an eager parse produces
+    eager_tree = json5kit.parse(source.replace("1 2", "1, 2"))
+    for node, eager_node in zip(
+        [b_object, d_object.values[0]],
+        [eager_tree.value.values[0].members[1], eager_tree.value.values[1].values[0]],
+    ):
+        assert (node.start, node.end) == (eager_node.start, eager_node.end)
+        assert node.to_source() == eager_node.to_source()
+
+    # Syntax errors only show up once the broken container is parsed
+    with pytest.raises(json5kit.Json5ParseError) as exc_info:
+        g_object.to_json()
+    assert str(exc_info.value) == "at 5:16: Expected to find ',', found '2'"
+
+
+def test_json5_object_lookup() -> None:
+    """Tests looking up and changing the entries of objects by key."""
+    source = dedent(
+        """
+        {
+          a: 1,
+          'b c': [2],  // comment
+          a: 3,
+        }
+        """
+    )
+    tree = json5kit.parse(source)
+    obj = tree.value
+    assert isinstance(obj, json5kit.Json5Object)
+
+    # Duplicate keys resolve to the last entry, like `loads()`
+    assert obj["a"].to_json() == "3"
+    assert obj["b c"].to_json() == "[2]"
+    assert "b c" in obj
+    assert "d" not in obj
+    assert obj.get("d") is None
+    with pytest.raises(KeyError):
+        obj["d"]
+
+    obj.set("a", json5kit.parse("4").value)
+    obj.set("d", json5kit.parse("'five'").value)
+    assert tree.to_source() == dedent(
+        """
+        {
+          a: 1,
+          'b c': [2],  // comment
+          a: 4,
+          d: 'five',
+        }
+        """
+    )
+    assert json5kit.loads(tree.to_source()) == {"a": 4, "b c": [2], "d": "five"}
+
+    obj.delete("a")
+    obj.delete("d")
+    assert tree.to_source() == "\n{\n  'b c': [2],  // comment\n}\n"
+    assert "a" not in obj
+    with pytest.raises(KeyError):
+        obj.delete("a")
+
+    # A comment before the deleted entry keeps its line break
+    commented_tree = json5kit.parse("{a: 1, // c\nb: 2}")
+    assert isinstance(commented_tree.value, json5kit.Json5Object)
+    commented_tree.value.delete("b")
+    assert commented_tree.to_source() == "{a: 1, // c\n}"
+    array_tree = json5kit.parse("[1, // c\n2]")
+    assert isinstance(array_tree.value, json5kit.Json5Array)
+    array_tree.value.delete(1)
+    assert array_tree.to_source() == "[1, // c\n]"
+    assert json5kit.loads(array_tree.to_source()) == [1]
+
+    # Keys are only left unquoted where the parser reads them back
+    keys_tree = json5kit.parse("{}")
+    assert isinstance(keys_tree.value, json5kit.Json5Object)
+    for key in ("Ⅷ", "²x", "x²", "_é", "1a"):
+        keys_tree.value.set(key, json5kit.parse("1").value)
+    assert keys_tree.to_source() == '{"Ⅷ": 1, "²x": 1, x²: 1, _é: 1, "1a": 1}'
+    assert json5kit.loads(keys_tree.to_source()) == dict.fromkeys(
+        ["Ⅷ", "²x", "x²", "_é", "1a"], 1
+    )
+
+    # Entries changed directly or by a transformer are picked up as well
+    obj.keys.append(json5kit.Json5Key(json5kit.Json5Identifier("e", []), []))
+    obj.values.append(json5kit.parse("6").value)
+    assert obj["e"].to_json() == "6"
+
+    class RenameKeys(json5kit.Json5Transformer):
+        def visit_Key(self, node: json5kit.Json5Key) -> json5kit.Json5Key:
+            new_name = node.value.value.upper()
+            return json5kit.Json5Key(json5kit.Json5Identifier(new_name, []), [])
+
+    RenameKeys().visit(tree)
+    assert "E" in obj
+    assert "e" not in obj
+
+
+def test_json5_visitor_dispatch() -> None:
+    """Tests that each visitor class finds its own methods, including inherited ones."""
+    tree = json5kit.parse("[1, 'a', [2, 'b'], null]")
+
+    class CollectNumbers(json5kit.Json5Visitor):
+        def __init__(self) -> None:
+            self.visited: list[str] = []
+
+        def visit_Number(self, node: json5kit.Json5Number) -> None:
+            self.visited.append(node.source)
+
+        @staticmethod
+        def visit_Null(node: json5kit.Json5Null) -> None:
+            raise AssertionError("static methods aren't visitor methods")
+
+    class CollectNumbersAndStrings(CollectNumbers):
+        def visit_String(self, node: json5kit.Json5String) -> None:
+            self.visited.append(node.source)
+
+    subclass_visitor = CollectNumbersAndStrings()
+    subclass_visitor.visit(tree)
+    assert subclass_visitor.visited == ["1", "'a'", "2", "'b'"]
+
+    visitor = CollectNumbers()
+    visitor.visit(tree)
+    assert visitor.visited == ["1", "2"]
+
+    class ReturnsNone(json5kit.Json5Transformer):
+        def visit_String(self, node: json5kit.Json5String) -> None:
+            return None
+
+    with pytest.raises(json5kit.visitor.Json5TransformError):
+        ReturnsNone().visit(tree)
+
+
+def test_json5_parse_bytes(tmp_path: Path) -> None:
+    """Tests parsing UTF-8 encoded JSON5 from buffers and memory-mapped files."""
+    source = "{\n  // ünïcode\n  naïve: ['日本', 1.5],\n  'k': {v: null},\n}\n"
+    json = '{"naïve":["日本",1.5],"k":{"v":null}}'
+    encoded = source.encode()
+    for buffer in (encoded, bytearray(encoded), memoryview(encoded)):
+        tree = json5kit.parse_bytes(buffer)
+        assert tree.to_source() == source
+        assert tree.to_json() == json
+
+    # Offsets count characters, the same as for the decoded source
+    for lazy in (False, True):
+        tree = json5kit.parse_bytes(encoded, lazy=lazy)
+        root = tree.value
+        assert isinstance(root, json5kit.Json5Object)
+        array = root["naïve"]
+        assert isinstance(array, json5kit.Json5Array)
+        assert array.start == source.index("[")
+        string = array.members[0]
+        assert isinstance(string, json5kit.Json5String)
+        assert string.start == source.index("'日本'")
+        assert string.end == source.index(",", string.start)
+        assert [span[1:] for span in json5kit.iter_spans(tree)] == [
+            span[1:] for span in json5kit.iter_spans(json5kit.parse(source))
+        ]
+
+    string_node = json5kit.parse_bytes('"é"'.encode()).value
+    assert isinstance(string_node, json5kit.Json5String)
+    assert (string_node.start, string_node.end) == (0, 3)
+
+    # So that trees parsed from bytes can be reparsed with edits to the text
+    tree = json5kit.parse_bytes(encoded, lazy=True)
+    edit_start = source.index("1.5")
+    json5kit.reparse(tree, edit_start, edit_start + 3, "'ß'")
+    edited_source = source.replace("1.5", "'ß'")
+    assert tree.to_source() == edited_source
+    assert [span[1:] for span in json5kit.iter_spans(tree)] == [
+        span[1:] for span in json5kit.iter_spans(json5kit.parse(edited_source))
+    ]
+
+    path = tmp_path / "config.json5"
+    path.write_bytes(encoded)
+    assert json5kit.parse_file(path).to_source() == source
+    lazy_tree = json5kit.parse_file(str(path), lazy=True)
+    assert lazy_tree.to_source() == source
+    assert lazy_tree.to_json() == json
+
+    # Error columns are still counted in characters
+    with pytest.raises(json5kit.Json5ParseError) as exc_info:
+        json5kit.parse_bytes("['日本' 1]".encode())
+    assert str(exc_info.value) == "at 1:7: Expected to find ',', found '1'"
+
+
+def test_json5_stream_parser() -> None:
+    """Tests that feeding the source in chunks builds the same tree as parse()."""
+    source = (
+        "// config\n{\n  name: 'naïve // not a comment',\n  list: [12.5, true],\n}\n"
+    )
+    expected = json5kit.parse(source)
+    for size in (1, 2, 3, 7, len(source)):
+        parser = json5kit.Json5StreamParser()
+        for index in range(0, len(source), size):
+            parser.feed(source[index : index + size])
+        tree = parser.close()
+        assert tree.to_source() == source
+        assert tree.to_json() == expected.to_json()
+        assert [(start, end) for _, start, end in json5kit.iter_spans(tree)] == [
+            (start, end) for _, start, end in json5kit.iter_spans(expected)
+        ]
+
+    # Bytes are decoded, even if a character is split between chunks
+    encoded = source.encode()
+    parser = json5kit.Json5StreamParser()
+    for index in range(len(encoded)):
+        parser.feed(encoded[index : index + 1])
+    assert parser.close().to_source() == source
+
+    # Errors are raised as soon as they're certain, at their position in the
+    # whole source
+    parser = json5kit.Json5StreamParser()
+    parser.feed("[1,\n2,\n")
+    with pytest.raises(json5kit.Json5ParseError) as exc_info:
+        parser.feed("3 4, 5, 6]")
+    assert str(exc_info.value) == "at 3:3: Expected to find ',', found '4'"
+    assert exc_info.value.index == 10
+
+    parser = json5kit.Json5StreamParser()
+    parser.feed("[1, 2")
+    with pytest.raises(json5kit.Json5ParseError) as exc_info:
+        parser.close()
+    assert str(exc_info.value) == "at 1:5: Expected to find ',', found EOF"
+
+    with pytest.raises(ValueError):
+        parser.feed("]")
+
+
+def test_json5_iterparse() -> None:
+    """Tests the events that iterparse() yields, for every kind of source."""
+    source = "{\n  // comment\n  'k': [1, null],\n  é: {},\n}"
+    events = [
+        ("start_object", None, 0, 1),
+        ("key", "k", 17, 20),
+        ("start_array", None, 22, 23),
+        ("value", 1, 23, 24),
+        ("value", None, 26, 30),
+        ("end_array", None, 30, 31),
+        ("key", "é", 35, 36),
+        ("start_object", None, 38, 39),
+        ("end_object", None, 39, 40),
+        ("end_object", None, 42, 43),
+    ]
+    sources: list[str | bytes | IO[str] | IO[bytes]] = [
+        source,
+        source.encode(),
+        io.StringIO(source),
+        io.BytesIO(source.encode()),
+    ]
+    for chunk_size in (1, 4, 100):
+        for event_source in sources:
+            if not isinstance(event_source, (str, bytes)):
+                event_source.seek(0)
+            parsed = json5kit.iterparse(event_source, chunk_size=chunk_size)
+            assert list(parsed) == events
+
+    # Numbers are the same as loads() gives, so large ints stay exact
+    number_events = json5kit.iterparse("[12345678901234567891, 2.5]")
+    values = [event.value for event in number_events]
+    assert values == [None, 12345678901234567891, 2.5, None]
+    assert isinstance(values[1], int)
+
+    trivia_events = [
+        event
+        for event in json5kit.iterparse(source, trivia=True)
+        if event.type in ("comment", "whitespace")
+    ]
+    assert trivia_events[:4] == [
+        ("whitespace", "\n", 1, 2),
+        ("whitespace", "  ", 2, 4),
+        ("comment", "// comment", 4, 14),
+        ("whitespace", "\n", 14, 15),
+    ]
+    assert all(
+        source[event.start : event.end] == event.value for event in trivia_events
+    )
+
+    with pytest.raises(json5kit.Json5ParseError) as exc_info:
+        list(json5kit.iterparse("[1, 2,\n 3 x]", chunk_size=2))
+    assert str(exc_info.value) == "at 2:4: Expected to find ',', found 'x'"
+
+
+def test_json5_iter_records(tmp_path: Path) -> None:
+    """Tests reading the records of a file one at a time."""
+    source = "// records\n[\n  {id: 1, tags: ['a']},\n  {id: 2, name: 'é'},\n  3,\n]\n"
+    path = tmp_path / "records.json5"
+    path.write_text(source, encoding="utf-8")
+    values = [{"id": 1, "tags": ["a"]}, {"id": 2, "name": "é"}, 3]
+    expected = json5kit.parse(source).value
+    assert isinstance(expected, json5kit.Json5Array)
+
+    record_files: list[str | Path | IO[str] | IO[bytes]] = [
+        str(path),
+        path,
+        io.StringIO(source),
+        io.BytesIO(source.encode()),
+    ]
+    for chunk_size in (1, 3, 100):
+        for record_file in record_files:
+            if not isinstance(record_file, (str, Path)):
+                record_file.seek(0)
+            records = list(json5kit.iter_records(record_file, chunk_size=chunk_size))
+            assert [record.to_source() for record in records] == [
+                member.to_source() for member in expected.members
+            ]
+            # Offsets are in the whole file, not in the chunk
+            assert [getattr(record, "start") for record in records] == [
+                getattr(member, "start") for member in expected.members
+            ]
+
+        with open(path, encoding="utf-8") as file:
+            record_values = json5kit.iter_record_values(file, chunk_size=chunk_size)
+            assert list(record_values) == values
+
+    lines_source = "{id: 1, tags: ['a']}\n{id: 2, name: 'é'}\n\n3\n"
+    lines_path = tmp_path / "records.json5l"
+    lines_path.write_text(lines_source, encoding="utf-8")
+    assert list(json5kit.iter_record_values(lines_path, lines=True)) == values
+    records = list(json5kit.iter_records(lines_path, lines=True, chunk_size=4))
+    assert "".join(record.to_source() for record in records) == lines_source
+
+    with pytest.raises(json5kit.Json5ParseError) as exc_info:
+        list(json5kit.iter_record_values(io.StringIO("[1,\n2 3]"), chunk_size=2))
+    assert str(exc_info.value) == "at 2:3: Expected to find ',', found '3'"
+
+    # Each value of a lines file has to end its line
+    for bad_lines, message in (
+        ("1 2", "at 1:2: Expected to find a newline, found '2'"),
+        ("1,\n2", "at 1:1: Expected to find a newline, found ','"),
+        ("{a: 1,\n} 2\n", "at 2:2: Expected to find a newline, found '2'"),
+    ):
+        with pytest.raises(json5kit.Json5ParseError) as exc_info:
+            list(json5kit.iter_records(io.StringIO(bad_lines), lines=True))
+        assert str(exc_info.value) == message
+        with pytest.raises(json5kit.Json5ParseError):
+            list(json5kit.iter_record_values(io.StringIO(bad_lines), lines=True))
+
+
+def test_json5_parse_many(tmp_path: Path) -> None:
+    """Tests parsing files in worker processes, with per-file errors."""
+    sources = [
+        "{name: 'a', ports: [80, 443]}",
+        "[1, 2,, 3]",
+        "// comment\n{name: 'é',}",
+        "[" * 400 + "]" * 400,
+        "{name: }",
+        "[+]",
+    ]
+    paths = []
+    for index, source in enumerate(sources):
+        path = tmp_path / f"{index}.json5"
+        path.write_text(source, encoding="utf-8")
+        paths.append(path)
+    # Files that can't be read or decoded only fail on their own too
+    latin1_path = tmp_path / "latin1.json5"
+    latin1_path.write_text("{name: 'é'}", encoding="latin-1")
+    paths += [latin1_path, tmp_path / "missing.json5"]
+
+    for workers in (1, 2):
+        trees = json5kit.parse_many(paths, workers=workers, share_trivia=True)
+        for source, tree in zip(sources, trees):
+            if isinstance(tree, json5kit.Json5File):
+                assert tree.to_source() == source
+
+        errors = [str(tree) for tree in trees if isinstance(tree, Exception)]
+        assert errors[:4] == [
+            "at 1:6: Unexpected ','",
+            "at 1:7: Unexpected '}'",
+            "at 1:2: Expected to find a digit",
+            "at 1:8: Invalid UTF-8: invalid continuation byte",
+        ]
+        assert len(errors) == 5 and "missing.json5" in errors[4]
+
+        values = json5kit.parse_many(paths, workers=workers, values=True)
+        assert values[0] == {"name": "a", "ports": [80, 443]}
+        assert isinstance(values[1], json5kit.Json5ParseError)
+        assert values[2] == {"name": "é"}
+
+    # Shared trivia stays shared when sent back from the workers
+    tree = json5kit.parse_many(paths[:2] * 2, workers=2, share_trivia=True)[0]
+    assert isinstance(tree, json5kit.Json5File)
+    root = tree.value
+    assert isinstance(root, json5kit.Json5Object)
+    comma = root.values[0].trailing_trivia_nodes[0]
+    assert comma is json5kit.nodes.SHARED_COMMA
+
+    # Parse errors can be pickled too
+    error = pickle.loads(pickle.dumps(values[1]))
+    assert isinstance(error, json5kit.Json5ParseError)
+    assert (error.line, error.column) == (1, 6)
+
+
+def test_json5_parse_parallel(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests splitting one document across workers, and stitching it back."""
+    monkeypatch.setattr(json5kit.parallel, "_MIN_SPLIT_SIZE", 16)
+    items = ",".join(f"{{id: {index}, name: 'a, [b'}} // ]\n" for index in range(40))
+    for source in (
+        f"// items\n[{items},\n  // end\n] \n",
+        f"{{a: [{items}], 'b': \"}}\", c: {{d: null}},\n e: [1,],}}",
+    ):
+        # The document really is split, rather than parsed in one go
+        assert json5kit.parallel._parse_split(source, 2, None, False, False)
+
+        tree = json5kit.parse_parallel(source, workers=2)
+        expected = json5kit.parse(source)
+        assert tree.to_source() == source
+        assert [
+            (type(node), start, end) for node, start, end in json5kit.iter_spans(tree)
+        ] == [
+            (type(node), start, end)
+            for node, start, end in json5kit.iter_spans(expected)
+        ]
+        assert json5kit.loads_parallel(source, workers=2) == json5kit.loads(source)
+
+    for source, message in (
+        (f"[{items}, 1 2]", "Expected to find ',', found '2'"),
+        (f"[{items}", "Expected to find ',', found EOF"),
+        (f"[{items}] x", "Unexpected x"),
+    ):
+        with pytest.raises(json5kit.Json5ParseError) as exc_info:
+            json5kit.parse(source)
+        expected_error = str(exc_info.value)
+        assert message in expected_error
+        for parse in (json5kit.parse_parallel, json5kit.loads_parallel):
+            with pytest.raises(json5kit.Json5ParseError) as exc_info:
+                parse(source, workers=2)
+            assert str(exc_info.value) == expected_error
+
+
+def test_json5_parse_cache(tmp_path: Path) -> None:
+    """Tests caching results in memory and on disk, and the cache statistics."""
+    cache = json5kit.Json5ParseCache(max_entries=2)
+    tree = cache.parse("{a: 1}")
+    assert cache.parse("{a: 1}") is tree
+    assert cache.loads("{a: 1}") == {"a": 1}
+    assert cache.stats == (1, 0, 2, 0)
+
+    # The least recently used result is dropped first
+    cache.parse("[]")
+    assert cache.stats.evictions == 1
+    assert cache.loads("{a: 1}") == {"a": 1}
+    assert cache.parse("{a: 1}") is not tree
+    assert cache.stats == (2, 0, 4, 2)
+    with pytest.raises(json5kit.Json5ParseError):
+        cache.parse("[1 2]")
+
+    # Files are only read again once they change
+    path = tmp_path / "config.json5"
+    path.write_text("{name: 'a'}", encoding="utf-8")
+    cache = json5kit.Json5ParseCache(directory=tmp_path / "cache")
+    assert cache.load_file(path) == {"name": "a"}
+    assert cache.load_file(path) == {"name": "a"}
+    path.write_text("{name: 'bc'}", encoding="utf-8")
+    assert cache.load_file(path) == {"name": "bc"}
+    assert cache.parse_file(path).to_source() == "{name: 'bc'}"
+    assert cache.stats == (1, 0, 3, 0)
+
+    # A new cache finds the results on disk
+    cache = json5kit.Json5ParseCache(directory=tmp_path / "cache")
+    assert cache.parse_file(path).to_json() == '{"name":"bc"}'
+    assert cache.loads("{name: 'a'}") == {"name": "a"}
+    assert cache.stats == (0, 2, 0, 0)
+
+    # Values are stored with marshal rather than pickled, so loading them can't
+    # run code
+    suffixes = sorted(path.suffix for path in (tmp_path / "cache").iterdir())
+    assert suffixes == [".cst", ".marshal", ".marshal"]
+
+
+def test_json5_dump_cst() -> None:
+    """Tests that trees survive being serialized and loaded back."""
+    source = dedent(
+        """
+        // config
+        {
+          name: 'naïve',  // comment
+          "list": [1.5, 'a', true, null, {}, [[]]],
+          nested: {a: {b: 'c',},},
+        }
+        """
+    )
+    for share_trivia in (False, True):
+        tree = json5kit.parse(source, share_trivia=share_trivia)
+        loaded_tree = json5kit.load_cst(json5kit.dump_cst(tree))
+        assert loaded_tree.to_source() == source
+        assert [
+            (type(node), start, end)
+            for node, start, end in json5kit.iter_spans(loaded_tree)
+        ] == [
+            (type(node), start, end) for node, start, end in json5kit.iter_spans(tree)
+        ]
+
+        root = loaded_tree.value
+        assert isinstance(root, json5kit.Json5Object)
+        numbers = root.values[1]
+        assert isinstance(numbers, json5kit.Json5Array)
+        assert [getattr(member, "value") for member in numbers.members[:4]] == [
+            1.5,
+            "a",
+            True,
+            None,
+        ]
+        comma = root.values[0].trailing_trivia_nodes[0]
+        assert json5kit.nodes.is_shared_trivia(comma) == share_trivia
+
+    # Lazily parsed, deeply nested and edited trees work too
+    depth = 10 * sys.getrecursionlimit()
+    nested_source = "[{a: " * depth + "1" + "}]" * depth
+    tree = json5kit.parse(nested_source)
+    assert json5kit.load_cst(json5kit.dump_cst(tree)).to_source() == nested_source
+    tree = json5kit.parse(source, lazy=True)
+    assert json5kit.load_cst(json5kit.dump_cst(tree)).to_source() == source
+
+    tree = json5kit.parse("[1, 2]")
+    array = tree.value
+    assert isinstance(array, json5kit.Json5Array)
+    number = array.members[0]
+    assert isinstance(number, json5kit.Json5Number)
+    array.members[0] = number.replace(value=3)
+    loaded_array = json5kit.load_cst(json5kit.dump_cst(tree)).value
+    assert isinstance(loaded_array, json5kit.Json5Array)
+    assert loaded_array.to_source() == "[3, 2]"
+    assert getattr(loaded_array.members[0], "start") is None
+
+    with pytest.raises(ValueError):
+        json5kit.load_cst(b"not a tree")
+
+
+def test_json5_dumps() -> None:
+    """Tests writing Python objects as JSON5, in the different styles."""
+    obj = {
+        "name": 'it\'s "quoted"\n',
+        "1 key": [1, 2.5, None],
+        "nested": {"a": []},
+    }
+    assert json5kit.dumps(obj) == (
+        '{name: "it\'s \\"quoted\\"\\n", "1 key": [1, 2.5, null], nested: {a: []}}'
+    )
+    assert json5kit.dumps(obj, indent=2, trailing_commas=True) == dedent(
+        """\
+        {
+          name: "it's \\"quoted\\"\\n",
+          "1 key": [
+            1,
+            2.5,
+            null,
+          ],
+          nested: {
+            a: [],
+          },
+        }"""
+    )
+    assert json5kit.dumps(obj, quote_keys=True, quote_style="'") == (
+        "{'name': 'it\\'s \"quoted\"\\n', '1 key': [1, 2.5, null],"
+        " 'nested': {'a': []}}"
+    )
+    assert json5kit.dumps({True: "\r\t", 2: ()}) == '{true: "\\r\\t", "2": []}'
+    assert json5kit.dumps([{True: 1}, {1: 2}, {1.0: 3}]) == (
+        '[{true: 1}, {"1": 2}, {"1.0": 3}]'
+    )
+    assert json5kit.loads(json5kit.dumps("\r\b\f\v")) == "\r\b\f\v"
+    # Non-ASCII keys stay unquoted only where the parser reads them back
+    keys = {"Ⅷ": 1, "²x": 2, "x²": 3, "é": 4, "٣": 5}
+    assert json5kit.dumps(keys) == '{"Ⅷ": 1, "²x": 2, x²: 3, é: 4, "٣": 5}'
+    assert json5kit.loads(json5kit.dumps(keys)) == keys
+
+    # Floats load back as the same floats, without exponents
+    floats = [1e20, 1.5e-07, -0.0, 0.1, 5e-324, 1.7976931348623157e308]
+    assert json5kit.dumps(floats[:2]) == "[100000000000000000000.0, 0.00000015]"
+    loaded_floats = json5kit.loads(json5kit.dumps(floats))
+    assert isinstance(loaded_floats, list)
+    for value, loaded in zip(floats, loaded_floats):
+        assert isinstance(loaded, float)
+        assert repr(loaded) == repr(value)
+    for value in (float("nan"), float("inf"), -float("inf")):
+        with pytest.raises(ValueError):
+            json5kit.dumps({"a": [value]})
+
+    # Whatever is written can be loaded back
+    for options in ({}, {"indent": "\t"}, {"quote_style": "'", "indent": 0}):
+        source = json5kit.dumps(obj, **options)
+        assert json5kit.loads(source) == obj
+        assert json5kit.parse(source).to_source() == source
+        file = io.StringIO()
+        json5kit.dump(obj, file, **options)
+        assert file.getvalue() == source
+
+    depth = 10 * sys.getrecursionlimit()
+    nested: list[object] = []
+    for _ in range(depth):
+        nested = [nested]
+    assert json5kit.dumps(nested) == "[" * depth + "[]" + "]" * depth
+
+    circular: list[object] = []
+    circular.append({"a": circular})
+    with pytest.raises(ValueError):
+        json5kit.dumps(circular)
+    with pytest.raises(TypeError):
+        json5kit.dumps({"a": object()})
+
+
+def test_json5_parse_stats() -> None:
+    """Tests collecting statistics about parses."""
+    source = "{a: [1, 'x\\ty'],  // comment\n 'b': {c: null}}\n"
+    stats = json5kit.Json5ParseStats()
+    tree = json5kit.parse(source, stats=stats)
+    assert tree.to_source() == source
+
+    node_counts = {name: 0 for name in stats.node_counts}
+    for node in walk(tree):
+        node_counts[type(node).__name__] += 1
+    assert stats.node_counts == node_counts
+    assert stats.node_counts["Json5Key"] == 3
+    assert stats.max_depth == 2
+    assert stats.trivia_chars == 21
+    assert stats.trivia_chars + stats.payload_chars == len(source)
+    assert stats.phase_counts["parse_string"] == 2
+    assert stats.phase_counts["parse_number"] == 1
+    assert stats.phase_counts["parse_identifier"] == 2
+    assert stats.other_seconds <= stats.seconds
+
+    # Stats add up over parses, and can be exported
+    json5kit.parse("[1, 2]", stats=stats)
+    assert stats.parses == 2
+    exported = stats.to_dict()
+    assert exported["nodes.Json5Number"] == 3
+    assert exported["parse_number.count"] == 3
+    assert all(isinstance(value, (int, float)) for value in exported.values())
+
+    lazy_stats = json5kit.Json5ParseStats()
+    lazy_tree = json5kit.parse(source, lazy=True, stats=lazy_stats)
+    assert lazy_tree.to_source() == source
+    assert lazy_stats.node_counts["Json5Object"] == 2
+    assert lazy_stats.node_counts["Json5Number"] == 0
+
+
+def test_json5_query() -> None:
+    """Tests finding nodes with JSONPath expressions and JSON Pointers."""
+    source = dedent(
+        """\
+        {
+          services: [
+            {name: 'web', port: 80},  // http
+            {name: 'api', port: 443},
+          ],
+          'a/b': {'~x': [1, 2, 3]},
+          meta: {port: 1},
+        }
+        """
+    )
+    tree = json5kit.parse(source)
+
+    def values(path: str) -> list[object]:
+        return [json5kit.loads(node.to_json()) for node in json5kit.query(tree, path)]
+
+    assert values("$.services[*].port") == [80, 443]
+    assert values("$['services'][-1].name") == ["api"]
+    assert values("$..port") == [80, 443, 1]
+    assert values('$["a/b"]["~x"][::2]') == [1, 3]
+    assert values("$.services[0, 1]['name', 'port']") == ["web", 80, "api", 443]
+    assert values("$.services.port") == []
+    assert json5kit.query(tree, "$") == [tree.value]
+    assert json5kit.compile_path("$.meta") is json5kit.compile_path("$.meta")
+
+    assert json5kit.resolve_pointer(tree, "/a~1b/~0x/2").to_source() == "3"
+    assert json5kit.resolve_pointer(tree, "") is tree.value
+    for pointer in ("/missing", "/services/2", "/services/01", "/services/-"):
+        with pytest.raises(KeyError):
+            json5kit.resolve_pointer(tree, pointer)
+
+    for path in ("services", "$.", "$[0", "$[?(@.port)]", "$[::0]", "$.[0]"):
+        with pytest.raises(json5kit.Json5PathError):
+            json5kit.query(tree, path)
+    with pytest.raises(json5kit.Json5PathError):
+        json5kit.resolve_pointer(tree, "services")
+
+    # The results are the nodes in the tree, so they can be edited in place
+    (port,) = json5kit.query(tree, "$.services[0].port")
+    services = json5kit.resolve_pointer(tree, "/services/0")
+    assert isinstance(port, json5kit.Json5Number)
+    assert isinstance(services, json5kit.Json5Object)
+    services.set("port", port.replace(8080))
+    assert "{name: 'web', port: 8080},  // http\n" in tree.to_source()
+
+    # Lazily parsed containers are only loaded along the path
+    lazy_tree = json5kit.parse(source, lazy=True)
+    (meta_port,) = json5kit.query(lazy_tree, "$.meta.port")
+    assert meta_port.to_source() == "1"
+    lazy_services = json5kit.resolve_pointer(lazy_tree, "/services")
+    assert isinstance(lazy_services, json5kit.Json5Array)
+    assert lazy_services._lazy is not None
+
+
+def test_json5_structural_hash() -> None:
+    """Tests comparing trees by their structure, and finding what changed."""
+    tree = json5kit.parse("{a: [1, 'x', null], b: {c: true}}")
+    same_tree = json5kit.parse('// config\n{"b": {c: true,}, a: [1.0, "x", null]}\n')
+    assert json5kit.structurally_equal(tree, same_tree)
+    assert json5kit.structural_hash(tree) == json5kit.structural_hash(same_tree.value)
+    for source in ("{a: [1, 'x', null], b: {c: 1}}", "{a: [1, 'x'], b: {c: true}}"):
+        assert not json5kit.structurally_equal(tree, json5kit.parse(source))
+    assert not json5kit.structurally_equal(
+        json5kit.parse("[false, '1']"), json5kit.parse("[0, 1]")
+    )
+
+    # Numbers are equal when they load as equal values, so large ints are exact
+    big_ints = json5kit.parse("[12345678901234567890]")
+    other_big_ints = json5kit.parse("[12345678901234567891]")
+    assert not json5kit.structurally_equal(big_ints, other_big_ints)
+    assert json5kit.find_changes(big_ints, other_big_ints) == ["/0"]
+    assert json5kit.structurally_equal(
+        json5kit.parse("[1, -0.0, 2.50]"), json5kit.parse("[1.0, 0, 2.5]")
+    )
+    assert not json5kit.structurally_equal(
+        json5kit.parse("9007199254740993"), json5kit.parse("9007199254740992.0")
+    )
+
+    new_tree = json5kit.parse("{a: [1, 'y', null, 2], b: {c: true}, d: 3}")
+    assert json5kit.find_changes(tree, new_tree) == ["/a/1", "/a/3", "/d"]
+    assert json5kit.find_changes(tree, same_tree) == []
+
+    # Hashes are kept, and reset by transformers and incremental reparsing
+    class NegateNumbers(json5kit.Json5Transformer):
+        def visit_Number(self, node: json5kit.Json5Number) -> json5kit.Json5Number:
+            return node.replace(-node.value)
+
+    old_hash = json5kit.structural_hash(tree)
+    NegateNumbers().visit(tree)
+    assert json5kit.structural_hash(tree) != old_hash
+    assert json5kit.find_changes(tree, same_tree) == ["/a/0"]
+    NegateNumbers().visit(tree)
+    assert json5kit.structural_hash(tree) == old_hash
+
+    source = tree.to_source()
+    json5kit.reparse(tree, source.index("true"), source.index("true") + 4, "false")
+    assert json5kit.find_changes(same_tree, tree) == ["/b/c"]
+
+    # Other changes in place need the hashes to be invalidated
+    assert isinstance(tree.value, json5kit.Json5Object)
+    inner = tree.value["b"]
+    assert isinstance(inner, json5kit.Json5Object)
+    inner.values[0] = json5kit.parse("true").value
+    json5kit.invalidate_hashes(tree)
+    assert json5kit.structurally_equal(tree, same_tree)
+
+    # Changing a nested container through its methods outdates the root's hash
+    old_hash = json5kit.structural_hash(tree)
+    inner.set("c", json5kit.parse("false").value)
+    assert json5kit.structural_hash(tree) != old_hash
+    assert json5kit.find_changes(same_tree, tree) == ["/b/c"]
+    assert json5kit.diff(same_tree, tree) != []
+    inner.delete("c")
+    assert json5kit.find_changes(same_tree, tree) == ["/b/c"]
+
+
+def test_json5_diff() -> None:
+    """Tests diffing two trees, and patching the first one to match the second."""
+    old_source = dedent(
+        """\
+        // Settings
+        {
+          name: 'app',  // the name
+          ports: [
+            80,  // http
+            443,  // https
+          ],
+          debug: true,
+          nested: {a: [1, 2, 3], b: null},
+        }
+        """
+    )
+    new_source = "{name: 'app', ports: [443, 8080], nested: {a: [1, 3], c: 2}}"
+    old_tree = json5kit.parse(old_source)
+    new_tree = json5kit.parse(new_source)
+
+    patch = json5kit.diff(old_tree, new_tree)
+    assert [(edit.op, edit.path) for edit in patch] == [
+        ("remove", "/ports/0"),
+        ("add", "/ports/1"),
+        ("remove", "/debug"),
+        ("remove", "/nested/a/1"),
+        ("remove", "/nested/b"),
+        ("add", "/nested/c"),
+    ]
+    assert json5kit.diff(old_tree, json5kit.parse(old_source)) == []
+
+    json5kit.apply_patch(old_tree, patch)
+    assert json5kit.structurally_equal(old_tree, new_tree)
+    source = old_tree.to_source()
+    assert json5kit.loads(source) == json5kit.loads(new_source)
+    assert "// Settings" in source
+    assert "// the name" in source
+    assert "// https" in source
+
+    # Removing what follows a line comment leaves the closing bracket outside of it
+    tree = json5kit.parse("{a: [1, // one\n2], b: 3, // three\nc: 4}")
+    json5kit.apply_patch(tree, json5kit.diff(tree, json5kit.parse("{a: [1], b: 3}")))
+    assert tree.to_source() == "{a: [1, // one\n], b: 3, // three\n}"
+    assert json5kit.loads(tree.to_source()) == {"a": [1], "b": 3}
+
+    # Changing the type of a value replaces it, keeping the trivia after it
+    tree = json5kit.parse("[1, {a: 2},  // comment\n]")
+    json5kit.apply_patch(tree, json5kit.diff(tree, json5kit.parse("[1, [2]]")))
+    assert tree.to_source() == "[1, [2],  // comment\n]"
+    json5kit.apply_patch(tree, json5kit.diff(tree, json5kit.parse("'x'")))
+    assert tree.to_source() == "'x'"
+
+    with pytest.raises(KeyError):
+        json5kit.apply_patch(tree, [json5kit.Json5Edit("remove", "/a")])